@@ -8,6 +8,7 @@ Common - generic functions (:mod:`pynance.common`)
 .. currentmodule:: pynance.common
 """
 
+import numpy as np
 import pandas as pd
 
 def featurize(equity_data, n_sessions, **kwargs):
@@ -31,13 +32,24 @@ def featurize(equity_data, n_sessions, **kwargs):
         column names for output DataFrame. Default will look like:
         ['-5', '-4', '-3', '-2', '-1', '0'].
 
+    outputtype : type, optional
+        `pd.DataFrame` or `np.ndarray`. Defaults to `pd.DataFrame`.
+
+    copy : bool, optional
+        If False and `outputtype` is `np.ndarray`, return the read-only
+        view of :func:`windows` without copying.
+        Defaults to True.
+
     Returns
     ----------
-    out : DataFrame
+    out : DataFrame or ndarray
         Each row is a sequence of `n_sessions` session values where
         the last column matches the value on the date specified by
         the DataFrame index.
 
+    .. versionchanged:: 1.1.0
+       Built from a strided view in a single copy, with ndarray output.
+
     Examples
     --------
     >>> pn.featurize(equity_data, n_sessions, **kwargs)
@@ -47,16 +59,43 @@ def featurize(equity_data, n_sessions, **kwargs):
     #>>> timeit.timeit('data.featurize(data.get("ge", dt.date(1960, 1, 1), 
     #        dt.date(2014, 12, 31)), 256)', setup=s, number=1)
     #1.6771750450134277
-    columns = kwargs.get('columns', map(str, range((-n_sessions + 1), 1)))
+    columns = list(kwargs.get('columns', map(str, range((-n_sessions + 1), 1))))
     selection = kwargs.get('selection', 'Close')
-    # empty DataFrame with desired index and column labels
-    features = pd.DataFrame(index=equity_data.index[(n_sessions - 1):],
-            columns=columns, dtype='float64')
-    values = equity_data[selection].values
-    for i in range(n_sessions - 1):
-        features.loc[:, i] = values[i:(-n_sessions + i + 1)]
-    features.loc[:, n_sessions - 1] = values[(n_sessions - 1):]
-    return features
+    view = windows(equity_data[selection].values.astype('float64'), n_sessions)
+    if kwargs.get('outputtype', pd.DataFrame) is np.ndarray:
+        return np.ascontiguousarray(view) if kwargs.get('copy', True) else view
+    return pd.DataFrame(np.ascontiguousarray(view), index=equity_data.index[(n_sessions - 1):],
+            columns=columns, copy=False)
+
+def windows(values, n_sessions):
+    """
+    Return a read-only view of the values of `n_sessions` consecutive
+    sessions ending at each session, without copying.
+
+    .. versionadded:: 1.1.0
+
+    Parameters
+    ----------
+    values : ndarray
+        1-D array, or 2-D array with one column per series.
+    n_sessions : int
+        Number of sessions in each window.
+
+    Returns
+    ----------
+    view : ndarray
+        For 1-D `values`, shape `(len(values) - n_sessions + 1, n_sessions)`,
+        where `view[i, j]` is `values[i + j]`. For 2-D `values` of shape
+        `(sessions, series)`, shape `(sessions - n_sessions + 1, series, n_sessions)`.
+        The view shares memory with `values`, so that copying it,
+        e.g. with `np.ascontiguousarray()`, is the only allocation
+        needed for a feature matrix.
+    """
+    if n_sessions < 1 or n_sessions > values.shape[0]:
+        raise ValueError("n_sessions must be from 1 to the number of sessions")
+    _shape = (values.shape[0] - n_sessions + 1,) + values.shape[1:] + (n_sessions,)
+    _strides = values.strides + values.strides[:1]
+    return np.lib.stride_tricks.as_strided(values, shape=_shape, strides=_strides, writeable=False)
 
 def decorate(fn, *args, **kwargs):
     """
@@ -7,6 +7,14 @@ Data (:mod:`pynance.data`)
 
 .. currentmodule:: pynance.data
 
+:mod:`pynance.data.adjust`
+
+:mod:`pynance.data.aretrieve`
+
+:mod:`pynance.data.bulk`
+
+:mod:`pynance.data.cache`
+
 :mod:`pynance.data.combine`
 
 :mod:`pynance.data.compare`
@@ -15,16 +23,26 @@ Data (:mod:`pynance.data`)
 
 :mod:`pynance.data.lab`
 
+:mod:`pynance.data.pit`
+
 :mod:`pynance.data.prep`
 
+:mod:`pynance.data.providers`
+
 :mod:`pynance.data.retrieve`
+
+:mod:`pynance.data.store`
+
+:mod:`pynance.data.symbols`
 """
 
 from __future__ import absolute_import
 
-__all__ = ["combine", "compare", "feat", "lab", "prep", "retrieve"]
+__all__ = ["adjust", "aretrieve", "bulk", "cache", "combine", "compare", "feat", "lab", "pit", "prep", "providers", "retrieve", "store", "symbols"]
 
 # imported directly into data module
+from . import aretrieve
+from .aretrieve import *
 from . import combine
 from .combine import *
 from . import compare
@@ -35,5 +53,12 @@ from . import retrieve
 from .retrieve import *
 
 # imported as submodule
+from . import adjust
+from . import bulk
+from . import cache
 from . import feat
 from . import lab
+from . import pit
+from . import providers
+from . import store
+from . import symbols
@@ -0,0 +1,201 @@
+"""
+.. Copyright (c) 2014- Marshall Farrier
+   license http://opensource.org/licenses/MIT
+
+Data - corporate action adjustments (:mod:`pynance.data.adjust`)
+=================================================================
+
+.. currentmodule:: pynance.data.adjust
+
+.. versionadded:: 1.1.0
+
+Backward adjustment of prices for splits and dividends across a panel
+of equities in a single vectorized pass.
+
+A panel is a mapping from field ('Open', 'High', 'Low', 'Close', 'Volume')
+to a wide DataFrame whose index is the session dates and whose columns
+are symbols, as returned for example by
+:meth:`pynance.data.store.PriceStore.frame`.
+
+Events are given as DataFrames with columns 'Symbol', 'Date' (the ex-date)
+and, for splits, 'Ratio' (new shares per old share, e.g. 2.0 for a 2-for-1
+split) or, for dividends, 'Amount' (cash per share).
+
+Each event contributes a factor applying to all sessions before its
+ex-date: `1 / ratio` for a split and `1 - amount / close` for a dividend,
+where `close` is the closing price on the last session before the ex-date.
+The adjustment factor for a session is the product of the factors of all
+later events, computed as a reverse cumulative product.
+
+Examples
+--------
+>>> import pynance as pn
+>>> fields = ('Open', 'High', 'Low', 'Close', 'Volume')
+>>> panel = {field: store.frame(field) for field in fields}
+>>> adjusted = pn.data.adjust.adjust(panel, splits, dividends)
+>>> tr = pn.data.adjust.total_return(panel['Close'], splits, dividends)
+"""
+
+import numpy as np
+import pandas as pd
+
+PRICE_FIELDS = ('Open', 'High', 'Low', 'Close', 'Adj Close')
+
+def factors(close, splits=None, dividends=None):
+    """
+    Return backward adjustment factors for prices.
+
+    Parameters
+    ----------
+    close : DataFrame
+        Unadjusted closing prices, sessions x symbols.
+    splits : DataFrame, optional
+        Columns 'Symbol', 'Date' and 'Ratio'.
+    dividends : DataFrame, optional
+        Columns 'Symbol', 'Date' and 'Amount'.
+
+    Returns
+    -------
+    factors : DataFrame
+        Factor by which to multiply each unadjusted price, with the same
+        index and columns as `close`.
+    """
+    _events = _eventfactors(close, splits, dividends)
+    return pd.DataFrame(_cumfactors(close.shape, _events), index=close.index, columns=close.columns)
+
+def adjust(panel, splits=None, dividends=None):
+    """
+    Return a panel adjusted for splits and dividends.
+
+    Parameters
+    ----------
+    panel : dict
+        Wide DataFrames keyed by field. Must include 'Close'.
+    splits : DataFrame, optional
+        Columns 'Symbol', 'Date' and 'Ratio'.
+    dividends : DataFrame, optional
+        Columns 'Symbol', 'Date' and 'Amount'.
+
+    Returns
+    -------
+    adjusted : dict
+        Wide DataFrames keyed by field. Price fields are adjusted for
+        splits and dividends, 'Volume' for splits only. 'Adj Close'
+        is set to the adjusted 'Close'; an 'Adj Close' in the input
+        is ignored.
+    """
+    _close = panel['Close']
+    _pricefactors = factors(_close, splits, dividends).values
+    _volfactors = _cumfactors(_close.shape, _eventfactors(_close, splits, None))
+    adjusted = {}
+    for _field, _df in panel.items():
+        if _field == 'Adj Close':
+            continue
+        if _field == 'Volume':
+            _values = _df.values / _volfactors
+        elif _field in PRICE_FIELDS:
+            _values = _df.values * _pricefactors
+        else:
+            adjusted[_field] = _df.copy()
+            continue
+        adjusted[_field] = pd.DataFrame(_values, index=_df.index, columns=_df.columns)
+    adjusted['Adj Close'] = adjusted['Close'].copy()
+    return adjusted
+
+def total_return(close, splits=None, dividends=None):
+    """
+    Return a total return index assuming reinvestment of dividends.
+
+    Parameters
+    ----------
+    close : DataFrame
+        Unadjusted closing prices, sessions x symbols.
+    splits : DataFrame, optional
+    dividends : DataFrame, optional
+
+    Returns
+    -------
+    tr : DataFrame
+        Adjusted closing prices of each symbol relative to the first
+        valid adjusted closing price, which is 1.0.
+    """
+    _adjclose = close.values * factors(close, splits, dividends).values
+    _first = _firstvalid(_adjclose)
+    return pd.DataFrame(_adjclose / _first, index=close.index, columns=close.columns)
+
+def readjust(adjusted, splits=None, dividends=None, close=None):
+    """
+    Apply new events to an already adjusted panel in place.
+
+    Only the columns of symbols with new events are recomputed,
+    so that the cost is proportional to the number of affected symbols.
+
+    Parameters
+    ----------
+    adjusted : dict
+        Panel as returned by :func:`adjust`, modified in place.
+    splits : DataFrame, optional
+        New splits.
+    dividends : DataFrame, optional
+        New dividends.
+    close : DataFrame, optional
+        Unadjusted closing prices used to calculate dividend factors.
+        Defaults to `adjusted['Close']`, which is correct as long as no
+        other events follow the new ones.
+
+    Returns
+    -------
+    adjusted : dict
+        The modified panel.
+    """
+    _close = adjusted['Close'] if close is None else close
+    _cols = np.unique(np.concatenate([_close.columns.get_indexer(_events.loc[:, 'Symbol'].values)
+        for _events in (splits, dividends) if _events is not None] + [np.empty(0, dtype=np.int64)]))
+    _cols = _cols[_cols >= 0]
+    if len(_cols) == 0:
+        return adjusted
+    _sub = _close.iloc[:, _cols]
+    _pricefactors = factors(_sub, splits, dividends).values
+    _volfactors = _cumfactors(_sub.shape, _eventfactors(_sub, splits, None))
+    for _field, _df in adjusted.items():
+        if _field == 'Volume':
+            _df.iloc[:, _cols] = _df.iloc[:, _cols].values / _volfactors
+        elif _field in PRICE_FIELDS:
+            _df.iloc[:, _cols] = _df.iloc[:, _cols].values * _pricefactors
+    return adjusted
+
+def _eventfactors(close, splits, dividends):
+    # (rows, cols, factors) with each factor at the last session before the ex-date
+    _rows = []
+    _cols = []
+    _factors = []
+    for _events, _kind in ((splits, 'Ratio'), (dividends, 'Amount')):
+        if _events is None or len(_events.index) == 0:
+            continue
+        _row = close.index.searchsorted(pd.DatetimeIndex(_events.loc[:, 'Date'])) - 1
+        _col = close.columns.get_indexer(_events.loc[:, 'Symbol'].values)
+        _valid = (_row >= 0) & (_row < close.shape[0] - 1) & (_col >= 0)
+        _row = _row[_valid]
+        _col = _col[_valid]
+        _values = _events.loc[:, _kind].values[_valid].astype(np.float64)
+        if _kind == 'Ratio':
+            _factors.append(1. / _values)
+        else:
+            _factors.append(1. - _values / close.values[_row, _col])
+        _rows.append(_row)
+        _cols.append(_col)
+    if len(_rows) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+    return np.concatenate(_rows), np.concatenate(_cols), np.concatenate(_factors)
+
+def _cumfactors(shape, events):
+    _rows, _cols, _factors = events
+    _eventmatrix = np.ones(shape, dtype=np.float64)
+    # multiple events on the same session are combined
+    np.multiply.at(_eventmatrix, (_rows, _cols), _factors)
+    return np.cumprod(_eventmatrix[::-1], axis=0)[::-1]
+
+def _firstvalid(values):
+    _valid = ~np.isnan(values)
+    _firstrow = np.argmax(_valid, axis=0)
+    return values[_firstrow, np.arange(values.shape[1])]
@@ -0,0 +1,209 @@
+"""
+.. Copyright (c) 2014- Marshall Farrier
+   license http://opensource.org/licenses/MIT
+
+Data - asynchronous retrieval (:mod:`pynance.data.aretrieve`)
+==============================================================
+
+.. currentmodule:: pynance.data.aretrieve
+
+.. versionadded:: 1.1.0
+
+Coroutine counterparts of the functions in :mod:`pynance.data.retrieve`
+for use in services running an :mod:`asyncio` event loop.
+
+Retrieval is delegated to a provider, an object with a coroutine method
+`fetch(symbol, start, end)` returning a DataFrame as returned by
+:func:`pynance.data.retrieve.get`. The default provider,
+:class:`AsyncStooqProvider`, requires `aiohttp <https://docs.aiohttp.org/>`_.
+Any other object with a `fetch()` coroutine, such as a local fake
+provider for offline benchmarks, can be used instead. This includes all
+providers in :mod:`pynance.data.providers`.
+
+Examples
+--------
+>>> import asyncio
+>>> import pynance as pn
+>>> async def main():
+...     async with pn.data.AsyncStooqProvider(limit=64) as provider:
+...         data, errors = await pn.data.aget_many(['aapl', 'ge'], '2014', provider=provider)
+...     return data
+>>> data = asyncio.run(main())
+"""
+
+import asyncio
+import io
+
+import pandas as pd
+
+from . import providers
+from . import retrieve
+
+class AsyncStooqProvider(object):
+    """
+    Retrieve daily data from Stooq using a pool of HTTP connections.
+
+    Parameters
+    ----------
+    limit : int, optional
+        Maximum number of open connections. Defaults to 100.
+    timeout : float, optional
+        Timeout in seconds for each request. Defaults to 30.
+    url : str, optional
+        Alternative URL of a server providing data in the format
+        used by Stooq.
+
+    Notes
+    -----
+    The provider must be closed when no longer needed, either by
+    awaiting :meth:`close` or by using it as an asynchronous context manager.
+    """
+    def __init__(self, limit=100, timeout=30., url=None):
+        self.limit = limit
+        self.timeout = timeout
+        self.url = url or providers.STOOQ_URL
+        self._session = None
+
+    async def fetch(self, symbol, start, end):
+        """
+        Return a DataFrame of daily data for `symbol` between `start` and `end`.
+        """
+        _session = self._getsession()
+        _params = providers.stooq_params(symbol, start, end)
+        async with _session.get(self.url, params=_params) as _response:
+            _response.raise_for_status()
+            _text = await _response.text()
+        df = pd.read_csv(io.StringIO(_text), index_col=0, parse_dates=True, na_values=('-', 'null'))
+        df.columns = [_col.strip() for _col in df.columns]
+        df.index = pd.to_datetime(df.index)
+        return df.sort_index()
+
+    async def close(self):
+        """
+        Close all pooled connections.
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    def _getsession(self):
+        if self._session is None:
+            try:
+                import aiohttp
+            except ImportError:
+                raise ImportError("AsyncStooqProvider requires aiohttp")
+            self._session = aiohttp.ClientSession(
+                    connector=aiohttp.TCPConnector(limit=self.limit),
+                    timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self._session
+
+async def aget(equity, start=None, end=None, provider=None):
+    """
+    Coroutine version of :func:`pynance.data.retrieve.get`.
+
+    The local cache is not consulted.
+
+    Parameters
+    ----------
+    equity : str
+        Ticker symbol.
+    start : date, optional
+        First date to retrieve.
+    end : date, optional
+        Last date to retrieve.
+    provider : object, optional
+        Object with a coroutine method `fetch(symbol, start, end)`.
+        Defaults to the provider set with :func:`pynance.data.providers.set_provider`
+        or, if none has been set, to a new :class:`AsyncStooqProvider`,
+        which is closed before returning.
+
+    Returns
+    -------
+    df : DataFrame
+    """
+    _start, _end = retrieve._daterange(start, end)
+    provider = provider or providers.configured_provider()
+    if provider is not None:
+        return await provider.fetch(equity, _start, _end)
+    async with AsyncStooqProvider() as _provider:
+        return await _provider.fetch(equity, _start, _end)
+
+async def aget_many(symbols, start=None, end=None, provider=None, limit=32, selection=None):
+    """
+    Retrieve data for multiple equities concurrently on the running event loop.
+
+    At most `limit` requests are in flight at any time. If the calling task
+    is cancelled, all outstanding requests are cancelled as well.
+
+    Parameters
+    ----------
+    symbols : list of str
+        Ticker symbols to retrieve.
+    start : date, optional
+        First date to retrieve.
+    end : date, optional
+        Last date to retrieve.
+    provider : object, optional
+        Object with a coroutine method `fetch(symbol, start, end)`.
+        Defaults to the provider set with :func:`pynance.data.providers.set_provider`
+        or, if none has been set, to a new :class:`AsyncStooqProvider`
+        whose connection pool is shared by all requests.
+    limit : int, optional
+        Maximum number of concurrent requests. Defaults to 32.
+    selection : str, optional
+        If provided, return a single DataFrame with one column per symbol
+        containing the values of column `selection`. Cf.
+        :func:`pynance.data.retrieve.get_many`.
+
+    Returns
+    -------
+    data : dict or DataFrame
+        DataFrames by symbol or, if `selection` is specified, a DataFrame
+        whose columns are symbols.
+    errors : dict
+        Exception raised for each symbol that couldn't be retrieved.
+    """
+    provider = provider or providers.configured_provider()
+    if provider is None:
+        async with AsyncStooqProvider(limit=limit) as _provider:
+            return await aget_many(symbols, start, end, _provider, limit, selection)
+    _start, _end = retrieve._daterange(start, end)
+    _semaphore = asyncio.Semaphore(limit)
+
+    async def _fetch(symbol):
+        async with _semaphore:
+            return await provider.fetch(symbol, _start, _end)
+
+    _tasks = [asyncio.ensure_future(_fetch(_symbol)) for _symbol in symbols]
+    try:
+        _results = await asyncio.gather(*_tasks, return_exceptions=True)
+    except asyncio.CancelledError:
+        for _task in _tasks:
+            _task.cancel()
+        await asyncio.gather(*_tasks, return_exceptions=True)
+        raise
+    data = {}
+    errors = {}
+    for _symbol, _result in zip(symbols, _results):
+        if isinstance(_result, BaseException):
+            errors[_symbol] = _result
+        else:
+            data[_symbol] = _result
+    if selection is None:
+        return data, errors
+    return retrieve._panel(data, selection), errors
+
+async def aequities(country='US'):
+    """
+    Coroutine version of :func:`pynance.data.retrieve.equities`.
+
+    The symbol directory is retrieved in the event loop's default executor.
+    """
+    _loop = asyncio.get_running_loop()
+    return await _loop.run_in_executor(None, retrieve.equities, country)
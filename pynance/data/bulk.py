@@ -0,0 +1,152 @@
+"""
+.. Copyright (c) 2014- Marshall Farrier
+   license http://opensource.org/licenses/MIT
+
+Data - bulk loading (:mod:`pynance.data.bulk`)
+=================================================
+
+.. currentmodule:: pynance.data.bulk
+
+.. versionadded:: 1.1.0
+
+Load directories of daily bars, one CSV file per symbol, such as
+vendor dumps. Files are parsed in parallel in a pool of processes with
+explicit dtypes, and column names are normalized to those expected by
+:mod:`pynance.tech` and :mod:`pynance.chart`: 'Open', 'High', 'Low',
+'Close', 'Adj Close' and 'Volume'.
+
+Examples
+--------
+>>> import pynance as pn
+>>> data, errors, stats = pn.data.bulk.load_dir('/data/dump')
+>>> print(stats['files_per_sec'])
+>>> closes, errors, stats = pn.data.bulk.load_dir('/data/dump', selection='Adj Close')
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import fnmatch
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+_COLUMNS = {
+        'open': 'Open',
+        'high': 'High',
+        'low': 'Low',
+        'close': 'Close',
+        'adjclose': 'Adj Close',
+        'adjustedclose': 'Adj Close',
+        'volume': 'Volume',
+        'vol': 'Volume',
+        }
+
+_DATECOLUMNS = ('date', 'datetime', 'timestamp', 'time', 'day')
+
+def read_bars(path):
+    """
+    Read a CSV file of daily bars.
+
+    Parameters
+    ----------
+    path : str
+        CSV file with a header row. The date column is recognized by
+        its name ('Date', 'Timestamp', etc.) or else taken to be the
+        first column. Price and volume columns are matched regardless of
+        case and punctuation, e.g. 'adj_close' or 'Adj. Close'.
+        Other columns are kept as parsed by :func:`pandas.read_csv`.
+
+    Returns
+    -------
+    df : DataFrame
+        Data indexed by date in ascending order. Prices are
+        of type `float64` and 'Volume' of type `int64`.
+    """
+    _header = pd.read_csv(path, nrows=0).columns
+    _names = {}
+    _datecol = _header[0]
+    for _col in _header:
+        _key = ''.join(_ch for _ch in _col.lower() if _ch.isalnum())
+        if _key in _DATECOLUMNS:
+            _datecol = _col
+        elif _key in _COLUMNS:
+            _names[_col] = _COLUMNS[_key]
+    _dtypes = {_col: np.float64 for _col, _name in _names.items() if _name != 'Volume'}
+    _volcols = [_col for _col, _name in _names.items() if _name == 'Volume']
+    _dtypes.update({_col: np.int64 for _col in _volcols})
+    try:
+        df = pd.read_csv(path, index_col=_datecol, parse_dates=[_datecol], dtype=_dtypes)
+    except ValueError:
+        # missing volume values can't be represented as int64
+        _dtypes.update({_col: np.float64 for _col in _volcols})
+        df = pd.read_csv(path, index_col=_datecol, parse_dates=[_datecol], dtype=_dtypes)
+    df.rename(columns=_names, inplace=True)
+    df.index.name = 'Date'
+    if not df.index.is_monotonic_increasing:
+        df.sort_index(inplace=True)
+    return df
+
+def load_dir(directory, pattern='*.csv', max_workers=None, selection=None):
+    """
+    Load all matching files in a directory.
+
+    Parameters
+    ----------
+    directory : str
+        Directory to scan. The symbol for each file is its name
+        without extension, in upper case.
+    pattern : str, optional
+        Shell-style pattern of files to load. Defaults to '*.csv'.
+    max_workers : int, optional
+        Number of processes. Defaults to the number of processors.
+        If 1, files are loaded in the current process.
+    selection : str, optional
+        If provided, return a single DataFrame with one column per symbol
+        containing the values of column `selection`, aligned on the union
+        of all dates.
+
+    Returns
+    -------
+    data : dict or DataFrame
+        DataFrames by symbol, in order of symbol, or, if `selection` is
+        specified, a DataFrame whose columns are symbols.
+    errors : dict
+        Exception raised for each symbol whose file couldn't be parsed.
+    stats : dict
+        Keys 'files', 'seconds' and 'files_per_sec'.
+    """
+    _start = time.time()
+    _fnames = sorted(_fname for _fname in os.listdir(directory) if fnmatch.fnmatch(_fname, pattern))
+    _symbols = [os.path.splitext(_fname)[0].upper() for _fname in _fnames]
+    _paths = [os.path.join(directory, _fname) for _fname in _fnames]
+    if max_workers == 1:
+        _results = [_tryread(_path) for _path in _paths]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as _executor:
+            _chunksize = max(1, len(_paths) // (4 * (max_workers or os.cpu_count() or 1)))
+            _results = list(_executor.map(_tryread, _paths, chunksize=_chunksize))
+    data = {}
+    errors = {}
+    for _symbol, (_df, _error) in zip(_symbols, _results):
+        if _error is None:
+            data[_symbol] = _df
+        else:
+            errors[_symbol] = _error
+    if selection is not None:
+        data = pd.concat({_symbol: _df.loc[:, selection] for _symbol, _df in data.items()}, axis=1) \
+                if len(data) > 0 else pd.DataFrame(dtype='float64')
+    _seconds = time.time() - _start
+    stats = {
+            'files': len(_paths),
+            'seconds': _seconds,
+            'files_per_sec': len(_paths) / _seconds if _seconds > 0. else float('inf'),
+            }
+    return data, errors, stats
+
+def _tryread(path):
+    # exceptions are returned rather than raised so that one bad file doesn't abort the batch
+    try:
+        return read_bars(path), None
+    except Exception as e:
+        return None, e
@@ -0,0 +1,427 @@
+"""
+.. Copyright (c) 2014- Marshall Farrier
+   license http://opensource.org/licenses/MIT
+
+Data - local price cache (:mod:`pynance.data.cache`)
+=========================================================
+
+.. currentmodule:: pynance.data.cache
+
+.. versionadded:: 1.1.0
+
+Opt-in on-disk cache for price histories retrieved with
+:func:`pynance.data.retrieve.get`.
+
+Each symbol is stored in its own directory below
+`<cachedir>/prices/<source>/<SYMBOL>/` with one raw binary file per column
+and a small `meta.json` recording the column names, dtypes, number
+of rows and the date range covered by the cached data.
+Columns are stored in native byte order and can be read back
+with :func:`numpy.fromfile` without parsing.
+
+Examples
+--------
+>>> import pynance as pn
+>>> pn.data.cache.set_cachedir('~/.pynance/cache', maxsize=2 ** 30)
+>>> aapl = pn.data.get('aapl', '2014-03-01', '2015-03-01')
+>>> # served from disk
+>>> aapl = pn.data.get('aapl', '2014-06-01', '2014-09-01')
+>>> pn.data.cache.invalidate('aapl')
+
+The total size of the cache is kept in `<cachedir>/prices/size.json`
+and updated by each write, so that the cache directory is only scanned
+when the total exceeds `maxsize`.
+
+Functions of this module hold a lock while reading or writing, so that
+they can be called from several threads, e.g. the workers of
+:func:`pynance.data.retrieve.get_many`, including :func:`evict`.
+A cache directory must not be written by several processes at once.
+"""
+
+from functools import wraps
+import json
+import os
+import shutil
+import threading
+
+import numpy as np
+import pandas as pd
+
+_settings = {
+        'cachedir': None,
+        'maxsize': None,
+        }
+
+_lock = threading.RLock()
+
+def _locked(func):
+    # serialize access to the cache directory across threads
+    @wraps(func)
+    def _wrapper(*args, **kwargs):
+        with _lock:
+            return func(*args, **kwargs)
+    return _wrapper
+
+_META = 'meta.json'
+_ONEDAY = pd.Timedelta(days=1)
+_INDEX = 'index.dat'
+_SIZE = 'size.json'
+
+def set_cachedir(path, maxsize=None):
+    """
+    Enable the cache in the given directory.
+
+    Parameters
+    ----------
+    path : str or None
+        Directory in which to store cached data. It will be created
+        if it doesn't exist. Pass `None` to disable caching.
+    maxsize : int, optional
+        Maximum size of the cache in bytes. When exceeded, the least
+        recently used symbols are evicted. Defaults to `None` (no limit).
+    """
+    if path is not None:
+        path = os.path.abspath(os.path.expanduser(path))
+        if not os.path.isdir(path):
+            os.makedirs(path)
+    _settings['cachedir'] = path
+    _settings['maxsize'] = maxsize
+
+def get_cachedir():
+    """
+    Return the current cache directory or `None` if caching is disabled.
+    """
+    return _settings['cachedir']
+
+def enabled():
+    """
+    Return True iff a cache directory has been set.
+    """
+    return _settings['cachedir'] is not None
+
+@_locked
+def load(symbol, source):
+    """
+    Load cached data for a symbol.
+
+    Parameters
+    ----------
+    symbol : str
+        Ticker symbol.
+    source : str
+        Data source from which the data was originally retrieved,
+        e.g. 'stooq'.
+
+    Returns
+    -------
+    out : tuple or None
+        `(df, start, end)` where `df` is the cached DataFrame and
+        `start` and `end` are :class:`pandas.Timestamp` values delimiting
+        the date range covered by the cache. `None` if the symbol
+        isn't cached.
+    """
+    _dir = _symboldir(symbol, source)
+    _meta = _readmeta(_dir)
+    if _meta is None:
+        return None
+    _rows = _meta['rows']
+    _index = np.fromfile(os.path.join(_dir, _INDEX), dtype=np.int64, count=_rows)
+    _data = {}
+    for i, _col in enumerate(_meta['columns']):
+        _data[_col] = np.fromfile(os.path.join(_dir, _datafile(i)),
+                dtype=np.dtype(_meta['dtypes'][i]), count=_rows)
+    _df = pd.DataFrame(_data, index=pd.DatetimeIndex(_index.view('datetime64[ns]'), name=_meta['name']),
+            columns=_meta['columns'])
+    # mark as recently used for eviction
+    os.utime(os.path.join(_dir, _META), None)
+    return _df, pd.Timestamp(_meta['start']), pd.Timestamp(_meta['end'])
+
+@_locked
+def save(symbol, source, df, start, end):
+    """
+    Store data for a symbol, replacing anything previously cached.
+
+    Parameters
+    ----------
+    symbol : str
+        Ticker symbol.
+    source : str
+        Data source from which the data was retrieved.
+    df : DataFrame
+        Data indexed by date. Rows are stored in ascending order of date.
+    start : date
+        Start of the date range covered by `df`.
+    end : date
+        End of the date range requested. The range recorded as covered
+        ends with the last session in `df`, as later sessions may not
+        have been published yet.
+    """
+    _dir = _symboldir(symbol, source)
+    if not os.path.isdir(_dir):
+        os.makedirs(_dir)
+    _prevsize = _dirsize(_dir)
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index()
+    _index = pd.DatetimeIndex(df.index).values.astype('datetime64[ns]').view(np.int64)
+    _index.tofile(os.path.join(_dir, _INDEX))
+    _dtypes = []
+    for i in range(df.shape[1]):
+        _values = np.ascontiguousarray(df.iloc[:, i].values)
+        _values.tofile(os.path.join(_dir, _datafile(i)))
+        _dtypes.append(_values.dtype.str)
+    _writemeta(_dir, {
+        'columns': [str(_col) for _col in df.columns],
+        'dtypes': _dtypes,
+        'name': df.index.name,
+        'rows': int(df.shape[0]),
+        'start': pd.Timestamp(start).isoformat(),
+        'end': _coveredend(df, pd.Timestamp(start) - _ONEDAY, end).isoformat(),
+        })
+    _total = _addsize(_dirsize(_dir) - _prevsize)
+    if _settings['maxsize'] is not None and _total > _settings['maxsize']:
+        evict(_settings['maxsize'], keep=_dir)
+
+@_locked
+def info(symbol, source):
+    """
+    Return a description of the data cached for a symbol without loading it.
+
+    Parameters
+    ----------
+    symbol : str
+        Ticker symbol.
+    source : str
+        Data source from which the data was retrieved.
+
+    Returns
+    -------
+    out : dict or None
+        Dictionary with keys 'columns', 'rows', 'start', 'end' and 'last',
+        the date of the last cached session (`None` if no sessions are
+        cached). `None` if the symbol isn't cached.
+    """
+    _dir = _symboldir(symbol, source)
+    _meta = _readmeta(_dir)
+    if _meta is None:
+        return None
+    _last = None
+    if _meta['rows'] > 0:
+        _last = pd.Timestamp(_lastsession(_dir, _meta['rows']))
+    return {
+            'columns': _meta['columns'],
+            'rows': _meta['rows'],
+            'start': pd.Timestamp(_meta['start']),
+            'end': pd.Timestamp(_meta['end']),
+            'last': _last,
+            }
+
+@_locked
+def append(symbol, source, df, end):
+    """
+    Append sessions to the data cached for a symbol.
+
+    Existing data is not rewritten: each column file is extended in place
+    and the metadata is updated once the new rows have been written.
+
+    .. versionadded:: 1.1.0
+
+    Parameters
+    ----------
+    symbol : str
+        Ticker symbol, which must already be cached.
+    source : str
+        Data source from which the data was retrieved.
+    df : DataFrame
+        New sessions, all later than the last cached session and with
+        the same columns as the cached data, in any order.
+    end : date
+        End of the date range requested. As for :func:`save`, the range
+        recorded as covered ends with the last session in `df`.
+    """
+    _dir = _symboldir(symbol, source)
+    _meta = _readmeta(_dir)
+    if _meta is None:
+        raise KeyError("'{0}' not cached for source '{1}'".format(symbol, source))
+    if [str(_col) for _col in df.columns] != _meta['columns']:
+        raise ValueError("columns don't match cached data")
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index()
+    _rows = _meta['rows']
+    if _rows > 0 and len(df.index) > 0:
+        if pd.Timestamp(df.index[0]).value <= _lastsession(_dir, _rows):
+            raise ValueError("appended sessions must follow the last cached session")
+    _prevsize = _dirsize(_dir)
+    _appendfile(os.path.join(_dir, _INDEX), _rows,
+            pd.DatetimeIndex(df.index).values.astype('datetime64[ns]').view(np.int64))
+    for i in range(df.shape[1]):
+        _appendfile(os.path.join(_dir, _datafile(i)), _rows,
+                df.iloc[:, i].values.astype(np.dtype(_meta['dtypes'][i])))
+    _meta['rows'] = _rows + int(df.shape[0])
+    _meta['end'] = _coveredend(df, pd.Timestamp(_meta['end']), end).isoformat()
+    _writemeta(_dir, _meta)
+    _total = _addsize(_dirsize(_dir) - _prevsize)
+    if _settings['maxsize'] is not None and _total > _settings['maxsize']:
+        evict(_settings['maxsize'], keep=_dir)
+
+@_locked
+def invalidate(symbol, source=None):
+    """
+    Remove a symbol from the cache.
+
+    Parameters
+    ----------
+    symbol : str
+        Ticker symbol.
+    source : str, optional
+        Remove only data from the given source. By default
+        the symbol is removed for all sources.
+    """
+    _root = _pricesdir()
+    _sources = [source] if source is not None else _listdirs(_root)
+    for _source in _sources:
+        _dir = _symboldir(symbol, _source)
+        if os.path.isdir(_dir):
+            _size = _dirsize(_dir)
+            shutil.rmtree(_dir)
+            _addsize(-_size)
+
+@_locked
+def clear():
+    """
+    Remove all cached data.
+    """
+    _root = _pricesdir()
+    for _source in _listdirs(_root):
+        shutil.rmtree(os.path.join(_root, _source))
+    _writesize(0)
+
+@_locked
+def size():
+    """
+    Return the total size of the cache in bytes.
+    """
+    return sum(_entry[2] for _entry in _entries())
+
+@_locked
+def evict(maxsize, keep=None):
+    """
+    Evict least recently used symbols until the cache is no larger
+    than `maxsize` bytes.
+
+    Parameters
+    ----------
+    maxsize : int
+        Target size of the cache in bytes.
+    keep : str, optional
+        Symbol directory that must not be evicted.
+
+    Returns
+    -------
+    evicted : list of str
+        Directories removed from the cache.
+    """
+    _byuse = sorted(_entries())
+    _total = sum(_entry[2] for _entry in _byuse)
+    evicted = []
+    for _used, _dir, _size in _byuse:
+        if _total <= maxsize:
+            break
+        if _dir == keep:
+            continue
+        shutil.rmtree(_dir)
+        _total -= _size
+        evicted.append(_dir)
+    # the scan also corrects the running total
+    _writesize(_total)
+    return evicted
+
+def _entries():
+    # (last use, directory, size in bytes) for each cached symbol
+    _root = _pricesdir()
+    entries = []
+    for _source in _listdirs(_root):
+        for _symbol in _listdirs(os.path.join(_root, _source)):
+            _dir = os.path.join(_root, _source, _symbol)
+            _files = [os.path.join(_dir, _fname) for _fname in os.listdir(_dir)]
+            _metafile = os.path.join(_dir, _META)
+            _used = os.path.getmtime(_metafile) if os.path.isfile(_metafile) else 0.
+            entries.append((_used, _dir, sum(os.path.getsize(_fname) for _fname in _files)))
+    return entries
+
+def _dirsize(_dir):
+    if not os.path.isdir(_dir):
+        return 0
+    return sum(os.path.getsize(os.path.join(_dir, _fname)) for _fname in os.listdir(_dir))
+
+def _addsize(delta):
+    # update the running total, counted from scratch if it isn't recorded yet
+    _fname = os.path.join(_pricesdir(), _SIZE)
+    if os.path.isfile(_fname):
+        with open(_fname, 'r') as _f:
+            _total = json.load(_f)['bytes'] + delta
+    else:
+        _total = sum(_entry[2] for _entry in _entries())
+    _writesize(_total)
+    return _total
+
+def _writesize(total):
+    _root = _pricesdir()
+    if not os.path.isdir(_root):
+        os.makedirs(_root)
+    _fname = os.path.join(_root, _SIZE)
+    with open(_fname + '.tmp', 'w') as _f:
+        json.dump({'bytes': int(total)}, _f)
+    os.replace(_fname + '.tmp', _fname)
+
+def _coveredend(df, prevend, end):
+    # sessions after the last one returned, e.g. the current session, aren't covered
+    if len(df.index) == 0:
+        return prevend
+    return max(prevend, min(pd.Timestamp(end), pd.Timestamp(df.index.max())))
+
+def _requiredir():
+    if _settings['cachedir'] is None:
+        raise ValueError("cache directory not set, call set_cachedir() first")
+    return _settings['cachedir']
+
+def _pricesdir():
+    return os.path.join(_requiredir(), 'prices')
+
+def _symboldir(symbol, source):
+    _key = symbol.upper().replace('/', '_').replace('\\', '_')
+    return os.path.join(_pricesdir(), source, _key)
+
+def _datafile(i):
+    return '{0}.dat'.format(i)
+
+def _lastsession(_dir, rows):
+    # last value of the stored index as int64 nanoseconds
+    with open(os.path.join(_dir, _INDEX), 'rb') as _f:
+        _f.seek((rows - 1) * 8)
+        return np.frombuffer(_f.read(8), dtype=np.int64)[0]
+
+def _appendfile(fname, rows, values):
+    # drop anything left behind by an interrupted append before extending
+    with open(fname, 'r+b') as _f:
+        _f.truncate(rows * values.dtype.itemsize)
+        _f.seek(0, os.SEEK_END)
+        np.ascontiguousarray(values).tofile(_f)
+
+def _listdirs(path):
+    if not os.path.isdir(path):
+        return []
+    return [_name for _name in os.listdir(path) if os.path.isdir(os.path.join(path, _name))]
+
+def _readmeta(_dir):
+    _fname = os.path.join(_dir, _META)
+    if not os.path.isfile(_fname):
+        return None
+    with open(_fname, 'r') as _f:
+        return json.load(_f)
+
+def _writemeta(_dir, meta):
+    # meta is written last and atomically so that it only describes complete data
+    _fname = os.path.join(_dir, _META)
+    with open(_fname + '.tmp', 'w') as _f:
+        json.dump(meta, _f)
+    os.replace(_fname + '.tmp', _fname)
@@ -6,8 +6,19 @@ Data - combine features and labels (:mod:`pynance.data.combine`)
 ==================================================================
 
 .. currentmodule:: pynance.data.combine
+
+For universes too large to hold all features and labels in memory,
+:func:`minibatches` generates them chunk by chunk:
+
+>>> for features, labels, symbols, dates in pn.data.minibatches(eqdata, featfunc, labfunc, 256,
+...         shuffle=True, prefetch=4):
+...     train(features, labels)
 """
 
+import queue
+import threading
+
+import numpy as np
 import pandas as pd
 
 from . import feat
@@ -74,3 +85,274 @@ def labeledfeatures(eqdata, featurefunc, labelfunc):
     _labels, _skipatend = labelfunc(eqdata)
     _features, _skipatstart = featurefunc(eqdata.iloc[:(_size - _skipatend), :])
     return _features, _labels.iloc[_skipatstart:, :]
+
+def stackedfeatures(eqdata, featurefunc, labelfunc, **kwargs):
+    """
+    Return features and labels for a universe of equities, stacked
+    into single arrays for training.
+
+    .. versionadded:: 1.1.0
+
+    Features and labels are derived for each symbol as in
+    :func:`labeledfeatures`. The rows skipped at the start and end,
+    learned from the first symbol, give the number of rows of each
+    symbol, so that the output arrays are allocated once and each
+    symbol's rows are written straight into them. `featurefunc` and
+    `labelfunc` must therefore skip the same number of rows for all
+    symbols.
+
+    Parameters
+    ----------
+    eqdata : dict
+        DataFrames by symbol as returned by :func:`pynance.data.bulk.load_dir`
+        or, if `panel` is True, wide DataFrames keyed by field with one
+        column per symbol, cf. :mod:`pynance.data.adjust`.
+
+    featurefunc : function
+        Function returning features and the number of rows skipped at the
+        start, as for :func:`labeledfeatures`.
+
+    labelfunc : function
+        Function returning labels and the number of rows skipped at the
+        end, as for :func:`labeledfeatures`.
+
+    panel : bool, optional
+        Whether `eqdata` is a dictionary of wide DataFrames keyed by field.
+        Sessions on which all fields of a symbol are missing, e.g. before
+        its listing, are dropped for that symbol. Defaults to False.
+
+    Returns
+    -------
+    features : ndarray
+        Float64 array with one row per symbol and session, rows
+        of the same symbol being consecutive and in order of date.
+
+    labels : ndarray
+        Float64 array with one row for each row of `features`.
+
+    symbols : ndarray
+        Symbol of each row.
+
+    dates : ndarray
+        Date of each row.
+    """
+    _panel = kwargs.get('panel', False)
+    _symbols = _symbollist(eqdata, _panel)
+    if len(_symbols) == 0:
+        raise ValueError("no equity data")
+    _sizes = _sessioncounts(eqdata, _symbols, _panel)
+    _skips = {}
+    _featurefunc, _labelfunc = _recordskips(featurefunc, labelfunc, _skips)
+    _offset = 0
+    for _i, _symbol in enumerate(_symbols):
+        _features, _labels = labeledfeatures(_frame(eqdata, _symbol, _panel), _featurefunc, _labelfunc)
+        _featvalues = np.asarray(_features, dtype=np.float64).reshape((len(_labels), -1))
+        _labvalues = np.asarray(_labels, dtype=np.float64).reshape((len(_labels), -1))
+        if _i == 0:
+            _counts = np.maximum(_sizes - _skips['start'] - _skips['end'], 0)
+            _total = int(_counts.sum())
+            features = np.empty((_total, _featvalues.shape[1]), dtype=np.float64)
+            labels = np.empty((_total, _labvalues.shape[1]), dtype=np.float64)
+            dates = np.empty(_total, dtype=np.asarray(_labels.index).dtype)
+        if len(_labels) != _counts[_i]:
+            raise ValueError("featurefunc and labelfunc must skip the same number of rows for each symbol")
+        features[_offset:_offset + _counts[_i]] = _featvalues
+        labels[_offset:_offset + _counts[_i]] = _labvalues
+        dates[_offset:_offset + _counts[_i]] = np.asarray(_labels.index)
+        _offset += _counts[_i]
+    symbols = np.repeat(np.array(_symbols, dtype=object), _counts)
+    return features, labels, symbols, dates
+
+def minibatches(eqdata, featurefunc, labelfunc, batch_size, **kwargs):
+    """
+    Generate minibatches of features and labels for a universe of equities,
+    with memory bounded by the chunk and buffer sizes.
+
+    .. versionadded:: 1.1.0
+
+    The history of each symbol is processed in chunks of `chunksize`
+    sessions. Consecutive chunks overlap by `skipatstart + skipatend`
+    sessions, as returned by `featurefunc` and `labelfunc`, so that
+    each session yields exactly the features and labels it would yield
+    in :func:`stackedfeatures`, provided that features only depend on
+    the `skipatstart` previous sessions and labels on the `skipatend`
+    following sessions.
+
+    Parameters
+    ----------
+    eqdata : dict
+        DataFrames by symbol or, if `panel` is True, wide DataFrames keyed
+        by field, as for :func:`stackedfeatures`.
+
+    featurefunc : function
+        Function returning features and the number of rows skipped at the
+        start, as for :func:`labeledfeatures`.
+
+    labelfunc : function
+        Function returning labels and the number of rows skipped at the
+        end, as for :func:`labeledfeatures`.
+
+    batch_size : int
+        Number of rows per batch. Only the last batch may be smaller.
+
+    panel : bool, optional
+        Whether `eqdata` is a dictionary of wide DataFrames keyed by field.
+        Defaults to False.
+
+    chunksize : int, optional
+        Number of sessions per chunk. Must exceed `skipatstart + skipatend`.
+        Defaults to 4096.
+
+    shuffle : bool, optional
+        If True, symbols are visited in random order and rows are shuffled
+        within a buffer of `buffer_size` rows. Otherwise batches are in
+        order of symbol and date. Defaults to False.
+
+    buffer_size : int, optional
+        Number of rows shuffled together. Defaults to `16 * batch_size`.
+
+    seed : int, optional
+        Seed for shuffling.
+
+    prefetch : int, optional
+        If positive, batches are computed in a background thread up to
+        `prefetch` batches ahead. Defaults to 0.
+
+    Returns
+    -------
+    batches : generator
+        Tuples `(features, labels, symbols, dates)` of arrays as
+        returned by :func:`stackedfeatures`.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be positive")
+    _batches = _minibatches(eqdata, featurefunc, labelfunc, batch_size, kwargs)
+    if kwargs.get('prefetch', 0) > 0:
+        return _prefetched(_batches, kwargs['prefetch'])
+    return _batches
+
+def _minibatches(eqdata, featurefunc, labelfunc, batch_size, kwargs):
+    _shuffle = kwargs.get('shuffle', False)
+    _random = np.random.RandomState(kwargs.get('seed'))
+    _buffer_size = max(batch_size, kwargs.get('buffer_size', 16 * batch_size)) if _shuffle else batch_size
+    _panel = kwargs.get('panel', False)
+    _symbols = _symbollist(eqdata, _panel)
+    if _shuffle:
+        _symbols = [_symbols[_i] for _i in _random.permutation(len(_symbols))]
+    _pool = []
+    _n_pooled = 0
+    for _symbol in _symbols:
+        _df = _frame(eqdata, _symbol, _panel)
+        for _chunk in _chunks(_symbol, _df, featurefunc, labelfunc, kwargs.get('chunksize', 4096)):
+            _pool.append(_chunk)
+            _n_pooled += len(_chunk[0])
+            if _n_pooled >= _buffer_size:
+                _pool = _drain(_pool, batch_size, _shuffle, _random)
+                for _batch in _pool[:-1]:
+                    yield _batch
+                _pool = _pool[-1:]
+                _n_pooled = len(_pool[0][0])
+    if _n_pooled > 0:
+        for _batch in _drain(_pool, batch_size, _shuffle, _random):
+            if len(_batch[0]) > 0:
+                yield _batch
+
+def _chunks(symbol, df, featurefunc, labelfunc, chunksize):
+    # skips are learned from the first chunk
+    _skips = {}
+    _features, _labels = _recordskips(featurefunc, labelfunc, _skips)
+    _size = len(df.index)
+    _lo = 0
+    while True:
+        _hi = min(_size, _lo + chunksize)
+        _feats, _labs = labeledfeatures(df.iloc[_lo:_hi], _features, _labels)
+        _labvalues = np.asarray(_labs, dtype=np.float64).reshape((len(_labs), -1))
+        yield (np.asarray(_feats, dtype=np.float64).reshape((len(_labs), -1)), _labvalues,
+                np.full(len(_labs), symbol, dtype=object), np.asarray(_labs.index))
+        if _hi == _size:
+            return
+        _next = _hi - _skips['start'] - _skips['end']
+        if _next <= _lo:
+            raise ValueError("chunksize must exceed skipatstart + skipatend")
+        _lo = _next
+
+def _drain(chunks, batch_size, shuffle, random):
+    # full batches from the pooled chunks, followed by the remaining rows
+    _arrays = [np.concatenate([_chunk[_i] for _chunk in chunks]) for _i in range(4)]
+    if shuffle:
+        _order = random.permutation(len(_arrays[0]))
+        _arrays = [_values[_order] for _values in _arrays]
+    _n_full = len(_arrays[0]) // batch_size * batch_size
+    _batches = [tuple(_values[_start:_start + batch_size] for _values in _arrays)
+            for _start in range(0, _n_full, batch_size)]
+    _batches.append(tuple(_values[_n_full:] for _values in _arrays))
+    return _batches
+
+def _prefetched(batches, prefetch):
+    # producer thread, stopped when the consumer closes the generator
+    _queue = queue.Queue(maxsize=prefetch)
+    _stop = threading.Event()
+    _done = object()
+    def _put(item):
+        while not _stop.is_set():
+            try:
+                _queue.put(item, timeout=.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+    def _produce():
+        try:
+            for _batch in batches:
+                if not _put((_batch, None)):
+                    return
+            _put((_done, None))
+        except Exception as e:
+            _put((_done, e))
+    _thread = threading.Thread(target=_produce)
+    _thread.daemon = True
+    _thread.start()
+    try:
+        while True:
+            _batch, _error = _queue.get()
+            if _batch is _done:
+                if _error is not None:
+                    raise _error
+                return
+            yield _batch
+    finally:
+        _stop.set()
+
+def _symbollist(eqdata, panel):
+    if panel:
+        return list(eqdata[next(iter(eqdata))].columns)
+    return list(eqdata.keys())
+
+def _sessioncounts(eqdata, symbols, panel):
+    # number of sessions of the DataFrame of each symbol, cf. _frame()
+    if not panel:
+        return np.array([len(eqdata[_symbol].index) for _symbol in symbols], dtype=np.int64)
+    _index = eqdata[next(iter(eqdata))].index
+    for _field in eqdata:
+        _index = _index.union(eqdata[_field].index)
+    _present = np.zeros((len(_index), len(symbols)), dtype=bool)
+    for _field in eqdata:
+        _present |= eqdata[_field].reindex(index=_index, columns=symbols).notnull().values
+    return _present.sum(axis=0)
+
+def _recordskips(featurefunc, labelfunc, skips):
+    # featurefunc and labelfunc recording the rows they skip in skips
+    def _features(df):
+        _result, skips['start'] = featurefunc(df)
+        return _result, skips['start']
+    def _labels(df):
+        _result, skips['end'] = labelfunc(df)
+        return _result, skips['end']
+    return _features, _labels
+
+def _frame(eqdata, symbol, panel):
+    if not panel:
+        return eqdata[symbol]
+    _fields = list(eqdata.keys())
+    _df = pd.DataFrame({_field: eqdata[_field].loc[:, symbol] for _field in _fields}, columns=_fields)
+    return _df.dropna(how='all')
@@ -16,6 +16,15 @@ For example,
 >>> featfunc = pn.decorate(partial(pn.data.feat.fromfuncs, [fn1, fn2, fn3], skipatstart=averaging_window), 
         averaging_window + n_feature_sessions - 1)
 >>> features, labels = pn.data.labeledfeatures(eqdata, featfunc, labelfunc) 
+
+With `lazy=True`, :func:`fromcols` and :func:`fromfuncs` return a
+:class:`FeatureMatrix`, which keeps only the source values, one per
+session and series, and materializes rows on demand, so that memory
+is bounded by the batch size rather than by the number of features:
+
+>>> features = pn.data.feat.fromcols(['Close', 'Volume'], 250, eqdata, lazy=True)
+>>> for batch in features.iter_batches(1024):
+...     train(batch)
 """
 
 from functools import partial
@@ -23,6 +32,145 @@ from functools import partial
 import numpy as np
 import pandas as pd
 
+from ..common import windows
+
+class FeatureMatrix(object):
+    """
+    Feature matrix whose rows are materialized on demand.
+
+    .. versionadded:: 1.1.0
+
+    Row `i` contains the optional constant feature followed, for each
+    series, by its values over the `n_sessions` sessions ending at session
+    `skipatstart + n_sessions - 1 + i` of `values`, as returned
+    by :func:`fromcols` and :func:`fromfuncs`.
+
+    Parameters
+    ----------
+    values : ndarray
+        Source values of shape (sessions, series).
+    n_sessions : int
+        Number of sessions over which to create features.
+    index : Index
+        Index of the rows of the materialized features.
+    columns : list of str
+        Columns of the materialized features.
+    constfeat : bool, optional
+        Whether or not the features have the constant feature.
+        Defaults to True.
+    skipatstart : int, optional
+        Number of sessions at the start of `values` not ending a window.
+        Defaults to 0.
+
+    Examples
+    --------
+    >>> features = pn.data.feat.fromcols(['Close'], 20, eqdata, lazy=True)
+    >>> features.shape
+    >>> first = features[:100]
+    >>> batches = features.iter_batches(256, outputtype=pd.DataFrame)
+    """
+    def __init__(self, values, n_sessions, index, columns, constfeat=True, skipatstart=0):
+        self.values = np.asarray(values, dtype=np.float64).reshape((len(values), -1))
+        self.n_sessions = n_sessions
+        self.columns = list(columns)
+        self.constfeat = constfeat
+        self.skipatstart = skipatstart
+        _nrows = len(self.values) - skipatstart - n_sessions + 1
+        if _nrows < 0:
+            raise ValueError("not enough sessions for the given n_sessions and skipatstart")
+        if len(index) != _nrows:
+            raise ValueError("index must have one entry per row of features")
+        self.index = index
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def shape(self):
+        """
+        Shape (rows, features) of the materialized features.
+        """
+        return (len(self.index), len(self.columns))
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            _start, _stop, _step = key.indices(len(self))
+            if _step == 1:
+                return self.materialize(_start, max(_start, _stop))
+            key = np.arange(_start, _stop, _step)
+        _rows = np.arange(len(self))[key]
+        if _rows.ndim == 0:
+            return self.materialize(int(_rows), int(_rows) + 1)[0]
+        return self._take(_rows)
+
+    def materialize(self, start=0, stop=None, out=None, **kwargs):
+        """
+        Materialize consecutive rows.
+
+        Parameters
+        ----------
+        start : int, optional
+            First row. Defaults to 0.
+        stop : int, optional
+            Row after the last. Defaults to the number of rows.
+        out : ndarray, optional
+            Float64 array of shape `(stop - start, features)` to fill.
+        outputtype : type, optional
+            `np.ndarray` or `pd.DataFrame`. Defaults to `np.ndarray`.
+
+        Returns
+        ----------
+        features : ndarray or DataFrame
+        """
+        _stop = len(self) if stop is None else stop
+        if out is None:
+            out = np.empty((_stop - start, len(self.columns)), dtype=np.float64)
+        elif out.shape != (_stop - start, len(self.columns)) or out.dtype != np.float64:
+            raise ValueError("out must be a float64 array of shape {}".format((_stop - start, len(self.columns))))
+        _first = self.skipatstart + start
+        if _stop > start:
+            self._fill(windows(self.values[_first:(_first + _stop - start + self.n_sessions - 1)],
+                self.n_sessions), out)
+        if kwargs.get('outputtype', np.ndarray) is pd.DataFrame:
+            return pd.DataFrame(out, index=self.index[start:_stop], columns=self.columns, copy=False)
+        return out
+
+    def iter_batches(self, batch_size, **kwargs):
+        """
+        Generate the materialized features in consecutive batches of rows.
+
+        Parameters
+        ----------
+        batch_size : int
+            Number of rows per batch. The last batch may be smaller.
+        outputtype : type, optional
+            `np.ndarray` or `pd.DataFrame`. Defaults to `np.ndarray`.
+
+        Returns
+        ----------
+        batches : generator of ndarray or DataFrame
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+        for _start in range(0, len(self), batch_size):
+            yield self.materialize(_start, min(_start + batch_size, len(self)), **kwargs)
+
+    def _take(self, rows):
+        _out = np.empty((len(rows), len(self.columns)), dtype=np.float64)
+        _ends = self.skipatstart + rows[:, np.newaxis] + np.arange(self.n_sessions)
+        self._fill(np.swapaxes(self.values[_ends], 1, 2), _out)
+        return _out
+
+    def _fill(self, view, out):
+        # view has shape (rows, series, n_sessions)
+        _offset = 0
+        if self.constfeat:
+            out[:, 0] = 1.
+            _offset += 1
+        for _i in range(view.shape[1]):
+            out[:, _offset:_offset + self.n_sessions] = view[:, _i]
+            _offset += self.n_sessions
+
 def add_const(features):
     """
     Prepend the constant feature 1 as first feature and return the modified
@@ -45,6 +193,9 @@ def fromcols(selection, n_sessions, eqdata, **kwargs):
     """
     Generate features from selected columns of a dataframe.
 
+    .. versionchanged:: 1.1.0
+       Built from :func:`pynance.common.windows` in a single copy, with ndarray output.
+
     Parameters
     ----------
     selection : list or tuple of str
@@ -62,36 +213,37 @@ def fromcols(selection, n_sessions, eqdata, **kwargs):
         Whether or not the returned features will have the constant
         feature.
 
+    outputtype : type, optional
+        `pd.DataFrame` or `np.ndarray`. Defaults to `pd.DataFrame`.
+
+    lazy : bool, optional
+        If True, return a :class:`FeatureMatrix` materializing
+        rows on demand. Defaults to False.
+
     Returns
     ----------
-    features : DataFrame
+    features : DataFrame, ndarray or FeatureMatrix
     """
     _constfeat = kwargs.get('constfeat', True)
     _outcols = ['Constant'] if _constfeat else []
-    _n_rows = len(eqdata.index)
     for _col in selection:
         _outcols += map(partial(_concat, strval=' ' + _col), range(-n_sessions + 1, 1))
-    _features = pd.DataFrame(index=eqdata.index[n_sessions - 1:], columns=_outcols, dtype=np.float64)
-    _offset = 0
-    if _constfeat:
-        _features.iloc[:, 0] = 1.
-        _offset += 1
-    for _col in selection:
-        _values = eqdata.loc[:, _col].values
-        for i in range(n_sessions):
-            _features.iloc[:, _offset + i] = _values[i:_n_rows - n_sessions + i + 1]
-        _offset += n_sessions
-    return _features
+    _values = eqdata.loc[:, list(selection)].values.astype(np.float64)
+    return _output(FeatureMatrix(_values, n_sessions, eqdata.index[n_sessions - 1:], _outcols,
+        constfeat=_constfeat), kwargs)
 
 def fromfuncs(funcs, n_sessions, eqdata, **kwargs):
     """
     Generate features using a list of functions to apply to input data
 
+    .. versionchanged:: 1.1.0
+       Built from :func:`pynance.common.windows` in a single copy, with ndarray output.
+
     Parameters
     ----------
     funcs : list of function
         Functions to apply to eqdata. Each function is expected
-        to output a dataframe with index identical to a slice of `eqdata`.
+        to output a single-column dataframe with index identical to a slice of `eqdata`.
         The slice must include at least `eqdata.index[skipatstart + n_sessions - 1:]`.
         Each function is also expected to have a function attribute
         `title`, which is used to generate the column names of the
@@ -115,31 +267,44 @@ def fromfuncs(funcs, n_sessions, eqdata, **kwargs):
         functions calculating volume relative to a past baseline.
         Defaults to 0.
 
+    outputtype : type, optional
+        `pd.DataFrame` or `np.ndarray`. Defaults to `pd.DataFrame`.
+
+    lazy : bool, optional
+        If True, return a :class:`FeatureMatrix` materializing
+        rows on demand. The functions are still applied immediately.
+        Defaults to False.
+
     Returns
     ----------
-    features : DataFrame
+    features : DataFrame, ndarray or FeatureMatrix
     """
     _skipatstart = kwargs.get('skipatstart', 0)
     _constfeat = kwargs.get('constfeat', True)
     _outcols = ['Constant'] if _constfeat else []
     _n_allrows = len(eqdata.index)
     _n_featrows = _n_allrows - _skipatstart - n_sessions + 1
+    if _n_featrows < 0:
+        raise ValueError("not enough sessions for the given n_sessions and skipatstart")
     for _func in funcs:
         _outcols += map(partial(_concat, strval=' ' + _func.title), range(-n_sessions + 1, 1))
-    _features = pd.DataFrame(index=eqdata.index[_skipatstart + n_sessions - 1:],
-            columns=_outcols, dtype=np.float64)
-    _offset = 0
-    if _constfeat:
-        _features.iloc[:, 0] = 1.
-        _offset += 1
-    for _func in funcs:
-        _values = _func(eqdata).values
-        _n_values = len(_values)
-        for i in range(n_sessions):
-            _val_end = _n_values - n_sessions + i + 1
-            _features.iloc[:, _offset + i] = _values[_val_end - _n_featrows:_val_end]
-        _offset += n_sessions
-    return _features
+    # only the sessions used by some window are kept
+    _n_used = _n_featrows + n_sessions - 1
+    _values = np.empty((_n_used, len(funcs)), dtype=np.float64)
+    for _i, _func in enumerate(funcs):
+        _funcvalues = np.asarray(_func(eqdata), dtype=np.float64)
+        if _funcvalues.ndim > 1 and _funcvalues.shape[1] != 1:
+            raise ValueError("function '{0}' must return a single column, not {1}".format(
+                _func.title, _funcvalues.shape[1]))
+        _funcvalues = _funcvalues.reshape(-1)
+        _values[:, _i] = _funcvalues[len(_funcvalues) - _n_used:]
+    return _output(FeatureMatrix(_values, n_sessions, eqdata.index[_skipatstart + n_sessions - 1:], _outcols,
+        constfeat=_constfeat), kwargs)
+
+def _output(features, kwargs):
+    if kwargs.get('lazy', False):
+        return features
+    return features.materialize(outputtype=kwargs.get('outputtype', pd.DataFrame))
 
 def _concat(intval, strval):
     return str(intval) + strval
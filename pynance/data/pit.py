@@ -0,0 +1,255 @@
+"""
+.. Copyright (c) 2014- Marshall Farrier
+   license http://opensource.org/licenses/MIT
+
+Data - point-in-time versions (:mod:`pynance.data.pit`)
+==========================================================
+
+.. currentmodule:: pynance.data.pit
+
+.. versionadded:: 1.1.0
+
+Bitemporal storage of price histories, so that backtests can use
+the data as it was known on a given date rather than as later restated
+by the vendor.
+
+Each stored row has a value date (the session) and a knowledge date
+(when the values were retrieved). Rows are kept sorted by value date,
+then by knowledge date, and a row is only stored if its values differ
+from the latest version already stored for the same session, so that
+recording a full history every day only adds new sessions and
+restatements.
+
+When recording is enabled with :func:`set_recording`, data retrieved
+from a provider by :func:`pynance.data.retrieve.get` and
+:func:`pynance.data.retrieve.update` is recorded with the current time
+(UTC) as knowledge date. Versions are stored below the cache directory
+(cf. :func:`pynance.data.cache.set_cachedir`) in
+`<cachedir>/pit/<source>/<SYMBOL>.npz`.
+
+Examples
+--------
+>>> import pynance as pn
+>>> pn.data.cache.set_cachedir('~/.pynance/cache')
+>>> pn.data.pit.set_recording(True)
+>>> ge = pn.data.get('ge', '2014', '2015')
+>>> # as known at the end of 2015, without later restatements
+>>> ge = pn.data.get('ge', '2014', '2015', as_of='2015-12-31')
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from . import cache
+
+_settings = {'recording': False}
+
+class VersionedFrame(object):
+    """
+    Versions of the price history of a single equity.
+
+    Parameters
+    ----------
+    columns : list of str
+        Columns of the DataFrames to be recorded.
+    dtypes : list of str, optional
+        Dtype of each column in the DataFrames returned by :meth:`as_of`.
+        Values are stored as `float64`. Defaults to `float64` for all columns.
+    """
+    def __init__(self, columns, dtypes=None, **arrays):
+        self.columns = [str(_col) for _col in columns]
+        self.dtypes = [str(_dtype) for _dtype in dtypes] if dtypes is not None \
+                else ['float64'] * len(self.columns)
+        if len(arrays) > 0:
+            # restore from arrays, cf. load()
+            self._vdates = arrays['vdates']
+            self._kdates = arrays['kdates']
+            self._values = arrays['values']
+            return
+        self._vdates = np.empty(0, dtype=np.int64)
+        self._kdates = np.empty(0, dtype=np.int64)
+        self._values = np.empty((0, len(self.columns)), dtype=np.float64)
+
+    def __len__(self):
+        return len(self._vdates)
+
+    @property
+    def last_known(self):
+        """
+        Latest knowledge date recorded, or `None` if empty.
+        """
+        if len(self._kdates) == 0:
+            return None
+        return pd.Timestamp(self._kdates.max())
+
+    def record(self, df, known):
+        """
+        Record a DataFrame retrieved at time `known`.
+
+        Only sessions that are new or whose values differ from the
+        latest recorded version are stored. Sessions missing from
+        `df` are left unchanged.
+
+        Parameters
+        ----------
+        df : DataFrame
+            Data indexed by session, containing all of :attr:`columns`.
+        known : datetime
+            Knowledge date. Must not precede any knowledge date
+            already recorded.
+
+        Returns
+        -------
+        added : int
+            Number of rows stored.
+        """
+        _known = _ns(known)
+        if len(self._kdates) > 0 and _known < self._kdates.max():
+            raise ValueError("knowledge date precedes recorded versions")
+        _vdates = pd.DatetimeIndex(df.index).values.astype('datetime64[ns]').view(np.int64)
+        _values = df.loc[:, self.columns].values.astype(np.float64)
+        _order = np.argsort(_vdates, kind='mergesort')
+        _vdates = _vdates[_order]
+        _values = _values[_order]
+        # the latest version of each session is the last row of its group
+        _pos = np.searchsorted(self._vdates, _vdates, side='right')
+        _found = _pos > 0
+        _found[_found] = self._vdates[_pos[_found] - 1] == _vdates[_found]
+        _changed = ~_found
+        _prev = self._values[_pos[_found] - 1]
+        _cur = _values[_found]
+        _changed[_found] = ~((_prev == _cur) | (np.isnan(_prev) & np.isnan(_cur))).all(axis=1)
+        _pos = _pos[_changed]
+        self._vdates = np.insert(self._vdates, _pos, _vdates[_changed])
+        self._kdates = np.insert(self._kdates, _pos, np.full(len(_pos), _known, dtype=np.int64))
+        self._values = np.insert(self._values, _pos, _values[_changed], axis=0)
+        return len(_pos)
+
+    def as_of(self, known, start=None, end=None):
+        """
+        Return the history as known at time `known`.
+
+        Parameters
+        ----------
+        known : datetime
+            Knowledge date.
+        start : date, optional
+            First session to return.
+        end : date, optional
+            Last session to return.
+
+        Returns
+        -------
+        df : DataFrame
+            For each session from `start` to `end` already recorded at time `known`,
+            the latest version recorded no later than `known`.
+        """
+        _lo = 0 if start is None else np.searchsorted(self._vdates, _ns(start), side='left')
+        _hi = len(self._vdates) if end is None else np.searchsorted(self._vdates, _ns(end), side='right')
+        _vdates = self._vdates[_lo:_hi]
+        _rows = np.empty(0, dtype=np.int64)
+        if len(_vdates) > 0:
+            _starts = np.flatnonzero(np.concatenate(([True], _vdates[1:] != _vdates[:-1])))
+            # knowledge dates are ascending within each session, so known versions are a prefix
+            _counts = np.add.reduceat((self._kdates[_lo:_hi] <= _ns(known)).astype(np.int64), _starts)
+            _keep = _counts > 0
+            _rows = _lo + _starts[_keep] + _counts[_keep] - 1
+        _index = pd.DatetimeIndex(self._vdates[_rows].view('datetime64[ns]'), name='Date')
+        df = pd.DataFrame(self._values[_rows], index=_index, columns=self.columns)
+        for _col, _dtype in zip(self.columns, self.dtypes):
+            if _dtype != 'float64' and not df[_col].isnull().any():
+                df[_col] = df[_col].astype(_dtype)
+        return df
+
+    def save(self, fname):
+        """
+        Save to a `.npz` file, replacing any existing file atomically.
+        """
+        with open(fname + '.tmp', 'wb') as _f:
+            np.savez(_f, vdates=self._vdates, kdates=self._kdates, values=self._values,
+                    columns=np.array(self.columns, dtype=str), dtypes=np.array(self.dtypes, dtype=str))
+        os.replace(fname + '.tmp', fname)
+
+    @classmethod
+    def load(cls, fname):
+        """
+        Load versions saved with :meth:`save`.
+        """
+        with np.load(fname, allow_pickle=False) as _arrays:
+            return cls(_arrays['columns'].tolist(), _arrays['dtypes'].tolist(),
+                    vdates=_arrays['vdates'], kdates=_arrays['kdates'], values=_arrays['values'])
+
+def set_recording(recording):
+    """
+    Enable or disable recording of retrieved data.
+
+    Recording requires a cache directory, cf. :func:`pynance.data.cache.set_cachedir`.
+    """
+    _settings['recording'] = bool(recording)
+
+def recording():
+    """
+    Return True iff retrieved data is being recorded.
+    """
+    return _settings['recording'] and cache.enabled()
+
+def load(symbol, source):
+    """
+    Return the :class:`VersionedFrame` recorded for `symbol` from `source`,
+    or `None` if nothing has been recorded.
+    """
+    _fname = _symbolfile(symbol, source)
+    if not os.path.isfile(_fname):
+        return None
+    return VersionedFrame.load(_fname)
+
+def record(symbol, source, df, known=None):
+    """
+    Record data for `symbol` retrieved from `source`.
+
+    Parameters
+    ----------
+    symbol : str
+        Ticker symbol.
+    source : str
+        Name of the provider.
+    df : DataFrame
+        Retrieved data indexed by session.
+    known : datetime, optional
+        Knowledge date. Defaults to the current time (UTC).
+
+    Returns
+    -------
+    added : int
+        Number of rows stored. Cf. :meth:`VersionedFrame.record`.
+    """
+    _known = pd.Timestamp.utcnow().tz_localize(None) if known is None else known
+    versions = load(symbol, source)
+    if versions is None:
+        versions = VersionedFrame(df.columns, [str(_dtype) for _dtype in df.dtypes])
+    added = versions.record(df, _known)
+    if added > 0:
+        _fname = _symbolfile(symbol, source)
+        if not os.path.isdir(os.path.dirname(_fname)):
+            os.makedirs(os.path.dirname(_fname))
+        versions.save(_fname)
+    return added
+
+def as_of(symbol, source, known, start=None, end=None):
+    """
+    Return the history of `symbol` from `source` as known at time `known`.
+    Cf. :meth:`VersionedFrame.as_of`.
+    """
+    versions = load(symbol, source)
+    if versions is None:
+        raise KeyError("no versions recorded for symbol '{0}' from '{1}'".format(symbol, source))
+    return versions.as_of(known, start, end)
+
+def _ns(date):
+    return pd.Timestamp(date).value
+
+def _symbolfile(symbol, source):
+    _key = symbol.upper().replace('/', '_').replace('\\', '_')
+    return os.path.join(cache._requiredir(), 'pit', source, _key + '.npz')
@@ -6,6 +6,16 @@ Data - preprocessing functions (:mod:`pynance.data.prep`)
 =========================================================
 
 .. currentmodule:: pynance.data.prep
+
+:func:`center` and :func:`normalize` adjust a data set held in memory.
+For data arriving in chunks, e.g. from :func:`pynance.data.combine.minibatches`,
+a :class:`Scaler` accumulates means and standard deviations in a single pass:
+
+>>> scaler = pn.data.Scaler()
+>>> for chunk in chunks:
+...     scaler.partial_fit(chunk)
+>>> scaler.transform(chunk, out=chunk)
+>>> means, sds = scaler.adjustments()
 """
 
 import numpy as np
@@ -47,6 +57,179 @@ def center(dataset, out=None):
     """
     return _preprocess(_center_fn, dataset, out)
 
+class Scaler(object):
+    """
+    Center and normalize data using means and standard deviations
+    accumulated over successive chunks.
+
+    .. versionadded:: 1.1.0
+
+    Statistics of each chunk are merged into the running statistics with
+    the pairwise update of Chan, Golub and LeVeque, so that the result
+    agrees to within rounding error with that of :func:`center` and
+    :func:`normalize` applied to all chunks at once, without requiring
+    a second pass over centered data.
+
+    Examples
+    --------
+    >>> scaler = pn.data.Scaler()
+    >>> scaler.partial_fit(features.iloc[:1000, 1:])
+    >>> scaler.partial_fit(features.iloc[1000:, 1:])
+    >>> _ = scaler.transform(features.iloc[:, 1:], out=features.iloc[:, 1:])
+    >>> state = scaler.snapshot()
+    >>> scaler = pn.data.Scaler.restore(state)
+    """
+    def __init__(self):
+        self.count = 0
+        self.columns = None
+        self._mean = None
+        self._ssqdm = None
+
+    def partial_fit(self, chunk):
+        """
+        Update means and standard deviations with a chunk of data.
+
+        Parameters
+        ----------
+        chunk : DataFrame or ndarray
+            Rows of data with the same columns as previous chunks.
+
+        Returns
+        ----------
+        self : Scaler
+        """
+        if isinstance(chunk, pd.DataFrame):
+            if self.columns is None:
+                self.columns = [str(_col) for _col in chunk.columns]
+            _data = chunk.values
+        else:
+            _data = chunk
+        _n = _data.shape[0]
+        if _n == 0:
+            return self
+        _mean = np.mean(_data, axis=0, dtype=np.float64)
+        _dev = _data - _mean
+        _ssqdm = np.einsum('ij,ij->j', _dev, _dev)
+        if self.count == 0:
+            self._mean = _mean
+            self._ssqdm = _ssqdm
+        else:
+            if _mean.shape != self._mean.shape:
+                raise ValueError("chunk must have {} columns".format(len(self._mean)))
+            _total = self.count + _n
+            _delta = _mean - self._mean
+            self._mean = self._mean + _delta * (float(_n) / _total)
+            self._ssqdm = self._ssqdm + _ssqdm + _delta * _delta * (float(self.count) * _n / _total)
+        self.count += _n
+        return self
+
+    def fit(self, dataset):
+        """
+        Reset and fit means and standard deviations to a data set.
+
+        Returns
+        ----------
+        self : Scaler
+        """
+        self.__init__()
+        return self.partial_fit(dataset)
+
+    @property
+    def mean(self):
+        """
+        Means of the data fitted, with shape (1, columns).
+        """
+        self._checkfitted()
+        return self._mean.reshape((1, -1))
+
+    @property
+    def std(self):
+        """
+        Standard deviations of the data fitted, with shape (1, columns),
+        calculated as by `np.std()`.
+        """
+        self._checkfitted()
+        return np.sqrt(self._ssqdm / self.count).reshape((1, -1))
+
+    def adjustments(self):
+        """
+        Return the means and standard deviations in the form returned
+        by :func:`center` and :func:`normalize`.
+
+        Returns
+        ----------
+        means, sds : DataFrame or ndarray
+            DataFrames if the data fitted were DataFrames.
+        """
+        if self.columns is None:
+            return self.mean, self.std
+        return pd.DataFrame(data=self.mean, index=['Mean'], columns=self.columns, dtype='float64'), \
+                pd.DataFrame(data=self.std, index=['Mean'], columns=self.columns, dtype='float64')
+
+    def transform(self, chunk, out=None):
+        """
+        Return a chunk centered and normalized.
+
+        Parameters
+        ----------
+        chunk : DataFrame or ndarray
+
+        out : DataFrame or ndarray, optional
+            Alternate output array in which to place the result,
+            which may be `chunk` itself. If provided, it must have
+            the same shape and type (DataFrame or ndarray) as the
+            expected output.
+
+        Returns
+        ----------
+        out : DataFrame or ndarray
+            The output data is of the same type as the input.
+        """
+        _mean = self.mean
+        _std = self.std
+        _data = chunk.values if isinstance(chunk, pd.DataFrame) else chunk
+        if isinstance(out, np.ndarray):
+            np.subtract(_data, _mean, out=out)
+            out /= _std
+            return out
+        _processed = _data - _mean
+        _processed /= _std
+        if out is not None:
+            out.values[:, :] = _processed
+            return out
+        if isinstance(chunk, pd.DataFrame):
+            return pd.DataFrame(data=_processed, index=chunk.index, columns=chunk.columns, dtype='float64')
+        return _processed
+
+    def snapshot(self):
+        """
+        Return the state of the scaler as a dictionary, which
+        can be serialized as JSON.
+        """
+        return {
+                'count': self.count,
+                'columns': self.columns,
+                'mean': None if self._mean is None else self._mean.tolist(),
+                'ssqdm': None if self._ssqdm is None else self._ssqdm.tolist(),
+                }
+
+    @classmethod
+    def restore(cls, state):
+        """
+        Return a scaler with the state returned by `snapshot()`.
+        """
+        scaler = cls()
+        scaler.count = state['count']
+        scaler.columns = state['columns']
+        if state['mean'] is not None:
+            scaler._mean = np.array(state['mean'], dtype=np.float64)
+            scaler._ssqdm = np.array(state['ssqdm'], dtype=np.float64)
+        return scaler
+
+    def _checkfitted(self):
+        if self.count == 0:
+            raise ValueError("scaler has not been fitted")
+
 def _preprocess(func, dataset, out):
     # Generic preprocessing function used in center() and normalize()
     is_df = isinstance(dataset, pd.DataFrame)
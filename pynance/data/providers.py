@@ -0,0 +1,278 @@
+"""
+.. Copyright (c) 2014- Marshall Farrier
+   license http://opensource.org/licenses/MIT
+
+Data - data providers (:mod:`pynance.data.providers`)
+========================================================
+
+.. currentmodule:: pynance.data.providers
+
+.. versionadded:: 1.1.0
+
+Sources of daily bars used by :func:`pynance.data.retrieve.get` and related
+functions. A provider can be selected for a single call by passing
+it as the `provider` keyword argument or globally with :func:`set_provider`.
+
+Built-in providers:
+
+- :class:`DataReaderProvider` : remote data via `pandas_datareader`.
+  This is the default, using source 'stooq'.
+- :class:`FileProvider` : a directory of CSV or Parquet files, one per symbol.
+- :class:`FixtureProvider` : DataFrames held in memory.
+
+Custom providers subclass :class:`Provider` and implement
+:meth:`Provider.bars` and :meth:`Provider.symbols`.
+
+Examples
+--------
+>>> import pynance as pn
+>>> pn.data.providers.set_provider(pn.data.providers.FileProvider('/data/bars'))
+>>> ge = pn.data.get('ge', '2014', '2015')
+>>> aapl = pn.data.get('aapl', '2014', '2015', provider=pn.data.providers.DataReaderProvider())
+"""
+
+import asyncio
+import os
+
+import pandas as pd
+import pandas_datareader.data as web
+from pandas_datareader.stooq import StooqDailyReader
+
+from . import bulk
+
+STOOQ_URL = 'https://stooq.com/q/d/l/'
+_STOOQ_SUFFIXES = ('de', 'hk', 'hu', 'jp', 'uk', 'us', 'f', 'b')
+
+class Provider(object):
+    """
+    Base class for providers.
+
+    Attributes
+    ----------
+    name : str
+        Name under which data from the provider is cached.
+    cacheable : bool
+        Whether data from the provider should be stored in the
+        local cache (:mod:`pynance.data.cache`). Local providers
+        aren't cached.
+    """
+    name = None
+    cacheable = False
+
+    def bars(self, symbol, start, end, **kwargs):
+        """
+        Return a DataFrame of daily bars for `symbol` from `start` to `end`
+        inclusive, indexed by date in ascending order.
+        """
+        raise NotImplementedError
+
+    def symbols(self):
+        """
+        Return a list of the symbols available from the provider.
+        """
+        raise NotImplementedError
+
+    async def fetch(self, symbol, start, end):
+        """
+        Coroutine version of :meth:`bars` for use with
+        :mod:`pynance.data.aretrieve`. By default :meth:`bars`
+        is run in the event loop's default executor.
+        """
+        _loop = asyncio.get_running_loop()
+        return await _loop.run_in_executor(None, self.bars, symbol, start, end)
+
+class DataReaderProvider(Provider):
+    """
+    Remote data retrieved using `pandas_datareader`.
+
+    Parameters
+    ----------
+    source : str, optional
+        Data source passed to `pandas_datareader.data.DataReader`.
+        Defaults to 'stooq'.
+
+    Additional keyword arguments are passed to the reader for each request.
+    For source 'stooq' these may include `timeout`, the timeout in seconds
+    of each HTTP request, which defaults to 30.
+    """
+    cacheable = True
+
+    def __init__(self, source='stooq', **kwargs):
+        self.name = source
+        self.kwargs = kwargs
+
+    def bars(self, symbol, start, end, **kwargs):
+        _kwargs = dict(self.kwargs)
+        _kwargs.update(kwargs)
+        if self.name == 'stooq':
+            # reader supporting `timeout` and `url`, which like DataReader doesn't need an API key
+            _kwargs.pop('api_key', None)
+            _timeout = _kwargs.pop('timeout', 30.)
+            _reader = _StooqReader(symbols=symbol, start=start, end=end, chunksize=25, **_kwargs)
+            _reader.timeout = _timeout
+            df = _reader.read()
+        else:
+            df = web.DataReader(symbol, self.name, start, end, **_kwargs)
+        df.index = pd.to_datetime(df.index)
+        return df.sort_index()
+
+    def symbols(self):
+        from .retrieve import equities
+        return equities().index.tolist()
+
+class FileProvider(Provider):
+    """
+    Daily bars stored in a directory with one file per symbol,
+    e.g. 'AAPL.csv'. Symbols are matched case-insensitively.
+
+    Parameters
+    ----------
+    directory : str
+        Directory containing the files.
+    fmt : str, optional
+        'csv' (default) or 'parquet'. Reading Parquet files
+        requires `pyarrow` or `fastparquet`. CSV files are read with
+        :func:`pynance.data.bulk.read_bars`.
+    """
+    name = 'file'
+
+    def __init__(self, directory, fmt='csv'):
+        if fmt not in ('csv', 'parquet'):
+            raise ValueError("invalid format '{0}'".format(fmt))
+        self.directory = directory
+        self.fmt = fmt
+        self._paths = None
+
+    def bars(self, symbol, start, end, **kwargs):
+        _path = self._getpaths().get(symbol.upper())
+        if _path is None:
+            raise KeyError("no file for symbol '{0}' in {1}".format(symbol, self.directory))
+        if self.fmt == 'csv':
+            return _slice(bulk.read_bars(_path), start, end)
+        df = pd.read_parquet(_path)
+        df.index = pd.to_datetime(df.index)
+        return _slice(df.sort_index(), start, end)
+
+    def symbols(self):
+        return sorted(self._getpaths().keys())
+
+    def refresh(self):
+        """
+        Rescan the directory for files added or removed.
+        """
+        self._paths = None
+
+    def _getpaths(self):
+        if self._paths is None:
+            _ext = '.' + self.fmt
+            self._paths = {}
+            for _fname in os.listdir(self.directory):
+                _stem, _fext = os.path.splitext(_fname)
+                if _fext.lower() == _ext:
+                    self._paths[_stem.upper()] = os.path.join(self.directory, _fname)
+        return self._paths
+
+class FixtureProvider(Provider):
+    """
+    Daily bars held in memory, e.g. for tests and offline benchmarks.
+
+    Parameters
+    ----------
+    frames : dict
+        DataFrames indexed by date, keyed by symbol. Symbols are
+        matched case-insensitively.
+    """
+    name = 'fixture'
+
+    def __init__(self, frames):
+        self.frames = {_symbol.upper(): _df.sort_index() for _symbol, _df in frames.items()}
+
+    def bars(self, symbol, start, end, **kwargs):
+        return _slice(self.frames[symbol.upper()], start, end).copy()
+
+    def symbols(self):
+        return sorted(self.frames.keys())
+
+    async def fetch(self, symbol, start, end):
+        return self.bars(symbol, start, end)
+
+_settings = {'provider': None}
+
+def set_provider(provider):
+    """
+    Set the provider used when none is passed explicitly.
+
+    Parameters
+    ----------
+    provider : :class:`Provider` or None
+        Pass `None` to restore the default provider.
+    """
+    _settings['provider'] = provider
+
+def get_provider(provider=None):
+    """
+    Return `provider` if given, else the global provider.
+    """
+    if provider is not None:
+        return provider
+    if _settings['provider'] is not None:
+        return _settings['provider']
+    return _default
+
+def configured_provider():
+    """
+    Return the provider set with :func:`set_provider`, or `None`
+    if the default provider is in use.
+    """
+    return _settings['provider']
+
+class _StooqReader(StooqDailyReader):
+    # allows the URL to be pointed at a local server
+    def __init__(self, *args, **kwargs):
+        self._url = kwargs.pop('url', None)
+        super(_StooqReader, self).__init__(*args, **kwargs)
+
+    @property
+    def url(self):
+        return self._url or STOOQ_URL
+
+def stooq_params(symbol, start, end):
+    """
+    Return the query parameters requesting daily data for `symbol`
+    from :data:`STOOQ_URL`.
+
+    Parameters
+    ----------
+    symbol : str
+        Symbol, taken to be a US listing unless it starts with '^'
+        or has the suffix of another market, such as 'sap.de'.
+    start : str or datetime
+        First date requested.
+    end : str or datetime
+        Last date requested.
+
+    Returns
+    -------
+    params : dict
+        Symbol 's', interval 'i' and dates 'd1' and 'd2' as used by
+        :class:`pandas_datareader.stooq.StooqDailyReader`.
+    """
+    _parts = symbol.split('.')
+    if not symbol.startswith('^'):
+        if len(_parts) == 1:
+            symbol = symbol + '.US'
+        elif _parts[1].lower() == 'pl':
+            symbol = _parts[0]
+        elif _parts[1].lower() not in _STOOQ_SUFFIXES:
+            symbol = symbol + '.US'
+    return {
+            's': symbol,
+            'i': 'd',
+            'd1': pd.Timestamp(start).strftime('%Y%m%d'),
+            'd2': pd.Timestamp(end).strftime('%Y%m%d'),
+            }
+
+def _slice(df, start, end):
+    return df.loc[pd.Timestamp(start):pd.Timestamp(end)]
+
+_default = DataReaderProvider('stooq')
@@ -10,22 +10,72 @@ Data - remote retrieval (:mod:`pynance.data.retrieve`)
 Wraps `Pandas Remote Data Access 
 <http://pandas.pydata.org/pandas-docs/stable/remote_data.html>`_.
 """
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import csv
+import datetime as dt
 import os
 from ftplib import FTP
 from functools import partial
 import io
+import time
 
 import pandas as pd
-import pandas_datareader.data as web
+import requests
+
 
 import pynance as pn
+from . import cache
+from . import pit
+from . import providers
+_ONEDAY = pd.Timedelta(days=1)
+# positional arguments of `pandas_datareader.data.DataReader` following `end`
+_READERARGS = ('retry_count', 'pause', 'session', 'api_key')
 
-def get(equity, *args, **kwargs):
-    """get(equity, start=None, end=None)
+def get(equity, start=None, end=None, *args, **kwargs):
+    """get(equity, start=None, end=None, *args, provider=None, cache=None, as_of=None)
     Get DataFrame for an individual equity from Yahoo!  
 
     .. versionchanged:: 0.5.0
        Default `start` (2001-01-31) and `end` (current date).
+
+    .. versionchanged:: 1.1.0
+       Consult the local cache (:mod:`pynance.data.cache`) if enabled.
+       Retrieve data from a configurable provider (:mod:`pynance.data.providers`).
+       Point-in-time queries with `as_of` (:mod:`pynance.data.pit`).
+
+    Parameters
+    ----------
+    equity : str
+        Ticker symbol.
+    start : date, optional
+        First date to retrieve.
+    end : date, optional
+        Last date to retrieve.
+    provider : :class:`~pynance.data.providers.Provider`, optional
+        Source of the data. Defaults to the provider set with
+        :func:`pynance.data.providers.set_provider` or, if none
+        has been set, to Stooq via `pandas_datareader`.
+    cache : bool, optional
+        Whether to use the local cache. Defaults to `True` if a cache
+        directory has been set with :func:`pynance.data.cache.set_cachedir`
+        and the provider is remote.
+        Only date ranges not already held in the cache are retrieved
+        from the provider.
+    as_of : datetime, optional
+        Return the data as recorded at this time by :mod:`pynance.data.pit`,
+        ignoring later restatements, instead of retrieving it.
+
+    Additional positional arguments are taken to be `retry_count`, `pause`,
+    `session` and `api_key`, in the order of `pandas_datareader.data.DataReader`.
+    These and additional keyword arguments such as `timeout` are passed to
+    the provider. For the default provider, `timeout` is the timeout in
+    seconds of each HTTP request and defaults to 30.
+
+    Returns
+    -------
+    df : DataFrame
+        Daily bars indexed by date in ascending order, whatever the
+        order in which the provider returns them.
     
     Examples
     --------
@@ -33,12 +83,276 @@ def get(equity, *args, **kwargs):
     >>> aapl = pn.data.get('aapl', '2014-03-01', '2015-03-01')
     >>> goog = pn.data.get('goog', '2014')
     """
-    df = web.DataReader(equity, 'stooq', *args, **kwargs)
-    df.index = pd.to_datetime(df.index)
+    if len(args) > len(_READERARGS):
+        raise TypeError("get() takes at most {0} positional arguments".format(len(_READERARGS) + 3))
+    for _name, _arg in zip(_READERARGS, args):
+        if _name in kwargs:
+            raise TypeError("get() got multiple values for argument '{0}'".format(_name))
+        kwargs[_name] = _arg
+    _provider = providers.get_provider(kwargs.pop('provider', None))
+    _usecache = kwargs.pop('cache', None)
+    _asof = kwargs.pop('as_of', None)
+    if _usecache is None:
+        _usecache = cache.enabled() and _provider.cacheable
+    _start, _end = _daterange(start, end)
+    if _asof is not None:
+        return pit.as_of(equity, _provider.name, _asof, _start, _end)
+    if not _usecache:
+        return _bars(_provider, equity, _start, _end, **kwargs)
+    _cached = cache.load(equity, _provider.name)
+    if _cached is None:
+        df = _bars(_provider, equity, _start, _end, **kwargs)
+        cache.save(equity, _provider.name, df, _start, _end)
+        return df
+    df, _cachestart, _cacheend = _cached
+    _parts = [df]
+    if _start < _cachestart:
+        _parts.insert(0, _bars(_provider, equity, _start, _cachestart - _ONEDAY, **kwargs))
+    if _end > _cacheend:
+        _parts.append(_bars(_provider, equity, _cacheend + _ONEDAY, _end, **kwargs))
+    if len(_parts) > 1:
+        df = _merge(_parts, df.columns)
+        cache.save(equity, _provider.name, df, min(_start, _cachestart), max(_end, _cacheend))
+    return df.loc[_start:_end]
+
+def update(symbols, start=None, end=None, **kwargs):
+    """
+    Bring cached price histories up to date.
+
+    For each symbol only the sessions following the last cached
+    session are retrieved, and they are appended to the cache
+    without rewriting the existing history. Symbols not yet cached
+    are retrieved in full as by :func:`get`.
+
+    .. versionadded:: 1.1.0
+
+    Parameters
+    ----------
+    symbols : list of str
+        Ticker symbols to update.
+    start : date, optional
+        Start of the history retrieved for symbols not yet cached.
+    end : date, optional
+        Date up to which to update. Defaults to the current date.
+    provider : :class:`~pynance.data.providers.Provider`, optional
+        Source of the data. Cf. :func:`get`.
+
+    Additional keyword arguments such as `session`, `timeout` and `retry_count`
+    are passed to the provider, cf. :func:`get`.
+
+    Returns
+    -------
+    changed : list of str
+        Symbols for which new sessions were stored.
+
+    Examples
+    --------
+    >>> pn.data.cache.set_cachedir('~/.pynance/cache')
+    >>> changed = pn.data.update(['aapl', 'ge', 'msft'])
+    """
+    _provider = providers.get_provider(kwargs.pop('provider', None))
+    _start, _end = _daterange(start, end)
+    changed = []
+    for _symbol in symbols:
+        _info = cache.info(_symbol, _provider.name)
+        if _info is None:
+            get(_symbol, _start, _end, provider=_provider, cache=True, **kwargs)
+            changed.append(_symbol)
+            continue
+        if _info['end'] >= _end:
+            continue
+        _tail = _bars(_provider, _symbol, _info['end'] + _ONEDAY, _end, **kwargs)
+        _tail = _merge([_tail], _info['columns'])
+        if _info['last'] is not None:
+            _tail = _tail.loc[_tail.index > _info['last']]
+        cache.append(_symbol, _provider.name, _tail, _end)
+        if len(_tail.index) > 0:
+            changed.append(_symbol)
+    return changed
+
+def get_many(symbols, start=None, end=None, max_workers=8, **kwargs):
+    """get_many(symbols, start=None, end=None, max_workers=8, timeout=30., retries=3, backoff=0.5, selection=None)
+    Get data for multiple equities concurrently.
+
+    Requests are distributed over a bounded pool of threads sharing a single
+    HTTP session, so that connections are reused. A symbol that can't be
+    retrieved is retried with exponential backoff and finally reported in
+    `errors` without interrupting retrieval of the other symbols.
+
+    .. versionadded:: 1.1.0
+
+    Parameters
+    ----------
+    symbols : list of str
+        Ticker symbols to retrieve.
+    start : date, optional
+        First date to retrieve.
+    end : date, optional
+        Last date to retrieve.
+    max_workers : int, optional
+        Maximum number of concurrent requests. Defaults to 8.
+    timeout : float, optional
+        Timeout in seconds for each HTTP request, passed to the provider.
+        The default provider times out after 30 seconds.
+    retries : int, optional
+        Number of times to retry a failed request. Defaults to 3.
+    backoff : float, optional
+        Pause in seconds before the first retry. The pause is doubled
+        for each subsequent retry. Defaults to 0.5.
+    selection : str, optional
+        If provided, return a single DataFrame with one column per symbol
+        containing the values of column `selection`, aligned on the union
+        of all dates. By default, a dictionary of DataFrames is returned.
+    provider : :class:`~pynance.data.providers.Provider`, optional
+        Source of the data. Cf. :func:`get`.
+    cache : bool, optional
+        Whether to use the local cache. Cf. :func:`get`.
+    url : str, optional
+        Alternative URL of a server providing data in the format
+        used by Stooq, such as a local stub for testing.
+
+    Returns
+    -------
+    data : dict or DataFrame
+        DataFrames by symbol or, if `selection` is specified, a DataFrame
+        whose columns are symbols.
+    errors : dict
+        Exception raised by the last attempt for each symbol that
+        couldn't be retrieved.
+
+    Examples
+    --------
+    >>> data, errors = pn.data.get_many(['aapl', 'ge', 'msft'], '2014', max_workers=4)
+    >>> closes, errors = pn.data.get_many(['aapl', 'ge', 'msft'], '2014', selection='Close')
+    """
+    _retries = kwargs.pop('retries', 3)
+    _backoff = kwargs.pop('backoff', .5)
+    _selection = kwargs.pop('selection', None)
+    _session = requests.Session()
+    _adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+    _session.mount('http://', _adapter)
+    _session.mount('https://', _adapter)
+    kwargs['session'] = _session
+    kwargs['retry_count'] = 0
+    data = {}
+    errors = {}
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as _executor:
+            _futures = {_executor.submit(_get_with_retries, _symbol, start, end, _retries, _backoff,
+                    **kwargs): _symbol for _symbol in symbols}
+            for _future in as_completed(_futures):
+                _symbol = _futures[_future]
+                try:
+                    data[_symbol] = _future.result()
+                except Exception as e:
+                    errors[_symbol] = e
+    finally:
+        _session.close()
+    # preserve order of symbols
+    data = {_symbol: data[_symbol] for _symbol in symbols if _symbol in data}
+    if _selection is None:
+        return data, errors
+    return _panel(data, _selection), errors
+
+def _panel(data, selection):
+    # one column per symbol, aligned on the union of dates
+    if len(data) == 0:
+        return pd.DataFrame(dtype='float64')
+    return pd.concat({_symbol: _df.loc[:, selection] for _symbol, _df in data.items()}, axis=1)
+
+def _get_with_retries(equity, start, end, retries, backoff, **kwargs):
+    _pause = backoff
+    for _attempt in range(retries + 1):
+        try:
+            return get(equity, start, end, **kwargs)
+        except Exception:
+            if _attempt == retries:
+                raise
+            time.sleep(_pause)
+            _pause *= 2.
+
+def _daterange(start, end):
+    # as in pandas_datareader: an int is a year, start defaults to 5 years ago and end to today
+    if isinstance(start, int):
+        start = dt.datetime(start, 1, 1)
+    if isinstance(end, int):
+        end = dt.datetime(end, 1, 1)
+    if start is None:
+        start = dt.date.today() - dt.timedelta(days=365 * 5)
+    if end is None:
+        end = dt.date.today()
+    try:
+        start = pd.to_datetime(start)
+        end = pd.to_datetime(end)
+    except (TypeError, ValueError):
+        raise ValueError("Invalid date format.")
+    if start > end:
+        raise ValueError("start must be an earlier date than end")
+    return start, end
+
+def _bars(provider, equity, start, end, **kwargs):
+    df = provider.bars(equity, start, end, **kwargs)
+    # e.g. Stooq returns sessions newest first
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index()
+    if pit.recording() and len(df.index) > 0:
+        pit.record(equity, provider.name, df)
     return df
 
+def _merge(parts, columns):
+    # ranges without any session (e.g. a weekend) come back without the expected columns
+    df = pd.concat([_part.reindex(columns=columns).dropna(how='all') for _part in parts])
+    df = df[~df.index.duplicated(keep='last')]
+    return df.sort_index()
 
-def equities(country='US'):
+
+class FTPTransport(object):
+    """
+    Retrieve files from a directory on an FTP server.
+
+    Transports are used by :func:`equities` to retrieve the raw symbol
+    directory and can be replaced by any object with a `retrieve(fnames)`
+    method, e.g. to use a local FTP server or files on disk.
+
+    .. versionadded:: 1.1.0
+
+    Parameters
+    ----------
+    host : str, optional
+        Defaults to 'ftp.nasdaqtrader.com'.
+    directory : str, optional
+        Defaults to 'symboldirectory'.
+    port : int, optional
+        Defaults to 21.
+    timeout : float, optional
+        Timeout in seconds for blocking operations. Defaults to 30.
+    """
+    def __init__(self, host='ftp.nasdaqtrader.com', directory='symboldirectory', port=21, timeout=30.):
+        self.host = host
+        self.directory = directory
+        self.port = port
+        self.timeout = timeout
+
+    def retrieve(self, fnames):
+        """
+        Return the contents of the given files as a list of bytes,
+        using a single connection.
+        """
+        _ftp = FTP()
+        _ftp.connect(self.host, self.port, timeout=self.timeout)
+        try:
+            _ftp.login()
+            _ftp.cwd(self.directory)
+            blobs = []
+            for _fname in fnames:
+                _buf = io.BytesIO()
+                _ftp.retrbinary('RETR ' + _fname, partial(_handle_binary, _buf))
+                blobs.append(_buf.getvalue())
+        finally:
+            _ftp.close()
+        return blobs
+
+def equities(country='US', ttl=86400., transport=None, refresh=False):
     """
     Return a DataFrame of current US equities.
 
@@ -47,10 +361,25 @@ def equities(country='US'):
     .. versionchanged:: 0.5.0
        Return a DataFrame
 
+    .. versionchanged:: 1.1.0
+       Results are memoized and the raw listings are stored in the
+       local cache (:mod:`pynance.data.cache`) if enabled.
+
     Parameters
     ----------
     country : str, optional
         Country code for equities to return, defaults to 'US'.
+    ttl : float, optional
+        Number of seconds for which memoized results and cached listings
+        remain valid. Defaults to 86400 (1 day).
+    transport : object, optional
+        Object with a method `retrieve(fnames)` returning the contents of
+        the listing files as bytes. Defaults to :class:`FTPTransport`.
+        Results are memoized separately for each transport, and listings
+        retrieved with a transport passed explicitly aren't stored in
+        the local cache.
+    refresh : bool, optional
+        Ignore memoized and cached data. Defaults to False.
 
     Returns
     -------
@@ -67,54 +396,65 @@ def equities(country='US'):
     -----
     Currently only US markets are supported.
     """
-    nasdaqblob, otherblob = _getrawdata()
-    eq_triples = []
-    eq_triples.extend(_get_nas_triples(nasdaqblob))
-    eq_triples.extend(_get_other_triples(otherblob))
-    eq_triples.sort()
-    index = [triple[0] for triple in eq_triples]
-    data = [triple[1:] for triple in eq_triples]
-    return pd.DataFrame(data, index, columns=['Security Name', 'Exchange'], dtype=str)
-
-def _get_nas_triples(blob):
-    return _get_triples(blob, {}, 'NASDAQ')
-
-def _get_other_triples(blob):
+    _now = time.time()
+    _key = (country, transport)
+    _memo = _equities_memo.get(_key)
+    if not refresh and _memo is not None and _now - _memo[0] < ttl:
+        return _memo[1].copy()
+    nasdaqblob, otherblob = _getrawdata(transport, ttl, refresh)
     # http://www.nasdaqtrader.com/trader.aspx?id=symboldirdefs
-    exchanges = {
+    _exchanges = {
             'A': 'NYSE MKT',
             'N': 'NYSE',
             'P': 'NYSE ARCA',
             'Z': 'BATS'}
-    return _get_triples(blob, exchanges, 'unknown')
+    eqs = pd.concat([_parse_listing(nasdaqblob, {}, 'NASDAQ'),
+        _parse_listing(otherblob, _exchanges, 'unknown')])
+    eqs = eqs.sort_values(['Symbol', 'Security Name']).set_index('Symbol')
+    eqs.index.name = None
+    _equities_memo[_key] = (_now, eqs)
+    return eqs.copy()
+
+_equities_memo = {}
+
+_LISTINGS = ('nasdaqlisted.txt', 'otherlisted.txt')
 
-def _get_triples(blob, exchanges, default):
-    lines = blob.splitlines()
-    fields = [line.split('|') for line in lines[1:]] 
+def _parse_listing(blob, exchanges, default):
+    # symbols such as 'NA' and 'NAN' and names containing quotes are kept verbatim
+    _raw = pd.read_csv(io.BytesIO(blob), sep='|', dtype=str, keep_default_na=False, na_filter=False,
+            quoting=csv.QUOTE_NONE)
     # last line is generally file info
-    if not fields[-1][1].isalpha() or not fields[-1][2].isalpha():
-        return [(field[0], field[1], exchanges.get(field[2], default)) for field in fields[:-1]]
-    return [(field[0], field[1], exchanges.get(field[2], default)) for field in fields]
+    if len(_raw.index) > 0 and (not _raw.iloc[-1, 1].isalpha() or not _raw.iloc[-1, 2].isalpha()):
+        _raw = _raw.iloc[:-1]
+    return pd.DataFrame({
+        'Symbol': _raw.iloc[:, 0].values,
+        'Security Name': _raw.iloc[:, 1].values,
+        'Exchange': _raw.iloc[:, 2].map(exchanges).fillna(default).values,
+        }, columns=['Symbol', 'Security Name', 'Exchange'], dtype=str)
 
-def _getrawdata():
+def _getrawdata(transport=None, ttl=86400., refresh=False):
     # http://quant.stackexchange.com/questions/1640/where-to-download-list-of-all-common-stocks-traded-on-nyse-nasdaq-and-amex
-    _nasdaqio = io.BytesIO()
-    _otherio = io.BytesIO()
-    _host = 'ftp.nasdaqtrader.com'
-    _directory = 'symboldirectory'
-    _nasdaqfile = 'nasdaqlisted.txt'
-    _otherfile = 'otherlisted.txt'
-    _ftp = FTP(_host)
-    _ftp.login()
-    _ftp.cwd(_directory)
-    _ftp.retrbinary('RETR ' + _nasdaqfile, partial(_handle_binary, _nasdaqio))
-    _ftp.retrbinary('RETR ' + _otherfile, partial(_handle_binary, _otherio))
-    _ftp.quit()
-    _nasdaq = _nasdaqio.getvalue()
-    _nasdaqio.close()
-    _other = _otherio.getvalue()
-    _otherio.close()
-    return _nasdaq.decode("utf-8"), _other.decode("utf-8")
+    _dir = os.path.join(cache.get_cachedir(), 'symboldirectory') \
+            if cache.enabled() and transport is None else None
+    if _dir is not None and not refresh:
+        _fnames = [os.path.join(_dir, _listing) for _listing in _LISTINGS]
+        if all(os.path.isfile(_fname) and time.time() - os.path.getmtime(_fname) < ttl
+                for _fname in _fnames):
+            blobs = []
+            for _fname in _fnames:
+                with open(_fname, 'rb') as _f:
+                    blobs.append(_f.read())
+            return blobs
+    blobs = (transport or FTPTransport()).retrieve(_LISTINGS)
+    if _dir is not None:
+        if not os.path.isdir(_dir):
+            os.makedirs(_dir)
+        for _listing, _blob in zip(_LISTINGS, blobs):
+            _fname = os.path.join(_dir, _listing)
+            with open(_fname + '.tmp', 'wb') as _f:
+                _f.write(_blob)
+            os.replace(_fname + '.tmp', _fname)
+    return blobs
 
 def _handle_binary(sio, more_data):
     # http://stackoverflow.com/questions/18772703/read-a-file-in-buffer-from-ftp-python
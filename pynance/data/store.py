@@ -0,0 +1,322 @@
+"""
+.. Copyright (c) 2014- Marshall Farrier
+   license http://opensource.org/licenses/MIT
+
+Data - memory-mapped price store (:mod:`pynance.data.store`)
+===============================================================
+
+.. currentmodule:: pynance.data.store
+
+.. versionadded:: 1.1.0
+
+Persistent columnar store for the prices of a universe of equities.
+
+A store is a directory containing one date axis shared by all symbols
+and, for each field ('Open', 'High', etc.), one `float64` array of shape
+(sessions, symbols) in C order. Arrays are opened with :class:`numpy.memmap`,
+so that only the pages actually touched are read from disk:
+
+>>> import pynance as pn
+>>> store = pn.data.store.PriceStore('/data/universe')
+>>> adj = store['Adj Close']
+>>> cols = store.locate(['AAPL', 'GE'])
+>>> recent = adj[-252:, :]  # zero-copy view
+>>> sub = adj[:, cols]      # copies only the selected columns
+
+Each field is allocated with spare capacity for additional symbols,
+which are filled with NaN until data is written, so that symbols
+can usually be added without rewriting the files. Sessions are
+appended at the end of each file.
+
+Wide DataFrames for the panel functions in :mod:`pynance.tech` and single-equity
+DataFrames for :mod:`pynance.data.feat` are available through
+:meth:`PriceStore.frame` and :meth:`PriceStore.equity`.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+FIELDS = ('Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume')
+
+_META = 'meta.json'
+_DATES = 'dates.dat'
+
+class PriceStore(object):
+    """
+    Open an existing store.
+
+    Parameters
+    ----------
+    path : str
+        Directory containing the store.
+    mode : str, optional
+        'r' (default) for read-only access or 'r+' to allow
+        modification.
+    """
+    def __init__(self, path, mode='r'):
+        if mode not in ('r', 'r+'):
+            raise ValueError("invalid mode '{0}'".format(mode))
+        self.path = path
+        self.mode = mode
+        with open(os.path.join(path, _META), 'r') as _f:
+            self._meta = json.load(_f)
+        self._positions = {_symbol: i for i, _symbol in enumerate(self._meta['symbols'])}
+        self._maps = {}
+        self._dates = None
+
+    @classmethod
+    def create(cls, path, symbols=(), fields=FIELDS, capacity=None):
+        """
+        Create an empty store and return it opened in mode 'r+'.
+
+        Parameters
+        ----------
+        path : str
+            Directory for the store. It is created if it doesn't exist.
+        symbols : list of str, optional
+            Initial symbols.
+        fields : list of str, optional
+            Fields to store. Defaults to :data:`FIELDS`.
+        capacity : int, optional
+            Number of symbols for which space is reserved. Defaults to
+            twice the number of initial symbols, and at least 16.
+        """
+        if not os.path.isdir(path):
+            os.makedirs(path)
+        _capacity = capacity or max(16, 2 * len(symbols))
+        if _capacity < len(symbols):
+            raise ValueError("capacity less than number of symbols")
+        for _fname in [_DATES] + [_datafile(i) for i in range(len(fields))]:
+            open(os.path.join(path, _fname), 'wb').close()
+        _writemeta(path, {
+            'fields': list(fields),
+            'symbols': list(symbols),
+            'sessions': 0,
+            'capacity': _capacity,
+            })
+        return cls(path, 'r+')
+
+    @classmethod
+    def from_frames(cls, path, frames, fields=FIELDS, capacity=None):
+        """
+        Create a store from DataFrames such as those returned by
+        :func:`pynance.data.retrieve.get` or :func:`pynance.data.bulk.load_dir`.
+
+        Parameters
+        ----------
+        path : str
+            Directory for the store.
+        frames : dict
+            DataFrames indexed by date, keyed by symbol. The store's date axis
+            is the union of all dates. Fields missing from a DataFrame are NaN.
+        fields : list of str, optional
+            Defaults to :data:`FIELDS`.
+        capacity : int, optional
+            Cf. :meth:`create`.
+        """
+        _symbols = list(frames.keys())
+        store = cls.create(path, _symbols, fields, capacity)
+        _dates = pd.DatetimeIndex(sorted(set().union(*[_df.index for _df in frames.values()])))
+        _values = {}
+        for _field in fields:
+            _values[_field] = np.column_stack([_frame_field(frames[_symbol], _field, _dates)
+                for _symbol in _symbols]) if len(_symbols) > 0 else np.empty((len(_dates), 0))
+        store.append_sessions(_dates, _values)
+        return store
+
+    @property
+    def fields(self):
+        return list(self._meta['fields'])
+
+    @property
+    def symbols(self):
+        return list(self._meta['symbols'])
+
+    @property
+    def dates(self):
+        """
+        :class:`pandas.DatetimeIndex` of all sessions.
+        """
+        if self._dates is None:
+            _raw = np.fromfile(os.path.join(self.path, _DATES), dtype=np.int64, count=self._meta['sessions'])
+            self._dates = pd.DatetimeIndex(_raw.view('datetime64[ns]'), name='Date')
+        return self._dates
+
+    @property
+    def shape(self):
+        """
+        (sessions, symbols)
+        """
+        return self._meta['sessions'], len(self._meta['symbols'])
+
+    def __getitem__(self, field):
+        """
+        Memory-mapped array of shape (sessions, symbols) for `field`.
+        """
+        return self._map(field)[:, :len(self._meta['symbols'])]
+
+    def locate(self, symbols):
+        """
+        Return the column positions of `symbols` as an integer array.
+        """
+        return np.array([self._positions[_symbol] for _symbol in symbols], dtype=np.int64)
+
+    def frame(self, field, symbols=None):
+        """
+        Return a wide DataFrame (sessions x symbols) for `field`.
+
+        Unless `symbols` is specified the DataFrame is built
+        without copying the underlying data.
+        """
+        if symbols is None:
+            return pd.DataFrame(self[field], index=self.dates, columns=self.symbols, copy=False)
+        return pd.DataFrame(self[field][:, self.locate(symbols)], index=self.dates, columns=list(symbols))
+
+    def equity(self, symbol):
+        """
+        Return a DataFrame for a single symbol with one column per field,
+        as returned by :func:`pynance.data.retrieve.get`.
+        """
+        _col = self._positions[symbol]
+        return pd.DataFrame({_field: self._map(_field)[:, _col] for _field in self._meta['fields']},
+                index=self.dates, columns=self._meta['fields'])
+
+    def append_sessions(self, dates, values):
+        """
+        Append sessions after the last session in the store.
+
+        Parameters
+        ----------
+        dates : list of date
+            New sessions in ascending order.
+        values : dict
+            Arrays of shape (len(dates), symbols) keyed by field.
+            Missing fields are filled with NaN.
+        """
+        self._requirewritable()
+        _dates = pd.DatetimeIndex(dates)
+        _new = _dates.values.astype('datetime64[ns]').view(np.int64)
+        _n = self._meta['sessions']
+        _shape = (len(_new), len(self._meta['symbols']))
+        for _field, _values in values.items():
+            if _field not in self._meta['fields']:
+                raise ValueError("no field '{0}' in store".format(_field))
+            if np.shape(_values) != _shape:
+                raise ValueError("values for field '{0}' must have shape {1}, "
+                        "one row per new session".format(_field, _shape))
+        if len(_new) == 0:
+            return
+        if np.any(np.diff(_new) <= 0) or (_n > 0 and _new[0] <= self.dates.values.view(np.int64)[-1]):
+            raise ValueError("sessions must be in ascending order and follow the last stored session")
+        _capacity = self._meta['capacity']
+        _nsym = len(self._meta['symbols'])
+        self._maps.clear()
+        _appendfile(os.path.join(self.path, _DATES), _n, _new)
+        for i, _field in enumerate(self._meta['fields']):
+            _block = np.full((len(_new), _capacity), np.nan, dtype=np.float64)
+            if _field in values:
+                _block[:, :_nsym] = values[_field]
+            _appendfile(os.path.join(self.path, _datafile(i)), _n * _capacity, _block)
+        self._meta['sessions'] = _n + len(_new)
+        self._dates = None
+        _writemeta(self.path, self._meta)
+
+    def add_symbols(self, symbols, values=None):
+        """
+        Add symbols to the store.
+
+        The files are only rewritten if the reserved capacity is exceeded,
+        in which case the capacity is doubled.
+
+        Parameters
+        ----------
+        symbols : list of str
+            New symbols.
+        values : dict, optional
+            Arrays of shape (sessions, len(symbols)) keyed by field
+            for the sessions already in the store. Values for later
+            sessions are added with :meth:`append_sessions`.
+        """
+        self._requirewritable()
+        _symbols = list(symbols)
+        for _symbol in _symbols:
+            if _symbol in self._positions:
+                raise ValueError("symbol '{0}' already in store".format(_symbol))
+        _shape = (self._meta['sessions'], len(_symbols))
+        for _field, _values in (values or {}).items():
+            if _field not in self._meta['fields']:
+                raise ValueError("no field '{0}' in store".format(_field))
+            if np.shape(_values) != _shape:
+                raise ValueError("values for field '{0}' must have shape {1}, one row per stored session; "
+                        "use append_sessions() for new sessions".format(_field, _shape))
+        _nsym = len(self._meta['symbols'])
+        if _nsym + len(_symbols) > self._meta['capacity']:
+            self._resize(max(2 * self._meta['capacity'], _nsym + len(_symbols)))
+        self._meta['symbols'].extend(_symbols)
+        self._positions.update({_symbol: _nsym + i for i, _symbol in enumerate(_symbols)})
+        _writemeta(self.path, self._meta)
+        if values and self._meta['sessions'] > 0:
+            for _field, _values in values.items():
+                self._map(_field)[:, _nsym:_nsym + len(_symbols)] = _values
+            self.flush()
+
+    def flush(self):
+        """
+        Write changes to disk.
+        """
+        for _map in self._maps.values():
+            if isinstance(_map, np.memmap):
+                _map.flush()
+
+    def _map(self, field):
+        if field not in self._maps:
+            _shape = (self._meta['sessions'], self._meta['capacity'])
+            _fname = os.path.join(self.path, _datafile(self._meta['fields'].index(field)))
+            if _shape[0] == 0:
+                # empty files can't be mapped
+                self._maps[field] = np.empty(_shape, dtype=np.float64)
+            else:
+                self._maps[field] = np.memmap(_fname, dtype=np.float64, mode=self.mode, shape=_shape)
+        return self._maps[field]
+
+    def _resize(self, capacity):
+        _n = self._meta['sessions']
+        _old = self._meta['capacity']
+        self.flush()
+        self._maps.clear()
+        for i in range(len(self._meta['fields'])):
+            _fname = os.path.join(self.path, _datafile(i))
+            _values = np.fromfile(_fname, dtype=np.float64, count=_n * _old).reshape((_n, _old))
+            _resized = np.full((_n, capacity), np.nan, dtype=np.float64)
+            _resized[:, :_old] = _values
+            _resized.tofile(_fname + '.tmp')
+            os.replace(_fname + '.tmp', _fname)
+        self._meta['capacity'] = capacity
+
+    def _requirewritable(self):
+        if self.mode != 'r+':
+            raise ValueError("store opened read-only")
+
+def _frame_field(df, field, dates):
+    if field not in df.columns:
+        return np.full(len(dates), np.nan)
+    return df.loc[:, field].reindex(dates).values.astype(np.float64)
+
+def _datafile(i):
+    return '{0}.dat'.format(i)
+
+def _appendfile(fname, count, values):
+    # drop anything left behind by an interrupted append before extending
+    with open(fname, 'r+b') as _f:
+        _f.truncate(count * values.dtype.itemsize)
+        _f.seek(0, os.SEEK_END)
+        np.ascontiguousarray(values).tofile(_f)
+
+def _writemeta(path, meta):
+    _fname = os.path.join(path, _META)
+    with open(_fname + '.tmp', 'w') as _f:
+        json.dump(meta, _f)
+    os.replace(_fname + '.tmp', _fname)
@@ -0,0 +1,179 @@
+"""
+.. Copyright (c) 2014- Marshall Farrier
+   license http://opensource.org/licenses/MIT
+
+Data - symbol lookup (:mod:`pynance.data.symbols`)
+=====================================================
+
+.. currentmodule:: pynance.data.symbols
+
+.. versionadded:: 1.1.0
+
+Fast lookup of ticker symbols and security names in the
+directory returned by :func:`pynance.data.retrieve.equities`.
+
+Symbols are held in a sorted array, so that all symbols beginning
+with a given prefix are found by binary search. Security names are
+split into lowercase tokens and stored as an inverted index whose
+tokens are also sorted, so that the last word of a query can be
+matched as a prefix as it is being typed.
+
+Examples
+--------
+>>> import pynance as pn
+>>> pn.data.symbols.search('app', limit=20)
+>>> pn.data.symbols.search('general elec')
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from . import retrieve
+
+_TOKEN = re.compile(r'\w+')
+
+class SymbolIndex(object):
+    """
+    Prebuilt lookup index over a symbol directory.
+
+    Parameters
+    ----------
+    eqs : DataFrame
+        Directory as returned by :func:`pynance.data.retrieve.equities`,
+        indexed by symbol with columns 'Security Name' and 'Exchange'.
+    """
+    def __init__(self, eqs=None, **arrays):
+        if eqs is None:
+            # restore from arrays, cf. load()
+            for _key in ('symbols', 'names', 'exchanges', 'tokens', 'offsets', 'rows'):
+                setattr(self, '_' + _key, arrays[_key])
+            return
+        _symbols = np.array([str(_sym).upper() for _sym in eqs.index], dtype=str)
+        _order = np.argsort(_symbols, kind='mergesort')
+        self._symbols = _symbols[_order]
+        self._names = np.array(eqs.loc[:, 'Security Name'].values, dtype=str)[_order]
+        self._exchanges = np.array(eqs.loc[:, 'Exchange'].values, dtype=str)[_order]
+        _tokens = []
+        _rows = []
+        for i, _name in enumerate(self._names):
+            for _token in set(_TOKEN.findall(_name.lower())):
+                _tokens.append(_token)
+                _rows.append(i)
+        _tokens = np.array(_tokens, dtype=str)
+        _rows = np.array(_rows, dtype=np.int64)
+        # postings sorted by token, then by row
+        _order = np.lexsort((_rows, _tokens))
+        _tokens = _tokens[_order]
+        self._rows = _rows[_order]
+        self._tokens, _starts = np.unique(_tokens, return_index=True)
+        self._offsets = np.append(_starts, len(_tokens)).astype(np.int64)
+
+    def __len__(self):
+        return len(self._symbols)
+
+    def search(self, query, limit=20):
+        """
+        Return securities matching `query`.
+
+        Symbols beginning with `query` are returned first, exact match
+        first, followed by securities whose name contains every word
+        of `query`, where the last word may be incomplete.
+
+        Parameters
+        ----------
+        query : str
+            Symbol prefix or words from the security name.
+        limit : int, optional
+            Maximum number of results. Defaults to 20.
+
+        Returns
+        -------
+        matches : DataFrame
+            Matching rows of the directory, indexed by symbol.
+        """
+        _query = query.strip()
+        if len(_query) == 0:
+            return self._frame(np.empty(0, dtype=np.int64))
+        _lo, _hi = _prefixrange(self._symbols, _query.upper())
+        _matches = np.arange(_lo, min(_hi, _lo + limit), dtype=np.int64)
+        if len(_matches) < limit:
+            _matches = np.concatenate((_matches, self._namematches(_query)))
+            # drop duplicates, preserving order
+            _, _first = np.unique(_matches, return_index=True)
+            _matches = _matches[np.sort(_first)]
+        return self._frame(_matches[:limit])
+
+    def save(self, fname):
+        """
+        Save the index to a `.npz` file.
+        """
+        np.savez(fname, symbols=self._symbols, names=self._names, exchanges=self._exchanges,
+                tokens=self._tokens, offsets=self._offsets, rows=self._rows)
+
+    @classmethod
+    def load(cls, fname):
+        """
+        Load an index saved with :meth:`save`.
+        """
+        with np.load(fname, allow_pickle=False) as _arrays:
+            return cls(**{_key: _arrays[_key] for _key in _arrays.files})
+
+    def _namematches(self, query):
+        _words = _TOKEN.findall(query.lower())
+        if len(_words) == 0:
+            return np.empty(0, dtype=np.int64)
+        _matches = None
+        for i, _word in enumerate(_words):
+            if i == len(_words) - 1:
+                _lo, _hi = _prefixrange(self._tokens, _word)
+            else:
+                _lo = np.searchsorted(self._tokens, _word)
+                _hi = _lo + 1 if _lo < len(self._tokens) and self._tokens[_lo] == _word else _lo
+            _rows = np.unique(self._rows[self._offsets[_lo]:self._offsets[_hi]])
+            _matches = _rows if _matches is None else np.intersect1d(_matches, _rows, assume_unique=True)
+        exact = self._symbols[_matches] == query.upper()
+        return np.concatenate((_matches[exact], _matches[~exact]))
+
+    def _frame(self, rows):
+        return pd.DataFrame({'Security Name': self._names[rows], 'Exchange': self._exchanges[rows]},
+                index=self._symbols[rows], columns=['Security Name', 'Exchange'], dtype=str)
+
+def _prefixrange(values, prefix):
+    # range of a sorted string array beginning with prefix
+    _lo = np.searchsorted(values, prefix, side='left')
+    _hi = np.searchsorted(values, prefix + u'\U0010ffff', side='left')
+    return _lo, _hi
+
+_index = {'default': None}
+
+def get_index(refresh=False):
+    """
+    Return the default index, building it from :func:`pynance.data.retrieve.equities`
+    the first time it is needed.
+
+    Parameters
+    ----------
+    refresh : bool, optional
+        Rebuild the index from a freshly retrieved directory. Defaults to False.
+    """
+    if _index['default'] is None or refresh:
+        _index['default'] = SymbolIndex(retrieve.equities(refresh=refresh))
+    return _index['default']
+
+def set_index(index):
+    """
+    Set the index used by :func:`search`, e.g. one loaded with :meth:`SymbolIndex.load`.
+    """
+    _index['default'] = index
+
+def search(query, limit=20):
+    """
+    Search the default index. Cf. :meth:`SymbolIndex.search`.
+
+    Examples
+    --------
+    >>> pn.data.symbols.search('app', limit=20)
+    """
+    return get_index().search(query, limit)
@@ -7,17 +7,34 @@ Technical analysis (:mod:`pynance.tech`)
 
 .. currentmodule:: pynance.tech
 
+:mod:`pynance.tech.channels`
+
+:mod:`pynance.tech.kernels`
+
 :mod:`pynance.tech.movave`
 
+:mod:`pynance.tech.oscillators`
+
+:mod:`pynance.tech.rangevol`
+
 :mod:`pynance.tech.simple`
+
+:mod:`pynance.tech.stream`
 """
 
 from __future__ import absolute_import
 
-__all__ = ["movave", "simple"]
+__all__ = ["channels", "kernels", "movave", "oscillators", "rangevol", "simple", "stream"]
 
 # import directly into tech module
 from . import movave
 from .movave import *
 from . import simple
 from .simple import *
+
+# imported as submodule
+from . import channels
+from . import kernels
+from . import oscillators
+from . import rangevol
+from . import stream
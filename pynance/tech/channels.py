@@ -0,0 +1,199 @@
+"""
+.. Copyright (c) 2014- Marshall Farrier
+   license http://opensource.org/licenses/MIT
+
+Technical analysis - channels and rolling quantiles (:mod:`pynance.tech.channels`)
+==================================================================================
+
+.. currentmodule:: pynance.tech.channels
+
+.. versionadded:: 1.1.0
+
+Indicators based on order statistics over a rolling window.
+Rolling highs and lows use :func:`pynance.tech.kernels.rolling_max`
+and :func:`pynance.tech.kernels.rolling_min`, whose cost doesn't depend
+on the window. Rolling quantiles are maintained in an indexable skiplist
+(`pandas.core.window.Rolling.quantile`), costing `O(log window)` per session.
+
+As for :func:`pynance.tech.movave.bollinger`, functions returning bands
+return a DataFrame with columns 'Upper' and 'Lower' together with a
+DataFrame containing the middle line and can be calculated for a panel
+of equities.
+
+Examples
+--------
+>>> import pynance as pn
+>>> ge = pn.data.get('ge', '2014', '2015')
+>>> chandf, middf = pn.tech.channels.donchian(ge, window=55)
+>>> banddf, mediandf = pn.tech.channels.percentile_bands(ge, window=250, upper=.9, lower=.1)
+"""
+
+from __future__ import absolute_import
+
+import numpy as np
+import pandas as pd
+
+from . import kernels
+from . import simple
+
+def rolling_quantile(eqdata, **kwargs):
+    """
+    Rolling quantile.
+
+    Parameters
+    ----------
+    eqdata : DataFrame or ndarray
+    window : int, optional
+        Lookback period. Defaults to 20.
+    quantile : float, optional
+        Quantile from 0 to 1, interpolated linearly between values.
+        Defaults to 0.5 (median).
+    outputcol : str, optional
+        Column to use for output. Defaults to 'Quantile'.
+    selection : str, optional
+        Column of eqdata on which to calculate the quantile. If
+        `eqdata` has only 1 column, `selection` is ignored,
+        and the quantile is calculated on that column. Defaults
+        to 'Adj Close'.
+    panel : bool, optional
+        If True, `eqdata` is a wide DataFrame with one column per
+        symbol, and the quantile is calculated for all columns,
+        returning a DataFrame with the same index and columns.
+        A 2-D ndarray is always treated as a panel, returning an ndarray.
+        Defaults to False.
+
+    Returns
+    ---------
+    quantdf : DataFrame
+        NaN for the first `window - 1` sessions and wherever
+        the window contains NaN.
+    """
+    _values = _selected(eqdata, kwargs)
+    _quantile = _rollingquantile(_values, kwargs.get('window', 20), kwargs.get('quantile', .5))
+    if simple._ispanel(eqdata, kwargs):
+        return simple._fromvalues(_quantile, eqdata)
+    return pd.DataFrame(_quantile, index=eqdata.index, columns=[kwargs.get('outputcol', 'Quantile')],
+            dtype=np.float64)
+
+def donchian(eqdata, **kwargs):
+    """
+    Donchian channel.
+
+    Returns chandf, middf where chandf is a DataFrame containing
+    the highest high and lowest low over the window with columns
+    'Upper' and 'Lower' and middf contains their average.
+
+    Parameters
+    ----------
+    eqdata : DataFrame, ndarray or dict
+        Must include columns specified in the `high` and `low`
+        parameters. If `eqdata` has only 1 column, that column is used
+        for both. For a panel, a dictionary mapping these column names
+        to wide DataFrames or ndarrays, cf. :mod:`pynance.data.adjust`,
+        or a single wide DataFrame or ndarray used for both.
+    window : int, optional
+        Lookback period. Defaults to 20.
+    high : str, optional
+        Column containing high prices. Defaults to 'High'.
+    low : str, optional
+        Column containing low prices. Defaults to 'Low'.
+    panel : bool, optional
+        If True, the channel is calculated for all symbols of a panel.
+        A 2-D ndarray is always treated as a panel. Defaults to False.
+
+    Returns
+    ---------
+    chandf : DataFrame
+        For a panel, columns are a MultiIndex whose first level is
+        'Upper' or 'Lower' and whose second level is the symbols,
+        or, for ndarrays, an array of shape (2, sessions, symbols).
+    middf : DataFrame
+        Column 'Middle', or for a panel one column per symbol.
+    """
+    _window = kwargs.get('window', 20)
+    _high = kwargs.get('high', 'High')
+    _low = kwargs.get('low', 'Low')
+    if isinstance(eqdata, dict):
+        _like = eqdata[_high]
+        _highs = simple._panelvalues(_like).astype(np.float64)
+        _lows = simple._panelvalues(eqdata[_low]).astype(np.float64)
+    elif simple._ispanel(eqdata, kwargs):
+        _like = eqdata
+        _highs = _lows = simple._panelvalues(eqdata).astype(np.float64)
+    elif len(eqdata.shape) > 1 and eqdata.shape[1] != 1:
+        _like = eqdata
+        _highs = eqdata.loc[:, _high].values.astype(np.float64)
+        _lows = eqdata.loc[:, _low].values.astype(np.float64)
+    else:
+        _like = eqdata
+        _highs = _lows = eqdata.values.reshape(-1).astype(np.float64)
+    _upper = kernels.rolling_max(_highs, _window)
+    _lower = kernels.rolling_min(_lows, _window)
+    _middle = .5 * (_upper + _lower)
+    return _bands(_upper, _lower, _middle, 'Middle', _like, isinstance(eqdata, dict) or
+            simple._ispanel(eqdata, kwargs))
+
+def percentile_bands(eqdata, **kwargs):
+    """
+    Bands at upper and lower quantiles over a rolling window.
+
+    Returns banddf, mediandf where banddf is a DataFrame containing
+    the bands with columns 'Upper' and 'Lower' and mediandf contains
+    the rolling median.
+
+    Parameters
+    ----------
+    eqdata : DataFrame or ndarray
+        Must include a column specified in the `selection` parameter or,
+        if no `selection` parameter is given, a column 'Adj Close'.
+    window : int, optional
+        Lookback period. Defaults to 20.
+    upper : float, optional
+        Quantile for the upper band. Defaults to 0.95.
+    lower : float, optional
+        Quantile for the lower band. Defaults to 0.05.
+    selection : str, optional
+        Column of `eqdata` on which to calculate bands.
+        Defaults to 'Adj Close'.
+    panel : bool, optional
+        If True, `eqdata` is a wide DataFrame with one column per
+        symbol, and bands are calculated for all columns. A 2-D ndarray
+        is always treated as a panel. Defaults to False.
+
+    Returns
+    ---------
+    banddf : DataFrame
+        For a panel, columns are a MultiIndex whose first level is
+        'Upper' or 'Lower' and whose second level is the columns of `eqdata`,
+        or, for an ndarray, an array of shape (2, sessions, symbols).
+    mediandf : DataFrame
+        Column 'Median', or for a panel one column per symbol.
+    """
+    _window = kwargs.get('window', 20)
+    _values = _selected(eqdata, kwargs)
+    _upper = _rollingquantile(_values, _window, kwargs.get('upper', .95))
+    _lower = _rollingquantile(_values, _window, kwargs.get('lower', .05))
+    _median = _rollingquantile(_values, _window, .5)
+    return _bands(_upper, _lower, _median, 'Median', eqdata, simple._ispanel(eqdata, kwargs))
+
+def _selected(eqdata, kwargs):
+    if simple._ispanel(eqdata, kwargs):
+        return simple._panelvalues(eqdata).astype(np.float64)
+    if len(eqdata.shape) > 1 and eqdata.shape[1] != 1:
+        return eqdata.loc[:, kwargs.get('selection', 'Adj Close')].values.astype(np.float64)
+    return eqdata.values.reshape(-1).astype(np.float64)
+
+def _rollingquantile(values, window, quantile):
+    _wide = pd.DataFrame(values.reshape((values.shape[0], -1)), copy=False)
+    return _wide.rolling(window).quantile(quantile, interpolation='linear').values.reshape(values.shape)
+
+def _bands(upper, lower, middle, middlecol, like, panel):
+    # bands and middle line in the form returned by bollinger()
+    if panel:
+        if isinstance(like, np.ndarray):
+            return np.stack((upper, lower)).reshape((2,) + like.shape), middle.reshape(like.shape)
+        return pd.concat([simple._fromvalues(upper, like), simple._fromvalues(lower, like)], axis=1,
+                keys=['Upper', 'Lower']), simple._fromvalues(middle, like)
+    _banddf = pd.DataFrame(np.column_stack((upper, lower)), index=like.index, columns=['Upper', 'Lower'],
+            dtype=np.float64)
+    return _banddf, pd.DataFrame(middle, index=like.index, columns=[middlecol], dtype=np.float64)
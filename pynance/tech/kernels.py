@@ -0,0 +1,673 @@
+"""
+.. Copyright (c) 2014- Marshall Farrier
+   license http://opensource.org/licenses/MIT
+
+Technical analysis - numerical kernels (:mod:`pynance.tech.kernels`)
+=====================================================================
+
+.. currentmodule:: pynance.tech.kernels
+
+.. versionadded:: 1.1.0
+
+Vectorized kernels operating directly on ndarrays, used by the
+functions in :mod:`pynance.tech.movave` and :mod:`pynance.tech.simple`,
+which wrap their results in DataFrames. Kernels accept 1-D arrays
+(one series) or 2-D arrays of shape (sessions, symbols), calculate
+along the first axis and don't use pandas, so that they can be called
+in inner loops without allocating indexes.
+
+Results can be written into preallocated arrays of type `float64`
+passed as `out`:
+
+>>> import numpy as np
+>>> import pynance as pn
+>>> out = np.empty(closes.shape)
+>>> for window in (10, 20, 50):
+...     pn.tech.kernels.sma(closes, window, out=out)
+
+Except for the sweep kernels, `out` can also be `values` itself,
+calculating in place.
+
+Rolling moments are calculated in a single pass from prefix sums of
+powers of the data. To keep differences of prefix sums accurate on long
+series, the data is split into short overlapping blocks, each centered
+on its first value that isn't NaN, such that every window lies within
+a single block. As each block only depends on earlier values, the
+indicators of :mod:`pynance.tech.stream` return the same values.
+Variances of windows whose values are all equal are returned as
+exactly 0.
+
+The sweep kernels :func:`sma_sweep` and :func:`volatility_sweep`
+calculate several windows from the same prefix sums, so that each
+additional window only costs a few passes over its output.
+"""
+
+from __future__ import absolute_import
+
+import numpy as np
+
+# elements processed at a time, limiting the size of temporary arrays
+_CHUNKSIZE = 2 ** 20
+# windows per block of prefix sums
+_BLOCKSIZE = 256
+# bound on the rounding error of a sum of squared deviations from prefix sums,
+# relative to the sum of squares over the block and to its length ** 1.5
+_ROUNDING = 64. * np.finfo(np.float64).eps
+
+def sma(values, window=20, out=None):
+    """
+    Simple moving average.
+
+    Parameters
+    ----------
+    values : ndarray
+        1-D array or 2-D array of shape (sessions, symbols).
+    window : int, optional
+        Lookback period. Defaults to 20.
+    out : ndarray, optional
+        Array of the same shape as `values` in which to place the result.
+
+    Returns
+    -------
+    sma : ndarray
+        NaN for the first `window - 1` sessions and wherever
+        the window contains NaN.
+    """
+    return _moments(values, window, 1, 1, (out,))[0]
+
+def ema(values, span=20, out=None):
+    """
+    Exponential moving average with the given span, calculated
+    like :meth:`pandas.DataFrame.ewm` with `adjust=True` and `ignore_na=False`.
+
+    Parameters
+    ----------
+    values : ndarray
+        1-D array or 2-D array of shape (sessions, symbols).
+    span : float, optional
+        Defaults to 20.
+    out : ndarray, optional
+        Array of the same shape as `values` in which to place the result.
+
+    Returns
+    -------
+    ema : ndarray
+        NaN until the first value that isn't NaN.
+
+    Notes
+    -----
+    Numerator and denominator of the weighted average are calculated
+    as cumulative sums of values scaled by powers of the inverse decay
+    factor. To avoid overflow the series is split into blocks, and
+    the sums are carried from each block to the next.
+    """
+    _values, _wide = _aswide(values)
+    out = _output(out, _values.shape)
+    _decay = 1. - 1. / (1. + (span - 1.) / 2.)
+    _outwide = _widen(out)
+    _valid = ~np.isnan(_wide)
+    _hasnan = not _valid.all()
+    if _decay <= 0.:
+        # each value replaces the previous one, NaN carries forward the last value
+        _last = np.maximum.accumulate(np.where(_valid, np.arange(_wide.shape[0])[:, np.newaxis], -1), axis=0)
+        _outwide[...] = np.where(_last >= 0, _wide[np.maximum(_last, 0), np.arange(_wide.shape[1])], np.nan)
+        return out
+    _scale = _emascale(_decay, _wide.shape[0])
+    _blocksize = len(_scale)
+    _cumscale = np.cumsum(_scale)
+    _carrynum = np.zeros(_wide.shape[1])
+    _carryden = np.zeros(_wide.shape[1]) if _hasnan else 0.
+    for _lo in range(0, _wide.shape[0], _blocksize):
+        _hi = min(_lo + _blocksize, _wide.shape[0])
+        _s = _scale[:_hi - _lo, np.newaxis]
+        # sums scaled by _decay ** -(session - _lo), whose ratio is the average,
+        # to which earlier blocks contribute with a decay of _decay each session
+        _num = _outwide[_lo:_hi]
+        if _hasnan:
+            _block = _valid[_lo:_hi]
+            np.multiply(np.where(_block, _wide[_lo:_hi], 0.), _s, out=_num)
+            _den = np.cumsum(_block * _s, axis=0)
+        else:
+            np.multiply(_wide[_lo:_hi], _s, out=_num)
+            _den = _cumscale[:_hi - _lo, np.newaxis].copy()
+        np.cumsum(_num, axis=0, out=_num)
+        _num += _carrynum * _decay
+        _den += _carryden * _decay
+        _carrynum = _num[-1] / _s[-1]
+        _carryden = _den[-1] / _s[-1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            np.divide(_num, _den, out=_num)
+    return out
+
+def volatility(values, window=20, ddof=1, out=None):
+    """
+    Rolling standard deviation.
+
+    Parameters
+    ----------
+    values : ndarray
+        1-D array or 2-D array of shape (sessions, symbols).
+    window : int, optional
+        Lookback period. Defaults to 20.
+    ddof : int, optional
+        Delta degrees of freedom. Defaults to 1.
+    out : ndarray, optional
+        Array of the same shape as `values` in which to place the result.
+
+    Returns
+    -------
+    volatility : ndarray
+    """
+    _var = _moments(values, window, ddof, 2, (None, out))[1]
+    return np.sqrt(_var, out=_var)
+
+def bollinger(values, window=20, multiple=2., out=None):
+    """
+    Bollinger bands.
+
+    Parameters
+    ----------
+    values : ndarray
+        1-D array or 2-D array of shape (sessions, symbols).
+    window : int, optional
+        Lookback period. Defaults to 20.
+    multiple : float, optional
+        Multiple of standard deviation above and below sma to use
+        in calculating band value. Defaults to 2.0.
+    out : tuple of ndarray, optional
+        3 arrays of the same shape as `values` in which to place
+        the results.
+
+    Returns
+    -------
+    upper : ndarray
+    lower : ndarray
+    sma : ndarray
+    """
+    upper, lower, mean = out if out is not None else (None, None, None)
+    mean, upper = _moments(values, window, 1, 2, (mean, upper))
+    np.sqrt(upper, out=upper)
+    upper *= multiple
+    lower = np.subtract(mean, upper, out=lower)
+    upper += mean
+    return upper, lower, mean
+
+def growth(values, n_sessions=1, out=None):
+    """
+    Growth over the given number of sessions.
+
+    Parameters
+    ----------
+    values : ndarray
+        1-D array or 2-D array of shape (sessions, symbols).
+    n_sessions : int, optional
+        Number of sessions to count back. Defaults to 1.
+    out : ndarray, optional
+        Array in which to place the result, with `n_sessions` fewer
+        sessions than `values`.
+
+    Returns
+    -------
+    growth : ndarray
+        Ratio of each value to the value `n_sessions` earlier,
+        starting with session `n_sessions`.
+    """
+    _values = np.asarray(values, dtype=np.float64)
+    return np.divide(_values[n_sessions:], _values[:_values.shape[0] - n_sessions], out=out)
+
+def growth_sweep(values, horizons, log=False, out=None):
+    """
+    Growth over several numbers of sessions.
+
+    Parameters
+    ----------
+    values : ndarray
+        1-D array or 2-D array of shape (sessions, symbols).
+    horizons : sequence of int
+        Numbers of sessions to count back.
+    log : bool, optional
+        Return the natural log of growth. Defaults to False.
+    out : ndarray, optional
+        Array of shape `values.shape + (len(horizons),)` in which to
+        place the result.
+
+    Returns
+    -------
+    growth : ndarray
+        Of shape `values.shape + (len(horizons),)`, where `growth[t, ..., i]`
+        is the ratio of the value at session `t` to the value `horizons[i]`
+        sessions earlier, and NaN for the first `horizons[i]` sessions.
+    """
+    _values = np.asarray(values, dtype=np.float64)
+    out = _output(out, _values.shape + (len(horizons),))
+    if log:
+        _values = np.log(_values)
+    _rows = _values.shape[0]
+    # horizons are calculated contiguously and then moved to the last axis
+    _results = np.empty((len(horizons),) + _values.shape)
+    for _i, _horizon in enumerate(horizons):
+        if _horizon < 1:
+            raise ValueError("horizons must be positive")
+        _n = min(_horizon, _rows)
+        _results[_i, :_n] = np.nan
+        if log:
+            np.subtract(_values[_n:], _values[:_rows - _n], out=_results[_i, _n:])
+        else:
+            np.divide(_values[_n:], _values[:_rows - _n], out=_results[_i, _n:])
+    out[...] = np.moveaxis(_results, 0, -1)
+    return out
+
+def sma_sweep(values, windows, out=None):
+    """
+    Simple moving averages for several windows.
+
+    Parameters
+    ----------
+    values : ndarray
+        1-D array or 2-D array of shape (sessions, symbols).
+    windows : sequence of int
+        Lookback periods.
+    out : ndarray, optional
+        Array of shape `values.shape + (len(windows),)` in which to
+        place the result.
+
+    Returns
+    -------
+    sma : ndarray
+        Of shape `values.shape + (len(windows),)`, where `sma[..., i]`
+        is the moving average for `windows[i]`.
+    """
+    return _sweep(values, windows, 1, 1, (out,))[0]
+
+def volatility_sweep(values, windows, ddof=1, out=None):
+    """
+    Rolling standard deviations for several windows.
+
+    Parameters
+    ----------
+    values : ndarray
+        1-D array or 2-D array of shape (sessions, symbols).
+    windows : sequence of int
+        Lookback periods.
+    ddof : int, optional
+        Delta degrees of freedom. Defaults to 1.
+    out : ndarray, optional
+        Array of shape `values.shape + (len(windows),)` in which to
+        place the result.
+
+    Returns
+    -------
+    volatility : ndarray
+        Of shape `values.shape + (len(windows),)`.
+    """
+    _var = _sweep(values, windows, ddof, 2, (None, out), withmean=False)[1]
+    return np.sqrt(_var, out=_var)
+
+def ema_sweep(values, spans, out=None):
+    """
+    Exponential moving averages for several spans.
+
+    Parameters
+    ----------
+    values : ndarray
+        1-D array or 2-D array of shape (sessions, symbols).
+    spans : sequence of float
+    out : ndarray, optional
+        Array of shape `values.shape + (len(spans),)` in which to
+        place the result.
+
+    Returns
+    -------
+    ema : ndarray
+        Of shape `values.shape + (len(spans),)`.
+
+    Notes
+    -----
+    Each span has its own decay factor, so that nothing can be shared
+    between spans, and the cost is proportional to the number of spans.
+    """
+    _values = np.asarray(values, dtype=np.float64)
+    out = _output(out, _values.shape + (len(spans),))
+    for _i, _span in enumerate(spans):
+        ema(_values, _span, out=out[..., _i])
+    return out
+
+def rolling_max(values, window, out=None):
+    """
+    Rolling maximum.
+
+    Parameters
+    ----------
+    values : ndarray
+        1-D array or 2-D array of shape (sessions, symbols).
+    window : int
+        Lookback period.
+    out : ndarray, optional
+        Array of the same shape as `values` in which to place the result.
+
+    Returns
+    -------
+    max : ndarray
+        NaN for the first `window - 1` sessions and wherever
+        the window contains NaN.
+
+    Notes
+    -----
+    Uses the algorithm of van Herk and Gil-Werman, which needs about 3
+    comparisons per value independent of `window`.
+    """
+    return _extremum(values, window, np.maximum, -np.inf, out)
+
+def rolling_min(values, window, out=None):
+    """
+    Rolling minimum. Cf. :func:`rolling_max`.
+    """
+    return _extremum(values, window, np.minimum, np.inf, out)
+
+def rolling_moments(values, window, ddof=1, skew=False, out=None):
+    """
+    Rolling mean, variance and optionally skewness in a single pass.
+
+    Parameters
+    ----------
+    values : ndarray
+        1-D array or 2-D array of shape (sessions, symbols).
+    window : int
+        Lookback period.
+    ddof : int, optional
+        Delta degrees of freedom for the variance. Defaults to 1.
+    skew : bool, optional
+        Also return the (bias-corrected) skewness, as calculated by
+        `pandas.core.window.Rolling.skew`. Defaults to False.
+    out : tuple of ndarray, optional
+        Arrays of the same shape as `values` in which to place
+        the results.
+
+    Returns
+    -------
+    mean : ndarray
+    var : ndarray
+    skew : ndarray
+        Only if `skew` is True.
+
+    Each has the same shape as `values`. Values are NaN for the first
+    `window - 1` sessions and wherever the window contains NaN.
+    For a window whose variance is 0 the skewness is 0.
+    """
+    _order = 3 if skew else 2
+    return _moments(values, window, ddof, _order, out if out is not None else (None,) * _order)
+
+def _extremum(values, window, ufunc, fill, out):
+    # van Herk/Gil-Werman: the window ending at t covers the suffix of the block
+    # containing t - window + 1 and the prefix of the block containing t
+    if window < 1:
+        raise ValueError("window must be positive")
+    _values, _wide = _aswide(values)
+    out = _output(out, _values.shape)
+    _outwide = _widen(out)
+    _rows, _cols = _wide.shape
+    if _rows < window:
+        out[...] = np.nan
+        return out
+    _nblocks = -(-_rows // window)
+    _blocks = np.full((_nblocks * window, _cols), fill)
+    _blocks[:_rows] = _wide
+    _blocks = _blocks.reshape((_nblocks, window, _cols))
+    # NaN propagates through the accumulation, as into each window containing it
+    _prefix = ufunc.accumulate(_blocks, axis=1).reshape((-1, _cols))
+    _suffix = ufunc.accumulate(_blocks[:, ::-1], axis=1)[:, ::-1].reshape((-1, _cols))
+    ufunc(_suffix[:_rows - window + 1], _prefix[window - 1:_rows], out=_outwide[window - 1:])
+    _outwide[:window - 1] = np.nan
+    return out
+
+def _emascale(decay, rows=None):
+    # powers of the inverse decay for a block of sessions of ema(), below 1e217
+    _blocksize = 500. / -np.log(decay)
+    if rows is not None:
+        _blocksize = min(rows, _blocksize)
+    return decay ** -np.arange(int(max(1, _blocksize)), dtype=np.float64)
+
+def _moments(values, window, ddof, order, out):
+    # first `order` rolling moments placed in out, where None entries are allocated
+    if window < 1:
+        raise ValueError("window must be positive")
+    _values, _wide = _aswide(values)
+    _rows, _cols = _wide.shape
+    outputs = tuple(_output(_out, _values.shape) for _out in out)
+    _outwide = [_widen(_out) for _out in outputs]
+    if _rows >= window:
+        _step = max(1, _CHUNKSIZE // _rows)
+        for _lo in range(0, _cols, _step):
+            _hi = min(_lo + _step, _cols)
+            # series of a chunk of columns along the last axis
+            _results = _rolling_moments(_wide[:, _lo:_hi].T, window, ddof, order)
+            for _out, _moment in zip(_outwide, _results):
+                _out[window - 1:, _lo:_hi] = _moment.T
+    # only after reading all values, so that `out` can be `values`
+    for _out in _outwide:
+        _out[:window - 1] = np.nan
+    return outputs
+
+def _rolling_moments(series, window, ddof, order):
+    # temporaries are reused where possible, as allocation is a large part of the cost
+    _count, _rows = series.shape
+    _nout = _rows - window + 1
+    # blocks overlap by less than their length, so that at most two blocks
+    # cover any session, cf. pynance.tech.stream
+    _blocksize = max(_BLOCKSIZE, window)
+    _nblocks = -(-_nout // _blocksize)
+    _padded = np.empty((_count, _nblocks * _blocksize + window - 1))
+    _padded[:, :_rows] = series
+    _padded[:, _rows:] = series[:, -1:]
+    _nan = np.isnan(_padded)
+    _hasnan = _nan.any()
+    if _hasnan:
+        _nancounts = np.zeros((_count, _padded.shape[1] + 1), dtype=np.int64)
+        np.cumsum(_nan, axis=1, out=_nancounts[:, 1:])
+        _incomplete = (_nancounts[:, window:_rows + 1] - _nancounts[:, :_nout]) > 0
+        _padded[_nan] = 0.
+    # overlapping blocks of _blocksize windows, so that no window crosses a block,
+    # each centered on its first value that isn't NaN
+    _blocks = _overlapping(_padded, _nblocks, window, _blocksize)
+    if _hasnan:
+        _valid = ~_overlapping(_nan, _nblocks, window, _blocksize)
+        _shift = np.take_along_axis(_blocks, _valid.argmax(axis=2)[:, :, np.newaxis], axis=2)
+        _centered = _blocks - _shift
+        _centered[~_valid] = 0.
+    else:
+        _shift = _blocks[:, :, :1].copy()
+        _centered = _blocks - _shift
+    _prefix = np.zeros(_centered.shape[:2] + (_centered.shape[2] + 1,))
+    np.cumsum(_centered, axis=2, out=_prefix[:, :, 1:])
+    _s1 = _prefix[:, :, window:] - _prefix[:, :, :_blocksize]
+    _n = float(window)
+    _mean = _s1 / _n
+    if order == 1:
+        _mean += _shift
+        return [_trim(_mean, _count, _nout, _incomplete if _hasnan else None)]
+    _power = _centered * _centered if order > 2 else np.multiply(_centered, _centered, out=_centered)
+    np.cumsum(_power, axis=2, out=_prefix[:, :, 1:])
+    _ssqdm = _prefix[:, :, window:] - _prefix[:, :, :_blocksize]
+    _bound = _ROUNDING * (_blocksize + window) ** 1.5 * _prefix[:, :, -1:]
+    if order > 2:
+        _s2 = _ssqdm.copy()
+        np.multiply(_power, _centered, out=_power)
+        np.cumsum(_power, axis=2, out=_prefix[:, :, 1:])
+        _s3 = _prefix[:, :, window:] - _prefix[:, :, :_blocksize]
+    _s1 *= _mean
+    _ssqdm -= _s1
+    np.maximum(_ssqdm, 0., out=_ssqdm)
+    _zeroconstant(_ssqdm, series, window, _nout, _bound)
+    moments = [_mean, _ssqdm]
+    if order > 2:
+        _m2 = _ssqdm / _n
+        _m3 = _s3 / _n - 3. * _mean * _s2 / _n + 2. * _mean ** 3
+        with np.errstate(divide='ignore', invalid='ignore'):
+            _skew = np.sqrt(_n * (_n - 1.)) / (_n - 2.) * _m3 / _m2 ** 1.5
+        _skew[_m2 == 0.] = 0.
+        if window < 3:
+            _skew[:] = np.nan
+        moments.append(_skew)
+    _mean += _shift
+    if window > ddof:
+        _ssqdm /= _n - ddof
+    else:
+        _ssqdm[:] = np.nan
+    return [_trim(_moment, _count, _nout, _incomplete if _hasnan else None) for _moment in moments]
+
+def _sweep(values, windows, ddof, order, out, withmean=True):
+    # first `order` rolling moments for each window, sharing prefix sums between windows
+    _windows = [int(_w) for _w in windows]
+    if len(_windows) == 0 or min(_windows) < 1:
+        raise ValueError("windows must be positive")
+    _values, _wide = _aswide(values)
+    _rows, _cols = _wide.shape
+    outputs = tuple(_output(_out, _values.shape + (len(_windows),)) for _out in out)
+    _outwide = [_out[:, np.newaxis] if _values.ndim == 1 else _out for _out in outputs]
+    # windows are grouped so that blocks overlap by at most half their length,
+    # and short windows aren't calculated from the prefix sums of long blocks
+    _groups = {}
+    for _i, _window in enumerate(_windows):
+        _groups.setdefault(max(_BLOCKSIZE, 1 << (_window - 1).bit_length()), []).append(_i)
+    _step = max(1, _CHUNKSIZE // (_rows * len(_windows)))
+    for _lo in range(0, _cols, _step):
+        _hi = min(_lo + _step, _cols)
+        _series = np.ascontiguousarray(_wide[:, _lo:_hi].T)
+        # results for each window are contiguous, as writing them into
+        # the last axis of the output one at a time would be slow
+        _results = [np.empty((_hi - _lo, len(_windows), _rows)) if withmean or _k > 0 else None
+                for _k in range(order)]
+        _masks = _sweepmasks(_series, order)
+        for _blocksize, _indices in sorted(_groups.items()):
+            _sweepseries(_series, [_windows[_i] for _i in _indices], _indices, ddof, order, _blocksize,
+                    _masks, _results)
+        for _out, _result in zip(_outwide, _results):
+            if _result is not None:
+                _out[:, _lo:_hi] = _result.transpose((2, 0, 1))
+    return outputs
+
+def _sweepmasks(series, order):
+    # lengths of the runs without NaN and, for variances, of equal values ending at each session
+    _count, _rows = series.shape
+    _sessions = np.arange(_rows)
+    _nan = np.isnan(series)
+    _clean = None
+    if _nan.any():
+        _clean = _sessions - np.maximum.accumulate(np.where(_nan, _sessions, -1), axis=1)
+    return _clean, _samerun(series) if order > 1 else None
+
+def _sweepseries(series, windows, indices, ddof, order, blocksize, masks, results):
+    # moments for the given windows from prefix sums over blocks of `blocksize` sessions,
+    # each preceded by the `max(windows) - 1` sessions needed by the longest window
+    _count, _rows = series.shape
+    _maxwindow = max(windows)
+    _nblocks = -(-_rows // blocksize)
+    _clean, _same = masks
+    _padded = np.empty((_count, _maxwindow - 1 + _nblocks * blocksize))
+    _padded[:, :_maxwindow - 1] = series[:, :1]
+    _padded[:, _maxwindow - 1:_maxwindow - 1 + _rows] = series
+    _padded[:, _maxwindow - 1 + _rows:] = series[:, -1:]
+    _blocks = _overlapping(_padded, _nblocks, _maxwindow, blocksize)
+    if _clean is not None:
+        _nan = np.isnan(_padded)
+        _padded[_nan] = 0.
+        _valid = ~_overlapping(_nan, _nblocks, _maxwindow, blocksize)
+        _shift = _blocks.sum(axis=2, keepdims=True) / np.maximum(_valid.sum(axis=2, keepdims=True), 1)
+        _centered = _blocks - _shift
+        _centered[~_valid] = 0.
+    else:
+        _shift = _blocks[:, :, :1].copy()
+        _centered = _blocks - _shift
+    _prefix1 = np.zeros(_centered.shape[:2] + (_centered.shape[2] + 1,))
+    np.cumsum(_centered, axis=2, out=_prefix1[:, :, 1:])
+    if order > 1:
+        _prefix2 = np.zeros(_prefix1.shape)
+        np.cumsum(np.multiply(_centered, _centered, out=_centered), axis=2, out=_prefix2[:, :, 1:])
+        _ssqdm = np.empty((_count, _nblocks, blocksize))
+        _work = np.empty((_count, _nblocks, blocksize))
+    _mean = np.empty((_count, _nblocks, blocksize))
+    for _i, _window in zip(indices, windows):
+        _n = float(_window)
+        _start = _maxwindow - _window
+        # mean of each window relative to the shift of its block
+        np.subtract(_prefix1[:, :, _maxwindow:], _prefix1[:, :, _start:_start + blocksize], out=_mean)
+        _mean /= _n
+        _moments = [_mean]
+        if order > 1:
+            np.subtract(_prefix2[:, :, _maxwindow:], _prefix2[:, :, _start:_start + blocksize], out=_ssqdm)
+            np.multiply(_mean, _mean, out=_work)
+            _work *= _n
+            _ssqdm -= _work
+            np.maximum(_ssqdm, 0., out=_ssqdm)
+            if _window > ddof:
+                _ssqdm /= _n - ddof
+            else:
+                _ssqdm[...] = np.nan
+            _moments.append(_ssqdm)
+        if results[0] is not None:
+            _mean += _shift
+        for _result, _moment in zip(results, _moments):
+            if _result is not None:
+                _result[:, _i] = _moment.reshape((_count, _nblocks * blocksize))[:, :_rows]
+        if order > 1 and _window > ddof:
+            np.copyto(results[1][:, _i], 0., where=_same >= _window)
+        for _result in results:
+            if _result is None:
+                continue
+            if _clean is not None:
+                np.copyto(_result[:, _i], np.nan, where=_clean < _window)
+            else:
+                _result[:, _i, :_window - 1] = np.nan
+
+def _zeroconstant(ssqdm, series, window, nout, bound):
+    # windows without changes of value have variance exactly 0; only windows
+    # whose variance is within rounding error of 0 are checked
+    _candidates = np.flatnonzero(ssqdm <= bound)
+    _series, _starts = np.divmod(_candidates, ssqdm.shape[1] * ssqdm.shape[2])
+    _inrange = _starts < nout
+    _candidates, _series, _starts = _candidates[_inrange], _series[_inrange], _starts[_inrange]
+    if len(_candidates) * window > series.size:
+        # mostly constant series
+        _constant = _samerun(series)[_series, _starts + window - 1] >= window
+    else:
+        _windows = series[_series[:, np.newaxis], _starts[:, np.newaxis] + np.arange(window)]
+        _constant = (_windows == _windows[:, :1]).all(axis=1)
+    np.put(ssqdm, _candidates[_constant], 0.)
+
+def _samerun(series):
+    # number of values equal to the value at each session ending there
+    _sessions = np.arange(series.shape[1])
+    _change = np.ones(series.shape, dtype=bool)
+    np.not_equal(series[:, 1:], series[:, :-1], out=_change[:, 1:])
+    return _sessions + 1 - np.maximum.accumulate(np.where(_change, _sessions, 0), axis=1)
+
+def _trim(moment, count, nout, incomplete):
+    # (series, blocks, windows per block) to (series, windows)
+    moment = moment.reshape((count, -1))[:, :nout]
+    if incomplete is not None:
+        moment[incomplete] = np.nan
+    return moment
+
+def _overlapping(values, nblocks, window, blocksize=_BLOCKSIZE):
+    # view of shape (series, nblocks, blocksize + window - 1) of consecutive
+    # blocks along the last axis overlapping by window - 1
+    _seriesstride, _stride = values.strides
+    return np.lib.stride_tricks.as_strided(values, shape=(values.shape[0], nblocks, blocksize + window - 1),
+            strides=(_seriesstride, blocksize * _stride, _stride), writeable=False)
+
+def _aswide(values):
+    _values = np.asarray(values, dtype=np.float64)
+    if _values.ndim not in (1, 2):
+        raise ValueError("values must be 1-D or 2-D")
+    return _values, _widen(_values)
+
+def _widen(values):
+    # 2-D view of a 1-D or 2-D array
+    return values[:, np.newaxis] if values.ndim == 1 else values
+
+def _output(out, shape):
+    if out is None:
+        return np.empty(shape)
+    if out.shape != shape or out.dtype != np.float64:
+        raise ValueError("out must be a float64 array of shape {0}".format(shape))
+    return out
@@ -13,15 +13,19 @@ from __future__ import absolute_import
 import numpy as np
 import pandas as pd
 
+from . import kernels
 from . import simple
 
 def sma(eqdata, **kwargs):
     """ 
     simple moving average 
 
+    .. versionchanged:: 1.1.0
+       Calculation for a panel of equities.
+
     Parameters
     ----------
-    eqdata : DataFrame
+    eqdata : DataFrame or ndarray
     window : int, optional
         Lookback period for sma. Defaults to 20.
     outputcol : str, optional
@@ -31,25 +35,35 @@ def sma(eqdata, **kwargs):
         `eqdata` has only 1 column, `selection` is ignored,
         and sma is calculated on that column. Defaults
         to 'Adj Close'.
+    panel : bool, optional
+        If True, `eqdata` is a wide DataFrame with one column per
+        symbol, and sma is calculated for all columns,
+        returning a DataFrame with the same index and columns.
+        A 2-D ndarray is always treated as a panel, returning an ndarray.
+        Defaults to False.
     """
+    _window = kwargs.get('window', 20)
+    if simple._ispanel(eqdata, kwargs):
+        return simple._fromvalues(kernels.sma(simple._panelvalues(eqdata), _window), eqdata)
     if len(eqdata.shape) > 1 and eqdata.shape[1] != 1:
         _selection = kwargs.get('selection', 'Adj Close')
         _eqdata = eqdata.loc[:, _selection]
     else:
         _eqdata = eqdata
-    _window = kwargs.get('window', 20)
     _outputcol = kwargs.get('outputcol', 'SMA')
-    ret = pd.DataFrame(index=_eqdata.index, columns=[_outputcol], dtype=np.float64)
-    ret.loc[:, _outputcol] = _eqdata.rolling(window=_window, center=False).mean().values.flatten()
-    return ret
+    return pd.DataFrame(kernels.sma(_eqdata.values.reshape(-1), _window), index=_eqdata.index,
+            columns=[_outputcol], dtype=np.float64)
 
 def ema(eqdata, **kwargs):
     """
     Exponential moving average with the given span.
 
+    .. versionchanged:: 1.1.0
+       Calculation for a panel of equities.
+
     Parameters
     ----------
-    eqdata : DataFrame
+    eqdata : DataFrame or ndarray
         Must have exactly 1 column on which to calculate EMA
     span : int, optional
         Span for exponential moving average. Cf. `pandas.stats.moments.ewma 
@@ -63,22 +77,29 @@ def ema(eqdata, **kwargs):
         `eqdata` has only 1 column, `selection` is ignored,
         and ema is calculated on that column. Defaults
         to 'Adj Close'.
+    panel : bool, optional
+        If True, `eqdata` is a wide DataFrame with one column per
+        symbol, and ema is calculated for all columns,
+        returning a DataFrame with the same index and columns.
+        A 2-D ndarray is always treated as a panel, returning an ndarray.
+        Defaults to False.
 
     Returns
     ---------
     emadf : DataFrame
         Exponential moving average using the given `span`.
     """
+    _span = kwargs.get('span', 20)
+    if simple._ispanel(eqdata, kwargs):
+        return simple._fromvalues(kernels.ema(simple._panelvalues(eqdata), _span), eqdata)
     if len(eqdata.shape) > 1 and eqdata.shape[1] != 1:
         _selection = kwargs.get('selection', 'Adj Close')
         _eqdata = eqdata.loc[:, _selection]
     else:
         _eqdata = eqdata
-    _span = kwargs.get('span', 20)
     _col = kwargs.get('outputcol', 'EMA')
-    _emadf = pd.DataFrame(index=_eqdata.index, columns=[_col], dtype=np.float64)
-    _emadf.loc[:, _col] = _eqdata.ewm(span=_span, min_periods=0, adjust=True, ignore_na=False).mean().values.flatten()
-    return _emadf
+    return pd.DataFrame(kernels.ema(_eqdata.values.reshape(-1), _span), index=_eqdata.index,
+            columns=[_col], dtype=np.float64)
 
 def ema_growth(eqdata, **kwargs):
     """
@@ -112,9 +133,12 @@ def volatility(eqdata, **kwargs):
     """
     Volatility (standard deviation) over the given window
 
+    .. versionchanged:: 1.1.0
+       Calculation for a panel of equities.
+
     Parameters
     ----------
-    eqdata : DataFrame
+    eqdata : DataFrame or ndarray
     window : int, optional
         Lookback period. Defaults to 20.
     outputcol : str, optional
@@ -124,22 +148,29 @@ def volatility(eqdata, **kwargs):
         `eqdata` has only 1 column, `selection` is ignored,
         and volatility is calculated on that column. Defaults
         to 'Adj Close'.
+    panel : bool, optional
+        If True, `eqdata` is a wide DataFrame with one column per
+        symbol, and volatility is calculated for all columns,
+        returning a DataFrame with the same index and columns.
+        A 2-D ndarray is always treated as a panel, returning an ndarray.
+        Defaults to False.
 
     Returns
     ---------
     risk : DataFrame
         Moving volatility with the given lookback.
     """
+    _window = kwargs.get('window', 20)
+    if simple._ispanel(eqdata, kwargs):
+        return simple._fromvalues(kernels.volatility(simple._panelvalues(eqdata), _window), eqdata)
     if len(eqdata.shape) > 1 and eqdata.shape[1] != 1:
         _selection = kwargs.get('selection', 'Adj Close')
         _eqdata = eqdata.loc[:, _selection]
     else:
         _eqdata = eqdata
-    _window = kwargs.get('window', 20)
     _colname = kwargs.get('outputcol', 'Risk')
-    _risk = pd.DataFrame(index=_eqdata.index, columns=[_colname], dtype=np.float64)
-    _risk.loc[:, _colname] = _eqdata.rolling(center=False, window=_window).std().values.flatten()
-    return _risk
+    return pd.DataFrame(kernels.volatility(_eqdata.values.reshape(-1), _window), index=_eqdata.index,
+            columns=[_colname], dtype=np.float64)
 
 def growth_volatility(eqdata, **kwargs):
     """
@@ -172,8 +203,9 @@ def growth_volatility(eqdata, **kwargs):
     _window = kwargs.get('window', 20)
     _selection = kwargs.get('selection', 'Adj Close')
     _outputcol = kwargs.get('outputcol', 'Growth Risk')
-    _growthdata = simple.growth(eqdata, selection=_selection)
-    return volatility(_growthdata, outputcol=_outputcol, window=_window)
+    _growth = kernels.growth(eqdata.loc[:, _selection].values)
+    return pd.DataFrame(kernels.volatility(_growth, _window), index=eqdata.index[1:],
+            columns=[_outputcol], dtype=np.float64)
 
 def bollinger(eqdata, **kwargs):
     """ 
@@ -183,9 +215,12 @@ def bollinger(eqdata, **kwargs):
     Bollinger bands with columns 'Upper' and 'Lower' and smadf contains
     the simple moving average.
 
+    .. versionchanged:: 1.1.0
+       Calculation for a panel of equities.
+
     Parameters
     ----------
-    eqdata : DataFrame
+    eqdata : DataFrame or ndarray
         Must include a column specified in the `selection` parameter or, 
         if no `selection` parameter is given, a column 'Adj Close'.
     window : int, optional
@@ -196,6 +231,10 @@ def bollinger(eqdata, **kwargs):
     selection : str, optional
         Column of `eqdata` on which to calculate bollinger bands.
         Defaults to 'Adj Close'.
+    panel : bool, optional
+        If True, `eqdata` is a wide DataFrame with one column per
+        symbol, and bands are calculated for all columns. A 2-D ndarray
+        is always treated as a panel. Defaults to False.
 
     Returns
     ---------
@@ -203,22 +242,130 @@ def bollinger(eqdata, **kwargs):
         Dataframe containing columns 'Upper' and 'Lower' describing
         the given multiple of standard deviations above and below
         simple moving average for the lookback period.
+        For a panel, columns are a MultiIndex whose first level is
+        'Upper' or 'Lower' and whose second level is the columns of `eqdata`,
+        or, for an ndarray, an array of shape (2, sessions, symbols)
+        containing upper and lower bands.
     smadf : DataFrame
         Simple moving average given the specified lookback.
     """
     _window = kwargs.get('window', 20)
     _multiple = kwargs.get('multiple', 2.)
+    if simple._ispanel(eqdata, kwargs):
+        _values = simple._panelvalues(eqdata)
+        if isinstance(eqdata, np.ndarray):
+            _bands = np.empty((2,) + _values.shape)
+            _upper, _lower, _mean = kernels.bollinger(_values, _window, _multiple, out=(_bands[0], _bands[1], None))
+            return _bands.reshape((2,) + eqdata.shape), _mean.reshape(eqdata.shape)
+        _upper, _lower, _mean = kernels.bollinger(_values, _window, _multiple)
+        return pd.concat({'Upper': simple._fromvalues(_upper, eqdata),
+            'Lower': simple._fromvalues(_lower, eqdata)}, axis=1), simple._fromvalues(_mean, eqdata)
     _selection = kwargs.get('selection', 'Adj Close')
-    # ensures correct name for output column of sma()
-    kwargs['outputcol'] = 'SMA'
-    _smadf = sma(eqdata, **kwargs)
-    _sigmas = eqdata.loc[:, _selection].rolling(center=False, window=_window).std().values.flatten()
-    _diff = _multiple * _sigmas
-    _bolldf = pd.DataFrame(index=eqdata.index, columns=['Upper', 'Lower'], dtype=np.float64)
-    _bolldf.loc[:, 'Upper'] = _smadf.iloc[:, 0].values + _diff
-    _bolldf.loc[:, 'Lower'] = _smadf.iloc[:, 0].values - _diff
+    _bands = np.empty((len(eqdata.index), 2))
+    _upper, _lower, _mean = kernels.bollinger(eqdata.loc[:, _selection].values, _window, _multiple,
+            out=(_bands[:, 0], _bands[:, 1], None))
+    _smadf = pd.DataFrame(_mean, index=eqdata.index, columns=['SMA'], dtype=np.float64)
+    _bolldf = pd.DataFrame(_bands, index=eqdata.index, columns=['Upper', 'Lower'], dtype=np.float64)
     return _bolldf, _smadf
 
+def sma_sweep(eqdata, **kwargs):
+    """
+    Simple moving averages for several windows.
+
+    .. versionadded:: 1.1.0
+
+    Parameters
+    ----------
+    eqdata : DataFrame or ndarray
+    windows : list of int, optional
+        Lookback periods. Defaults to `[5, 10, 20, 50, 100, 200]`.
+    selection : str, optional
+        Column of eqdata on which to calculate sma. If
+        `eqdata` has only 1 column, `selection` is ignored,
+        and sma is calculated on that column. Defaults
+        to 'Adj Close'.
+    panel : bool, optional
+        If True, `eqdata` is a wide DataFrame with one column per
+        symbol, and sma is calculated for all columns. A 2-D ndarray
+        is always treated as a panel. Defaults to False.
+
+    Returns
+    ---------
+    smadf : DataFrame
+        One column per window, labeled with the window.
+        For a panel, columns are a MultiIndex whose first level
+        is the window and whose second level is the columns of `eqdata`,
+        or, for an ndarray, an array of shape (sessions, symbols, windows).
+
+    Notes
+    -----
+    All windows are calculated from prefix sums shared between
+    windows, cf. :func:`pynance.tech.kernels.sma_sweep`.
+    """
+    _windows = kwargs.get('windows', [5, 10, 20, 50, 100, 200])
+    return _sweep(kernels.sma_sweep, eqdata, _windows, kwargs)
+
+def volatility_sweep(eqdata, **kwargs):
+    """
+    Volatility (standard deviation) for several windows.
+
+    .. versionadded:: 1.1.0
+
+    Parameters
+    ----------
+    eqdata : DataFrame or ndarray
+    windows : list of int, optional
+        Lookback periods. Defaults to `[5, 10, 20, 50, 100, 200]`.
+    selection : str, optional
+        Column of eqdata on which to calculate volatility. If
+        `eqdata` has only 1 column, `selection` is ignored,
+        and volatility is calculated on that column. Defaults
+        to 'Adj Close'.
+    panel : bool, optional
+        If True, `eqdata` is a wide DataFrame with one column per
+        symbol, and volatility is calculated for all columns. A 2-D ndarray
+        is always treated as a panel. Defaults to False.
+
+    Returns
+    ---------
+    risk : DataFrame
+        One column per window, labeled with the window, or for a panel
+        as returned by :func:`sma_sweep`.
+    """
+    _windows = kwargs.get('windows', [5, 10, 20, 50, 100, 200])
+    return _sweep(kernels.volatility_sweep, eqdata, _windows, kwargs)
+
+def ema_sweep(eqdata, **kwargs):
+    """
+    Exponential moving averages for several spans.
+
+    .. versionadded:: 1.1.0
+
+    Parameters
+    ----------
+    eqdata : DataFrame or ndarray
+    spans : list of float, optional
+        Spans for exponential moving average. Defaults to
+        `[5, 10, 20, 50, 100, 200]`.
+    selection : str, optional
+        Column of eqdata on which to calculate ema. If
+        `eqdata` has only 1 column, `selection` is ignored,
+        and ema is calculated on that column. Defaults
+        to 'Adj Close'.
+    panel : bool, optional
+        If True, `eqdata` is a wide DataFrame with one column per
+        symbol, and ema is calculated for all columns. A 2-D ndarray
+        is always treated as a panel. Defaults to False.
+
+    Returns
+    ---------
+    emadf : DataFrame
+        One column per span, labeled with the span, or for a panel
+        as returned by :func:`sma_sweep`.
+    """
+    _spans = kwargs.get('spans', [5, 10, 20, 50, 100, 200])
+    return _sweep(kernels.ema_sweep, eqdata, _spans, kwargs)
+
 def ratio_to_ave(window, eqdata, **kwargs):
     """
     Return values expressed as ratios to the average over some number
@@ -257,3 +404,18 @@ def ratio_to_ave(window, eqdata, **kwargs):
             _sma[window + _skipstartrows - 1:]
     _index = eqdata.index[window + _skipstartrows:_size - _skipendrows]
     return pd.DataFrame(_outdata, index=_index, columns=[_outputcol], dtype=np.float64)
+
+def _sweep(kernel, eqdata, params, kwargs):
+    # DataFrame with one column per parameter from a sweep kernel
+    if simple._ispanel(eqdata, kwargs):
+        _result = kernel(simple._panelvalues(eqdata), params)
+        if isinstance(eqdata, np.ndarray):
+            return _result.reshape(eqdata.shape + (len(params),))
+        return pd.concat([simple._fromvalues(_result[:, :, _i], eqdata) for _i in range(len(params))],
+                axis=1, keys=list(params))
+    if len(eqdata.shape) > 1 and eqdata.shape[1] != 1:
+        _eqdata = eqdata.loc[:, kwargs.get('selection', 'Adj Close')]
+    else:
+        _eqdata = eqdata
+    return pd.DataFrame(kernel(_eqdata.values.reshape(-1), params), index=_eqdata.index,
+            columns=list(params), dtype=np.float64)
@@ -0,0 +1,239 @@
+"""
+.. Copyright (c) 2014- Marshall Farrier
+   license http://opensource.org/licenses/MIT
+
+Technical analysis - momentum oscillators (:mod:`pynance.tech.oscillators`)
+============================================================================
+
+.. currentmodule:: pynance.tech.oscillators
+
+.. versionadded:: 1.1.0
+
+Like the functions in :mod:`pynance.tech.movave`, oscillators are calculated
+for a single equity or, with `panel=True` or an ndarray as input, for a panel
+of equities with one column per symbol.
+
+Each function has an attribute `warmup`, a function taking the same keyword
+arguments and returning the number of sessions at the start of the data
+for which the oscillator isn't yet meaningful. It can be used for the
+`skipatstart` parameter of :func:`pynance.data.feat.fromfuncs`:
+
+>>> from functools import partial
+>>> import pynance as pn
+>>> rsi = pn.decorate(partial(pn.tech.oscillators.rsi, window=14), title='RSI')
+>>> skip = pn.tech.oscillators.rsi.warmup(window=14)
+>>> features = pn.data.feat.fromfuncs([rsi], 5, eqdata, skipatstart=skip)
+"""
+
+from __future__ import absolute_import
+
+import numpy as np
+import pandas as pd
+
+from . import kernels
+from . import simple
+
+def rsi(eqdata, **kwargs):
+    """
+    Relative strength index.
+
+    Average gains and losses are exponential moving averages with
+    span `2 * window - 1`, corresponding to Wilder's smoothing factor
+    `1 / window`.
+
+    Parameters
+    ----------
+    eqdata : DataFrame or ndarray
+    window : int, optional
+        Lookback period. Defaults to 14.
+    selection : str, optional
+        Column of eqdata on which to calculate rsi. If
+        `eqdata` has only 1 column, `selection` is ignored,
+        and rsi is calculated on that column. Defaults
+        to 'Adj Close'.
+    outputcol : str, optional
+        Column to use for output. Defaults to 'RSI'.
+    panel : bool, optional
+        If True, `eqdata` is a wide DataFrame with one column per
+        symbol, and rsi is calculated for all columns,
+        returning a DataFrame with the same index and columns.
+        A 2-D ndarray is always treated as a panel, returning an ndarray.
+        Defaults to False.
+
+    Returns
+    ---------
+    rsidf : DataFrame
+        Values from 0 to 100, NaN for the first session. Where there has
+        been neither gain nor loss, the value is 50.
+    """
+    _window = kwargs.get('window', 14)
+    _values = _selected(eqdata, kwargs)
+    _changes = np.empty(_values.shape)
+    _changes[0] = np.nan
+    np.subtract(_values[1:], _values[:-1], out=_changes[1:])
+    _gains = kernels.ema(np.maximum(_changes, 0.), 2 * _window - 1)
+    _losses = kernels.ema(np.maximum(-_changes, 0.), 2 * _window - 1)
+    _total = _gains + _losses
+    with np.errstate(divide='ignore', invalid='ignore'):
+        _rsi = np.where(_total > 0., 100. * _gains / _total, 50.)
+    _rsi[np.isnan(_total)] = np.nan
+    return _result(_rsi, eqdata, kwargs, kwargs.get('outputcol', 'RSI'))
+
+def macd(eqdata, **kwargs):
+    """
+    Moving average convergence divergence.
+
+    Parameters
+    ----------
+    eqdata : DataFrame or ndarray
+    fast : int, optional
+        Span of the fast exponential moving average. Defaults to 12.
+    slow : int, optional
+        Span of the slow exponential moving average. Defaults to 26.
+    signal : int, optional
+        Span of the exponential moving average of MACD used as
+        signal line. Defaults to 9.
+    selection : str, optional
+        Column of eqdata on which to calculate MACD. If
+        `eqdata` has only 1 column, `selection` is ignored,
+        and MACD is calculated on that column. Defaults
+        to 'Adj Close'.
+    panel : bool, optional
+        If True, `eqdata` is a wide DataFrame with one column per
+        symbol, and MACD is calculated for all columns. A 2-D ndarray
+        is always treated as a panel. Defaults to False.
+
+    Returns
+    ---------
+    macddf : DataFrame
+        Columns 'MACD' (fast minus slow ema), 'Signal' and 'Histogram'
+        (MACD minus signal). For a panel, columns are a MultiIndex whose
+        first level is one of these and whose second level is the columns
+        of `eqdata`, or, for an ndarray, an array of shape (3, sessions, symbols).
+    """
+    _values = _selected(eqdata, kwargs)
+    _macd = kernels.ema(_values, kwargs.get('fast', 12))
+    _macd -= kernels.ema(_values, kwargs.get('slow', 26))
+    _signal = kernels.ema(_macd, kwargs.get('signal', 9))
+    return _results((_macd, _signal, _macd - _signal), ('MACD', 'Signal', 'Histogram'), eqdata, kwargs)
+
+def stochastic(eqdata, **kwargs):
+    """
+    Stochastic oscillator.
+
+    Parameters
+    ----------
+    eqdata : DataFrame or dict
+        Must contain columns for high, low and closing prices. For a
+        panel, a dictionary mapping each of these column names to a wide
+        DataFrame or an ndarray of shape (sessions, symbols), cf.
+        :mod:`pynance.data.adjust`.
+    window : int, optional
+        Lookback period for highest high and lowest low. Defaults to 14.
+    smoothing : int, optional
+        Window of the simple moving average of %K giving %D. Defaults to 3.
+    high : str, optional
+        Column containing high prices. Defaults to 'High'.
+    low : str, optional
+        Column containing low prices. Defaults to 'Low'.
+    close : str, optional
+        Column containing closing prices. Defaults to 'Close'.
+    panel : bool, optional
+        If True, `eqdata` is a dictionary of wide DataFrames or ndarrays,
+        and the oscillator is calculated for all columns. Defaults to False.
+
+    Returns
+    ---------
+    stochdf : DataFrame
+        Columns '%K' and '%D', with values from 0 to 100. Where the high
+        equals the low over the window, %K is 50. For a panel, columns are
+        a MultiIndex whose first level is '%K' or '%D' and whose second
+        level is the symbols, or, for ndarrays, an array of shape
+        (2, sessions, symbols).
+    """
+    _window = kwargs.get('window', 14)
+    _fields = [kwargs.get(_field, _default)
+            for _field, _default in (('high', 'High'), ('low', 'Low'), ('close', 'Close'))]
+    if kwargs.get('panel', False):
+        _high, _low, _close = [simple._panelvalues(eqdata[_field]) for _field in _fields]
+        _like = eqdata[_fields[2]]
+    else:
+        _high, _low, _close = [eqdata.loc[:, _field].values.astype(np.float64) for _field in _fields]
+        _like = eqdata
+    _highest = kernels.rolling_max(_high, _window)
+    _lowest = kernels.rolling_min(_low, _window)
+    _range = _highest - _lowest
+    with np.errstate(divide='ignore', invalid='ignore'):
+        _k = np.where(_range > 0., 100. * (_close - _lowest) / _range, 50.)
+    _k[np.isnan(_range) | np.isnan(_close)] = np.nan
+    _d = kernels.sma(_k, kwargs.get('smoothing', 3))
+    return _results((_k, _d), ('%K', '%D'), _like, kwargs)
+
+def roc(eqdata, **kwargs):
+    """
+    Rate of change in percent over the given number of sessions.
+
+    Parameters
+    ----------
+    eqdata : DataFrame or ndarray
+    n_sessions : int, optional
+        Number of sessions to count back. Defaults to 10.
+    selection : str, optional
+        Column of eqdata on which to calculate rate of change.
+        Defaults to 'Adj Close'.
+    outputcol : str, optional
+        Column to use for output. Defaults to 'ROC'.
+    panel : bool, optional
+        If True, `eqdata` is a wide DataFrame with one column per
+        symbol. A 2-D ndarray is always treated as a panel. Defaults to False.
+
+    Returns
+    ---------
+    rocdf : DataFrame
+        Same index as `eqdata`, NaN for the first `n_sessions` sessions.
+    """
+    _n_sessions = kwargs.get('n_sessions', 10)
+    _values = _selected(eqdata, kwargs)
+    _roc = np.full(_values.shape, np.nan)
+    kernels.growth(_values, _n_sessions, out=_roc[_n_sessions:])
+    _roc[_n_sessions:] -= 1.
+    _roc[_n_sessions:] *= 100.
+    return _result(_roc, eqdata, kwargs, kwargs.get('outputcol', 'ROC'))
+
+def _rsiwarmup(**kwargs):
+    return kwargs.get('window', 14)
+
+def _macdwarmup(**kwargs):
+    return kwargs.get('slow', 26) + kwargs.get('signal', 9) - 2
+
+def _stochasticwarmup(**kwargs):
+    return kwargs.get('window', 14) + kwargs.get('smoothing', 3) - 2
+
+def _rocwarmup(**kwargs):
+    return kwargs.get('n_sessions', 10)
+
+rsi.warmup = _rsiwarmup
+macd.warmup = _macdwarmup
+stochastic.warmup = _stochasticwarmup
+roc.warmup = _rocwarmup
+
+def _selected(eqdata, kwargs):
+    # 2-D values of a panel or 1-D values of the selected column
+    if simple._ispanel(eqdata, kwargs):
+        return simple._panelvalues(eqdata).astype(np.float64)
+    if len(eqdata.shape) > 1 and eqdata.shape[1] != 1:
+        return eqdata.loc[:, kwargs.get('selection', 'Adj Close')].values.astype(np.float64)
+    return eqdata.values.reshape(-1).astype(np.float64)
+
+def _result(values, eqdata, kwargs, outputcol):
+    if simple._ispanel(eqdata, kwargs):
+        return simple._fromvalues(values, eqdata)
+    return pd.DataFrame(values, index=eqdata.index, columns=[outputcol], dtype=np.float64)
+
+def _results(values, outputcols, eqdata, kwargs):
+    # several outputs as columns or, for a panel, as first level of columns
+    if simple._ispanel(eqdata, kwargs):
+        if isinstance(eqdata, np.ndarray):
+            return np.stack(values).reshape((len(values),) + eqdata.shape)
+        return pd.concat([simple._fromvalues(_values, eqdata) for _values in values], axis=1, keys=outputcols)
+    return pd.DataFrame(np.column_stack(values), index=eqdata.index, columns=outputcols, dtype=np.float64)
@@ -0,0 +1,249 @@
+"""
+.. Copyright (c) 2014- Marshall Farrier
+   license http://opensource.org/licenses/MIT
+
+Technical analysis - range-based volatility (:mod:`pynance.tech.rangevol`)
+===========================================================================
+
+.. currentmodule:: pynance.tech.rangevol
+
+.. versionadded:: 1.1.0
+
+Volatility estimators using open, high, low and closing prices, which
+are more efficient than the close-to-close estimate of
+:func:`pynance.tech.movave.growth_volatility`, so that shorter windows
+give the same accuracy.
+
+Except for :func:`atr`, the result is the estimated standard deviation
+of log returns per session over the given window. Input is a DataFrame
+with columns 'Open', 'High', 'Low' and 'Close' as returned by
+:func:`pynance.data.retrieve.get` or, with `panel=True`, a dictionary
+mapping these fields to wide DataFrames or to ndarrays of shape
+(sessions, symbols), cf. :mod:`pynance.data.adjust`.
+
+Estimators using the previous close (:func:`yang_zhang` and :func:`atr`)
+should be given prices adjusted for splits and dividends, as otherwise
+an ex-date appears as a large overnight move.
+
+As in :mod:`pynance.tech.oscillators`, each function has an attribute
+`warmup` returning the number of sessions at the start of the data for
+which the estimate isn't available.
+
+Examples
+--------
+>>> import pynance as pn
+>>> ge = pn.data.get('ge', '2014', '2015')
+>>> vol = pn.tech.rangevol.yang_zhang(ge, window=10)
+"""
+
+from __future__ import absolute_import
+
+import math
+
+import numpy as np
+import pandas as pd
+
+from . import kernels
+from . import simple
+
+def parkinson(eqdata, **kwargs):
+    """
+    Parkinson estimator using high and low prices.
+
+    Parameters
+    ----------
+    eqdata : DataFrame or dict
+    window : int, optional
+        Lookback period. Defaults to 20.
+    high : str, optional
+        Column containing high prices. Defaults to 'High'.
+    low : str, optional
+        Column containing low prices. Defaults to 'Low'.
+    outputcol : str, optional
+        Column to use for output. Defaults to 'Parkinson'.
+    panel : bool, optional
+        If True, `eqdata` is a dictionary of wide DataFrames or ndarrays,
+        and volatility is calculated for all columns. Defaults to False.
+
+    Returns
+    ---------
+    vol : DataFrame
+        For a panel, a wide DataFrame or ndarray with one column per symbol.
+    """
+    _high, _low, _like = _fields(eqdata, kwargs, ('high', 'low'))
+    _hl = np.log(_high / _low)
+    _hl *= _hl
+    _var = kernels.sma(_hl, kwargs.get('window', 20), out=_hl)
+    _var /= 4. * math.log(2.)
+    return _result(np.sqrt(_var, out=_var), _like, kwargs, 'Parkinson')
+
+def garman_klass(eqdata, **kwargs):
+    """
+    Garman-Klass estimator using open, high, low and closing prices.
+
+    Parameters
+    ----------
+    eqdata : DataFrame or dict
+    window : int, optional
+        Lookback period. Defaults to 20.
+    open, high, low, close : str, optional
+        Columns containing the respective prices. Default to
+        'Open', 'High', 'Low' and 'Close'.
+    outputcol : str, optional
+        Column to use for output. Defaults to 'Garman-Klass'.
+    panel : bool, optional
+        If True, `eqdata` is a dictionary of wide DataFrames or ndarrays,
+        and volatility is calculated for all columns. Defaults to False.
+
+    Returns
+    ---------
+    vol : DataFrame
+        For a panel, a wide DataFrame or ndarray with one column per symbol.
+    """
+    _open, _high, _low, _close, _like = _fields(eqdata, kwargs, ('open', 'high', 'low', 'close'))
+    _hl = np.log(_high / _low)
+    _co = np.log(_close / _open)
+    _terms = .5 * _hl * _hl - (2. * math.log(2.) - 1.) * _co * _co
+    _var = kernels.sma(_terms, kwargs.get('window', 20), out=_terms)
+    return _result(_sqrt(_var), _like, kwargs, 'Garman-Klass')
+
+def rogers_satchell(eqdata, **kwargs):
+    """
+    Rogers-Satchell estimator, which unlike :func:`parkinson` and
+    :func:`garman_klass` is unbiased in the presence of drift.
+
+    Parameters
+    ----------
+    eqdata : DataFrame or dict
+    window : int, optional
+        Lookback period. Defaults to 20.
+    open, high, low, close : str, optional
+        Columns containing the respective prices. Default to
+        'Open', 'High', 'Low' and 'Close'.
+    outputcol : str, optional
+        Column to use for output. Defaults to 'Rogers-Satchell'.
+    panel : bool, optional
+        If True, `eqdata` is a dictionary of wide DataFrames or ndarrays,
+        and volatility is calculated for all columns. Defaults to False.
+
+    Returns
+    ---------
+    vol : DataFrame
+        For a panel, a wide DataFrame or ndarray with one column per symbol.
+    """
+    _open, _high, _low, _close, _like = _fields(eqdata, kwargs, ('open', 'high', 'low', 'close'))
+    _terms = _rsterms(_open, _high, _low, _close)
+    _var = kernels.sma(_terms, kwargs.get('window', 20), out=_terms)
+    return _result(_sqrt(_var), _like, kwargs, 'Rogers-Satchell')
+
+def yang_zhang(eqdata, **kwargs):
+    """
+    Yang-Zhang estimator, combining the variance of overnight returns,
+    of open-to-close returns and the Rogers-Satchell estimate, which is
+    unbiased in the presence of both drift and opening jumps.
+
+    Parameters
+    ----------
+    eqdata : DataFrame or dict
+    window : int, optional
+        Lookback period. Must be at least 2. Defaults to 20.
+    open, high, low, close : str, optional
+        Columns containing the respective prices. Default to
+        'Open', 'High', 'Low' and 'Close'.
+    outputcol : str, optional
+        Column to use for output. Defaults to 'Yang-Zhang'.
+    panel : bool, optional
+        If True, `eqdata` is a dictionary of wide DataFrames or ndarrays,
+        and volatility is calculated for all columns. Defaults to False.
+
+    Returns
+    ---------
+    vol : DataFrame
+        NaN for the first `window` sessions, as the first overnight
+        return requires the previous close.
+        For a panel, a wide DataFrame or ndarray with one column per symbol.
+    """
+    _window = kwargs.get('window', 20)
+    if _window < 2:
+        raise ValueError("window must be at least 2")
+    _open, _high, _low, _close, _like = _fields(eqdata, kwargs, ('open', 'high', 'low', 'close'))
+    _overnight = np.empty(_open.shape)
+    _overnight[0] = np.nan
+    np.log(_open[1:] / _close[:-1], out=_overnight[1:])
+    _k = .34 / (1.34 + (_window + 1.) / (_window - 1.))
+    _var = kernels.rolling_moments(_overnight, _window)[1]
+    _var += _k * kernels.rolling_moments(np.log(_close / _open), _window)[1]
+    _var += (1. - _k) * kernels.sma(_rsterms(_open, _high, _low, _close), _window)
+    return _result(_sqrt(_var), _like, kwargs, 'Yang-Zhang')
+
+def atr(eqdata, **kwargs):
+    """
+    Average true range, with Wilder's smoothing as for
+    :func:`pynance.tech.oscillators.rsi`.
+
+    Parameters
+    ----------
+    eqdata : DataFrame or dict
+    window : int, optional
+        Lookback period. Defaults to 14.
+    high, low, close : str, optional
+        Columns containing the respective prices. Default to
+        'High', 'Low' and 'Close'.
+    outputcol : str, optional
+        Column to use for output. Defaults to 'ATR'.
+    panel : bool, optional
+        If True, `eqdata` is a dictionary of wide DataFrames or ndarrays,
+        and the average true range is calculated for all columns.
+        Defaults to False.
+
+    Returns
+    ---------
+    atrdf : DataFrame
+        Average true range in units of price. The true range of the first
+        session is its high minus its low.
+        For a panel, a wide DataFrame or ndarray with one column per symbol.
+    """
+    _high, _low, _close, _like = _fields(eqdata, kwargs, ('high', 'low', 'close'))
+    _range = _high - _low
+    np.maximum(_range[1:], np.abs(_high[1:] - _close[:-1]), out=_range[1:])
+    np.maximum(_range[1:], np.abs(_low[1:] - _close[:-1]), out=_range[1:])
+    _atr = kernels.ema(_range, 2 * kwargs.get('window', 14) - 1, out=_range)
+    return _result(_atr, _like, kwargs, 'ATR')
+
+def _windowwarmup(**kwargs):
+    return kwargs.get('window', 20) - 1
+
+def _yzwarmup(**kwargs):
+    return kwargs.get('window', 20)
+
+def _atrwarmup(**kwargs):
+    return kwargs.get('window', 14)
+
+parkinson.warmup = _windowwarmup
+garman_klass.warmup = _windowwarmup
+rogers_satchell.warmup = _windowwarmup
+yang_zhang.warmup = _yzwarmup
+atr.warmup = _atrwarmup
+
+_DEFAULTS = {'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'Close'}
+
+def _fields(eqdata, kwargs, fields):
+    # float64 values of the given fields, followed by an input to shape the result like
+    _names = [kwargs.get(_field, _DEFAULTS[_field]) for _field in fields]
+    if kwargs.get('panel', False):
+        return [simple._panelvalues(eqdata[_name]).astype(np.float64) for _name in _names] + [eqdata[_names[-1]]]
+    return [eqdata.loc[:, _name].values.astype(np.float64) for _name in _names] + [eqdata]
+
+def _rsterms(open_, high, low, close):
+    return np.log(high / close) * np.log(high / open_) + np.log(low / close) * np.log(low / open_)
+
+def _sqrt(var):
+    # estimates can be slightly negative due to rounding
+    np.maximum(var, 0., out=var)
+    return np.sqrt(var, out=var)
+
+def _result(values, like, kwargs, outputcol):
+    if kwargs.get('panel', False):
+        return simple._fromvalues(values, like)
+    return pd.DataFrame(values, index=like.index, columns=[kwargs.get('outputcol', outputcol)],
+            dtype=np.float64)
@@ -13,6 +13,8 @@ from __future__ import absolute_import
 import numpy as np
 import pandas as pd
 
+from . import kernels
+
 def growth(eqdata, **kwargs):
     """
     Generate a DataFrame where the sole column, 'Growth',
@@ -22,18 +24,23 @@ def growth(eqdata, **kwargs):
     `90.0` 4 *sessions* later on 2014-12-19, then the 'Growth' value
     for 2014-12-19 will be `0.9`.
 
+    .. versionchanged:: 1.1.0
+       Calculation for a panel of equities, for several numbers of
+       sessions at once and in log space.
+
     Parameters
     ----------
-    eqdata : DataFrame
+    eqdata : DataFrame or ndarray
         Data such as that returned by :func:`pynance.data.retrieve.get`
     selection : str, optional
         Column from which to determine growth values. Defaults to
         'Adj Close'.
-    n_sessions : int
+    n_sessions : int or list of int
         Number of sessions to count back for calculating today's
         growth. For example, if `n_sessions` is set to 4, growth is
         calculated relative to the price 4 sessions ago. Defaults
-        to 1 (price of previous session).
+        to 1 (price of previous session). For a list, growth
+        is calculated for each number of sessions, cf. Returns.
     skipstartrows : int
         Rows to skip at beginning of `eqdata` in addition to the 1 row that must
         be skipped because the calculation relies on a prior data point.
@@ -42,10 +49,24 @@ def growth(eqdata, **kwargs):
         Rows to skip at end of `eqdata`. Defaults to 0.
     outputcol : str, optional
         Name to use for output column. Defaults to 'Growth'
+    panel : bool, optional
+        If True, `eqdata` is a wide DataFrame with one column per
+        symbol, and growth is calculated for all columns, returning a
+        DataFrame with the same columns. A 2-D ndarray is always treated
+        as a panel, returning an ndarray. Defaults to False.
+    log : bool, optional
+        Return the natural log of growth. Defaults to False.
 
     Returns
     ----------
     out : DataFrame
+        If `n_sessions` is a list, one column per number of sessions,
+        labeled with the number of sessions, and values are NaN where
+        there is no earlier session to compare with, so that the index
+        is that of `eqdata` without the skipped rows. For a panel,
+        columns are a MultiIndex whose first level is the number of
+        sessions and whose second level is the columns of `eqdata`,
+        or, for an ndarray, an array of shape (sessions, symbols, horizons).
 
     Notes
     ----------
@@ -62,11 +83,31 @@ def growth(eqdata, **kwargs):
     skipstartrows = kwargs.get('skipstartrows', 0)
     skipendrows = kwargs.get('skipendrows', 0)
     outputcol = kwargs.get('outputcol', 'Growth')
-    size = len(eqdata.index)
-    growthdata = eqdata.loc[:, selection].values[(skipstartrows + n_sessions):(size - skipendrows)] / \
-            eqdata.loc[:, selection].values[skipstartrows:(-n_sessions - skipendrows)]
+    log = kwargs.get('log', False)
+    panel = _ispanel(eqdata, kwargs)
+    size = eqdata.shape[0]
+    if panel:
+        _values = eqdata if isinstance(eqdata, np.ndarray) else eqdata.values
+    else:
+        _values = eqdata.loc[:, selection].values
+    _values = _values[skipstartrows:(size - skipendrows)]
+    if isinstance(n_sessions, (list, tuple, np.ndarray)):
+        growthdata = kernels.growth_sweep(_values, n_sessions, log=log)
+        if isinstance(eqdata, np.ndarray):
+            return growthdata
+        growthindex = eqdata.index[skipstartrows:(size - skipendrows)]
+        if panel:
+            return pd.concat([pd.DataFrame(data=growthdata[:, :, i], index=growthindex, columns=eqdata.columns)
+                for i in range(len(n_sessions))], axis=1, keys=list(n_sessions))
+        return pd.DataFrame(data=growthdata, index=growthindex, columns=list(n_sessions), dtype='float64')
+    growthdata = kernels.growth(_values, n_sessions)
+    if log:
+        np.log(growthdata, out=growthdata)
+    if isinstance(eqdata, np.ndarray):
+        return growthdata
     growthindex = eqdata.index[(skipstartrows + n_sessions):(size - skipendrows)]
-    return pd.DataFrame(data=growthdata, index=growthindex, columns=[outputcol], dtype='float64')
+    return pd.DataFrame(data=growthdata, index=growthindex, columns=eqdata.columns if panel else [outputcol],
+            dtype='float64')
 
 def ln_growth(eqdata, **kwargs):
     """
@@ -78,7 +119,8 @@ def ln_growth(eqdata, **kwargs):
     """
     if 'outputcol' not in kwargs:
         kwargs['outputcol'] = 'LnGrowth'
-    return np.log(growth(eqdata, **kwargs))
+    kwargs['log'] = True
+    return growth(eqdata, **kwargs)
 
 def ret(eqdata, **kwargs):
     """
@@ -96,9 +138,9 @@ def ret(eqdata, **kwargs):
     selection : str, optional
         Column from which to determine growth values. Defaults to
         'Adj Close'.
-    n_sessions : int
+    n_sessions : int or list of int
         Number of sessions to count back for calculating today's
-        return. For example, if `n_sessions` is set to 4, return is
+        return, or a list of numbers of sessions as for :func:`growth`. For example, if `n_sessions` is set to 4, return is
         calculated relative to the price 4 sessions ago. Defaults
         to 1 (price of previous session).
     skipstartrows : int
@@ -131,6 +173,19 @@ def ret(eqdata, **kwargs):
     """
     if 'outputcol' not in kwargs:
         kwargs['outputcol'] = 'Return'
-    result = growth(eqdata, **kwargs)
-    result.values[:, :] -= 1.
-    return result
+    return growth(eqdata, **kwargs) - 1.
+
+def _ispanel(eqdata, kwargs):
+    return isinstance(eqdata, np.ndarray) or kwargs.get('panel', False)
+
+def _panelvalues(eqdata):
+    # 2-D values of a panel without copying
+    if isinstance(eqdata, np.ndarray):
+        return eqdata.reshape((eqdata.shape[0], -1))
+    return eqdata.values
+
+def _fromvalues(values, eqdata):
+    # result of a kernel in the same form as eqdata
+    if isinstance(eqdata, np.ndarray):
+        return values.reshape(eqdata.shape)
+    return pd.DataFrame(values, index=eqdata.index, columns=eqdata.columns)
@@ -0,0 +1,320 @@
+"""
+.. Copyright (c) 2014- Marshall Farrier
+   license http://opensource.org/licenses/MIT
+
+Technical analysis - streaming indicators (:mod:`pynance.tech.stream`)
+========================================================================
+
+.. currentmodule:: pynance.tech.stream
+
+.. versionadded:: 1.1.0
+
+Indicators updated one value at a time in constant time, for use in
+live loops where recalculating over the entire history as with
+:mod:`pynance.tech.movave` would be wasteful.
+
+Rolling indicators hold running prefix sums over the blocks of windows
+used by :func:`pynance.tech.kernels.rolling_moments`, and :class:`EMA`
+the scaled sums of :func:`pynance.tech.kernels.ema`, updated with the
+same floating-point operations in the same order, so that the values
+returned are identical to those of the corresponding batch functions:
+
+=================== ======================================
+Streaming           Batch
+=================== ======================================
+:class:`SMA`        :func:`pynance.tech.movave.sma`
+:class:`EMA`        :func:`pynance.tech.movave.ema`
+:class:`RollingStd` :func:`pynance.tech.movave.volatility`
+:class:`Bollinger`  :func:`pynance.tech.movave.bollinger`
+=================== ======================================
+
+The state of an indicator can be saved with `snapshot()`,
+which returns a dictionary that can be serialized as JSON,
+and restored with the class method `restore()`.
+
+Examples
+--------
+>>> import pynance as pn
+>>> sma = pn.tech.stream.SMA(window=20)
+>>> for price in prices:
+...     value = sma.update(price)
+>>> state = sma.snapshot()
+>>> sma = pn.tech.stream.SMA.restore(state)
+"""
+
+from __future__ import absolute_import
+
+import copy
+import math
+
+import numpy as np
+
+from . import kernels
+
+_EMASCALES = {}
+
+class _Moments(object):
+    # rolling sums as in kernels.rolling_moments(): prefix sums of the values
+    # centered on the first value of their block that isn't NaN, for the blocks
+    # of windows not yet completed, of which there are at most two
+    def __init__(self, window):
+        self.window = window
+        self.blocksize = max(kernels._BLOCKSIZE, window)
+        self.count = 0
+        self.nans = 0
+        self.same = 0
+        self.prev = float('nan')
+        self.blocks = []
+
+    def add(self, x):
+        if self.count % self.blocksize == 0:
+            self.blocks.append({
+                'start': self.count,
+                'shift': None,
+                'sums': [0.] * (self.window + 1),
+                'sumsq': [0.] * (self.window + 1),
+                'n': 1,
+                })
+        self.count += 1
+        if x != x:
+            self.nans += 1
+        # values equal to x ending with x, cf. kernels._samerun()
+        self.same = self.same + 1 if x == self.prev else 1
+        self.prev = x
+        for _block in self.blocks:
+            _c = 0.
+            if x == x:
+                if _block['shift'] is None:
+                    _block['shift'] = x
+                _c = x - _block['shift']
+            _size = self.window + 1
+            _last = (_block['n'] - 1) % _size
+            _block['sums'][_block['n'] % _size] = _block['sums'][_last] + _c
+            _block['sumsq'][_block['n'] % _size] = _block['sumsq'][_last] + _c * _c
+            _block['n'] += 1
+        # block of the window ending with x
+        _start = max(0, self.count - self.window) // self.blocksize * self.blocksize
+        self.blocks = [_block for _block in self.blocks if _block['start'] >= _start]
+
+    def remove(self, x):
+        if x != x:
+            self.nans -= 1
+
+    def value(self, ddof=None):
+        # mean or, if ddof is given, (mean, variance) of the current window
+        _nan = float('nan')
+        if self.count < self.window or self.nans > 0:
+            return _nan if ddof is None else (_nan, _nan)
+        _block = self.blocks[0]
+        _size = self.window + 1
+        _end = (_block['n'] - 1) % _size
+        _begin = (_block['n'] - 1 - self.window) % _size
+        _n = float(self.window)
+        _s1 = _block['sums'][_end] - _block['sums'][_begin]
+        _mean = _s1 / _n
+        _shift = _block['shift']
+        if ddof is None:
+            return _mean + _shift
+        _ssqdm = _block['sumsq'][_end] - _block['sumsq'][_begin]
+        _ssqdm -= _s1 * _mean
+        if not _ssqdm > 0. or self.same >= self.window:
+            _ssqdm = 0.
+        return _mean + _shift, _ssqdm / (_n - ddof) if self.window > ddof else _nan
+
+_ACCUMULATORS = {'_moments': _Moments}
+
+class _Indicator(object):
+
+    def snapshot(self):
+        """
+        Return the state of the indicator as a dictionary.
+        """
+        state = {}
+        for _key, _val in self.__dict__.items():
+            if isinstance(_val, np.ndarray):
+                _val = _val.tolist()
+            elif _key in _ACCUMULATORS:
+                _val = copy.deepcopy(_val.__dict__)
+            state[_key] = _val
+        return state
+
+    @classmethod
+    def restore(cls, state):
+        """
+        Return an indicator with the state returned by `snapshot()`.
+        """
+        indicator = cls.__new__(cls)
+        for _key, _val in state.items():
+            if _key == '_buffer':
+                _val = np.array(_val, dtype=np.float64)
+            elif _key in _ACCUMULATORS:
+                _acc = _ACCUMULATORS[_key].__new__(_ACCUMULATORS[_key])
+                _acc.__dict__.update(_val)
+                _val = _acc
+            setattr(indicator, _key, _val)
+        return indicator
+
+class _Window(_Indicator):
+    # ring buffer of the last `window` values
+    def __init__(self, window):
+        if window < 1:
+            raise ValueError("window must be positive")
+        self.window = window
+        self._buffer = np.full(window, np.nan)
+        self._pos = 0
+        self._count = 0
+
+    def update(self, value):
+        """
+        Add a new value and return the updated indicator.
+        """
+        _x = float(value)
+        if self._count == self.window:
+            self._remove(float(self._buffer[self._pos]))
+        else:
+            self._count += 1
+        self._buffer[self._pos] = _x
+        self._pos = (self._pos + 1) % self.window
+        self._add(_x)
+        return self.value
+
+    def _add(self, x):
+        self._moments.add(x)
+
+    def _remove(self, x):
+        self._moments.remove(x)
+
+class SMA(_Window):
+    """
+    Simple moving average.
+
+    Parameters
+    ----------
+    window : int, optional
+        Lookback period. Defaults to 20.
+
+    Notes
+    -----
+    The value is NaN until `window` values have been received
+    and whenever the window contains NaN.
+    """
+    def __init__(self, window=20):
+        super(SMA, self).__init__(window)
+        self._moments = _Moments(window)
+
+    @property
+    def value(self):
+        return self._moments.value()
+
+class RollingStd(_Window):
+    """
+    Rolling standard deviation.
+
+    Parameters
+    ----------
+    window : int, optional
+        Lookback period. Defaults to 20.
+    ddof : int, optional
+        Delta degrees of freedom. Defaults to 1.
+    """
+    def __init__(self, window=20, ddof=1):
+        super(RollingStd, self).__init__(window)
+        self.ddof = ddof
+        self._moments = _Moments(window)
+
+    @property
+    def value(self):
+        return _sqrt(self._moments.value(self.ddof)[1])
+
+class Bollinger(_Window):
+    """
+    Bollinger bands.
+
+    Parameters
+    ----------
+    window : int, optional
+        Lookback period. Defaults to 20.
+    multiple : float, optional
+        Multiple of standard deviation above and below sma to use
+        in calculating band value. Defaults to 2.0.
+
+    The value is a tuple `(upper, lower, sma)`.
+    """
+    def __init__(self, window=20, multiple=2.):
+        super(Bollinger, self).__init__(window)
+        self.multiple = multiple
+        self._moments = _Moments(window)
+
+    @property
+    def value(self):
+        _sma, _var = self._moments.value(1)
+        _diff = _sqrt(_var) * self.multiple
+        return _diff + _sma, _sma - _diff, _sma
+
+class EMA(_Indicator):
+    """
+    Exponential moving average with the given span.
+
+    Parameters
+    ----------
+    span : int, optional
+        Span for exponential moving average. Defaults to 20.
+
+    Notes
+    -----
+    As in :func:`pynance.tech.movave.ema`, weights are adjusted for
+    the beginning of the series, and NaN values are skipped but
+    count towards the decay of the weights.
+    """
+    def __init__(self, span=20):
+        self.span = span
+        self._decay = 1. - 1. / (1. + (span - 1.) / 2.)
+        self._weighted = float('nan')
+        self._count = 0
+        # sums of the current block scaled as in kernels.ema() and those carried from earlier blocks
+        self._num = 0.
+        self._den = 0.
+        self._carrynum = 0.
+        self._carryden = 0.
+
+    @property
+    def value(self):
+        return self._weighted
+
+    def update(self, value):
+        """
+        Add a new value and return the updated indicator.
+        """
+        _x = float(value)
+        self._count += 1
+        if self._decay <= 0.:
+            # each value replaces the previous one
+            if _x == _x:
+                self._weighted = _x
+            return self._weighted
+        _scale = _emascale(self._decay)
+        _i = (self._count - 1) % len(_scale)
+        if _i == 0 and self._count > 1:
+            _last = _scale[-1]
+            self._carrynum = (self._num + self._carrynum * self._decay) / _last
+            self._carryden = (self._den + self._carryden * self._decay) / _last
+            self._num = 0.
+            self._den = 0.
+        if _x == _x:
+            self._num += _x * _scale[_i]
+            self._den += _scale[_i]
+        _den = self._den + self._carryden * self._decay
+        if _den == 0.:
+            self._weighted = float('nan')
+        else:
+            self._weighted = (self._num + self._carrynum * self._decay) / _den
+        return self._weighted
+
+def _sqrt(x):
+    return math.sqrt(x) if x == x else x
+
+def _emascale(decay):
+    # scales of a block of sessions, computed once as by kernels.ema()
+    if decay not in _EMASCALES:
+        _EMASCALES[decay] = kernels._emascale(decay).tolist()
+    return _EMASCALES[decay]
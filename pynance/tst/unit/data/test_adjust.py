@@ -0,0 +1,53 @@
+"""
+Copyright (c) 2014- Marshall Farrier
+license http://opensource.org/licenses/MIT
+
+@summary: Unit tests for corporate action adjustments
+"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import pynance as pn
+
+class TestAdjust(unittest.TestCase):
+
+    def setUp(self):
+        index = pd.date_range('2014-01-06', periods=6, freq='B')
+        self.close = pd.DataFrame({
+            'GE': [100., 100., 50., 50., 50., 50.],
+            'MSFT': [40., 40., 40., 39., 39., 39.]}, index=index)
+        self.volume = pd.DataFrame({'GE': [10., 10., 20., 20., 20., 20.],
+            'MSFT': [5.] * 6}, index=index)
+        self.splits = pd.DataFrame({'Symbol': ['GE'], 'Date': ['2014-01-08'], 'Ratio': [2.]})
+        self.dividends = pd.DataFrame({'Symbol': ['MSFT', 'GE'], 'Date': ['2014-01-09', '2014-01-10'],
+            'Amount': [1., 5.]})
+
+    def test_factors(self):
+        fac = pn.data.adjust.factors(self.close, self.splits, self.dividends)
+        # GE: dividend factor 1 - 5 / 50 = .9 before 2014-01-10, split .5 before 2014-01-08
+        np.testing.assert_allclose(fac.loc[:, 'GE'].values, [.45, .45, .9, .9, 1., 1.])
+        np.testing.assert_allclose(fac.loc[:, 'MSFT'].values, [.975, .975, .975, 1., 1., 1.])
+
+    def test_adjust(self):
+        adjusted = pn.data.adjust.adjust({'Close': self.close, 'Volume': self.volume},
+                self.splits, self.dividends)
+        np.testing.assert_allclose(adjusted['Close'].loc[:, 'GE'].values, [45., 45., 45., 45., 50., 50.])
+        np.testing.assert_allclose(adjusted['Volume'].loc[:, 'GE'].values, [20.] * 6)
+        np.testing.assert_allclose(adjusted['Volume'].loc[:, 'MSFT'].values, [5.] * 6)
+        self.assertTrue(adjusted['Adj Close'].equals(adjusted['Close']))
+        tr = pn.data.adjust.total_return(self.close, self.splits, self.dividends)
+        np.testing.assert_allclose(tr.loc[:, 'MSFT'].values, [1., 1., 1., 1., 1., 1.])
+
+    def test_readjust(self):
+        adjusted = pn.data.adjust.adjust({'Close': self.close, 'Volume': self.volume}, self.splits)
+        pn.data.adjust.readjust(adjusted, dividends=self.dividends, close=self.close)
+        expected = pn.data.adjust.adjust({'Close': self.close, 'Volume': self.volume},
+                self.splits, self.dividends)
+        for field in ('Close', 'Adj Close', 'Volume'):
+            np.testing.assert_allclose(adjusted[field].values, expected[field].values)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+"""
+Copyright (c) 2014- Marshall Farrier
+license http://opensource.org/licenses/MIT
+
+@summary: Unit tests for asynchronous retrieval
+"""
+
+import asyncio
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import pynance as pn
+
+class _FakeProvider(object):
+
+    def __init__(self, delay=0., fail=()):
+        self.delay = delay
+        self.fail = fail
+        self.active = 0
+        self.max_active = 0
+        self.cancelled = 0
+
+    async def fetch(self, symbol, start, end):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.active -= 1
+        if symbol in self.fail:
+            raise IOError(symbol)
+        index = pd.bdate_range(start, end)
+        return pd.DataFrame({'Close': np.arange(len(index), dtype=np.float64) + len(symbol)}, index=index)
+
+class TestAsyncRetrieve(unittest.TestCase):
+
+    def test_aget(self):
+        df = asyncio.run(pn.data.aget('ge', '2014-03-03', '2014-03-07', provider=_FakeProvider()))
+        self.assertEqual(df.shape, (5, 1))
+
+    def test_aget_many(self):
+        provider = _FakeProvider(delay=.01, fail=('bad',))
+        symbols = ['s{0}'.format(i) for i in range(50)] + ['bad']
+        data, errors = asyncio.run(pn.data.aget_many(symbols, '2014-03-03', '2014-03-07',
+                provider=provider, limit=8))
+        self.assertEqual(len(data), 50)
+        self.assertEqual(list(errors.keys()), ['bad'])
+        self.assertEqual(provider.max_active, 8)
+        closes, _ = asyncio.run(pn.data.aget_many(['a', 'bb'], '2014-03-03', '2014-03-07',
+                provider=_FakeProvider(), selection='Close'))
+        self.assertEqual(list(closes.columns), ['a', 'bb'])
+        self.assertAlmostEqual(closes.iloc[0, 1], 2.)
+
+    def test_cancel(self):
+        provider = _FakeProvider(delay=10.)
+        async def _run():
+            _task = asyncio.ensure_future(pn.data.aget_many(['a', 'b', 'c'], '2014-03-03', '2014-03-07',
+                provider=provider, limit=2))
+            await asyncio.sleep(.05)
+            _task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await _task
+        asyncio.run(_run())
+        self.assertEqual(provider.cancelled, 2)
+        self.assertEqual(provider.active, 0)
+
+if __name__ == '__main__':
+    unittest.main()
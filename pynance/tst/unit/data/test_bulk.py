@@ -0,0 +1,60 @@
+"""
+Copyright (c) 2014- Marshall Farrier
+license http://opensource.org/licenses/MIT
+
+@summary: Unit tests for bulk loading
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import pynance as pn
+
+_CSV = """timestamp,open,high,low,close,adj_close,vol
+2014-01-08,3.,4.,2.,3.5,3.4,300
+2014-01-06,1.,2.,.5,1.5,1.4,100
+2014-01-07,2.,3.,1.,2.5,2.4,200
+"""
+
+class TestBulk(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        for _symbol in ('ge', 'msft'):
+            with open(os.path.join(self.dir, _symbol + '.csv'), 'w') as _f:
+                _f.write(_CSV)
+        with open(os.path.join(self.dir, 'bad.csv'), 'w') as _f:
+            _f.write('Date,Close\n2014-01-06,abc\n')
+        with open(os.path.join(self.dir, 'notes.txt'), 'w') as _f:
+            _f.write('ignored')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_read_bars(self):
+        df = pn.data.bulk.read_bars(os.path.join(self.dir, 'ge.csv'))
+        self.assertEqual(list(df.columns), ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume'])
+        self.assertEqual(df.index.name, 'Date')
+        self.assertTrue(df.index.is_monotonic_increasing)
+        self.assertEqual(df.loc[:, 'Volume'].dtype, np.int64)
+        self.assertEqual(df.loc[:, 'Close'].dtype, np.float64)
+        self.assertEqual(df.index[0], pd.Timestamp('2014-01-06'))
+
+    def test_load_dir(self):
+        for _workers in (1, 2):
+            data, errors, stats = pn.data.bulk.load_dir(self.dir, max_workers=_workers)
+            self.assertEqual(list(data.keys()), ['GE', 'MSFT'])
+            self.assertEqual(list(errors.keys()), ['BAD'])
+            self.assertEqual(stats['files'], 3)
+            self.assertTrue(stats['files_per_sec'] > 0.)
+        closes, _, _ = pn.data.bulk.load_dir(self.dir, max_workers=1, selection='Adj Close')
+        self.assertEqual(list(closes.columns), ['GE', 'MSFT'])
+        self.assertAlmostEqual(closes.iloc[-1, 1], 3.4)
+
+if __name__ == '__main__':
+    unittest.main()
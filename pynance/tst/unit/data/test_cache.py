@@ -0,0 +1,256 @@
+"""
+Copyright (c) 2014- Marshall Farrier
+license http://opensource.org/licenses/MIT
+
+@summary: Unit tests for local price cache
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+import pynance as pn
+
+def _bars(start, end):
+    index = pd.bdate_range(start, end, name='Date')
+    values = np.arange(len(index) * 5, dtype=np.float64).reshape((len(index), 5))
+    df = pd.DataFrame(values, index=index, columns=['Open', 'High', 'Low', 'Close', 'Volume'])
+    df['Volume'] = df['Volume'].astype(np.int64)
+    return df
+
+class _CountingProvider(pn.data.providers.Provider):
+    name = 'counting'
+    cacheable = True
+
+    def __init__(self):
+        self.calls = []
+
+    def bars(self, symbol, start, end, **kwargs):
+        self.calls.append((symbol, pd.Timestamp(start), pd.Timestamp(end)))
+        return _bars(start, end)
+
+class _DescendingProvider(_CountingProvider):
+    # newest session first, as returned by Stooq
+    name = 'descending'
+
+    def bars(self, symbol, start, end, **kwargs):
+        return super(_DescendingProvider, self).bars(symbol, start, end, **kwargs).iloc[::-1]
+
+class TestCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cachedir = tempfile.mkdtemp()
+        pn.data.cache.set_cachedir(self.cachedir)
+
+    def tearDown(self):
+        pn.data.cache.set_cachedir(None)
+        shutil.rmtree(self.cachedir)
+
+    def test_save_load(self):
+        df = _bars('2014-01-01', '2014-03-01')
+        pn.data.cache.save('ge', 'stooq', df, '2014-01-01', '2014-03-01')
+        loaded, start, end = pn.data.cache.load('GE', 'stooq')
+        pd.testing.assert_frame_equal(loaded, df, check_freq=False)
+        self.assertEqual(start, pd.Timestamp('2014-01-01'))
+        # last session saved
+        self.assertEqual(end, pd.Timestamp('2014-02-28'))
+        self.assertIsNone(pn.data.cache.load('ge', 'other'))
+
+    def test_invalidate(self):
+        df = _bars('2014-01-01', '2014-03-01')
+        pn.data.cache.save('ge', 'stooq', df, '2014-01-01', '2014-03-01')
+        pn.data.cache.save('msft', 'stooq', df, '2014-01-01', '2014-03-01')
+        pn.data.cache.invalidate('ge')
+        self.assertIsNone(pn.data.cache.load('ge', 'stooq'))
+        self.assertIsNotNone(pn.data.cache.load('msft', 'stooq'))
+        pn.data.cache.clear()
+        self.assertIsNone(pn.data.cache.load('msft', 'stooq'))
+        self.assertEqual(pn.data.cache.size(), 0)
+
+    def test_evict(self):
+        df = _bars('2014-01-01', '2014-03-01')
+        pn.data.cache.save('ge', 'stooq', df, '2014-01-01', '2014-03-01')
+        _metafile = os.path.join(self.cachedir, 'prices', 'stooq', 'GE', 'meta.json')
+        os.utime(_metafile, (0., 0.))
+        pn.data.cache.save('msft', 'stooq', df, '2014-01-01', '2014-03-01')
+        _size = pn.data.cache.size()
+        evicted = pn.data.cache.evict(_size - 1)
+        self.assertEqual(len(evicted), 1)
+        self.assertIsNone(pn.data.cache.load('ge', 'stooq'))
+        self.assertIsNotNone(pn.data.cache.load('msft', 'stooq'))
+
+    def test_running_size(self):
+        df = _bars('2014-01-01', '2014-03-01')
+        pn.data.cache.set_cachedir(self.cachedir, maxsize=10 ** 12)
+        _entries = pn.data.cache._entries
+        scans = []
+        def _counted():
+            scans.append(1)
+            return _entries()
+        with mock.patch.object(pn.data.cache, '_entries', _counted):
+            for _symbol in ('ge', 'msft', 'aapl', 'ibm'):
+                pn.data.cache.save(_symbol, 'stooq', df.iloc[:10], '2014-01-01', '2014-01-14')
+            pn.data.cache.append('ge', 'stooq', df.iloc[10:], '2014-03-01')
+            pn.data.cache.invalidate('msft')
+            # the directory is only counted once
+            self.assertEqual(len(scans), 1)
+        _total = pn.data.cache._addsize(0)
+        self.assertEqual(_total, pn.data.cache.size())
+        # eviction once the total exceeds the limit
+        pn.data.cache.set_cachedir(self.cachedir, maxsize=_total)
+        pn.data.cache.save('msft', 'stooq', df, '2014-01-01', '2014-03-01')
+        self.assertIsNotNone(pn.data.cache.load('msft', 'stooq'))
+        self.assertLessEqual(pn.data.cache.size(), _total)
+        self.assertEqual(pn.data.cache._addsize(0), pn.data.cache.size())
+        pn.data.cache.clear()
+        self.assertEqual(pn.data.cache._addsize(0), 0)
+
+    def test_get_fetches_missing_ranges(self):
+        provider = _CountingProvider()
+        calls = provider.calls
+        first = pn.data.get('ge', '2014-02-01', '2014-03-01', provider=provider)
+        self.assertEqual(len(calls), 1)
+        # fully cached
+        inner = pn.data.get('ge', '2014-02-10', '2014-02-20', provider=provider)
+        self.assertEqual(len(calls), 1)
+        pd.testing.assert_frame_equal(inner, first.loc['2014-02-10':'2014-02-20'], check_freq=False)
+        # only the tail is retrieved
+        pn.data.get('ge', '2014-02-10', '2014-03-15', provider=provider)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(calls[1], ('ge', pd.Timestamp('2014-03-01'), pd.Timestamp('2014-03-15')))
+        _, start, end = pn.data.cache.load('ge', 'counting')
+        self.assertEqual(start, pd.Timestamp('2014-02-01'))
+        self.assertEqual(end, pd.Timestamp('2014-03-14'))
+        # bypass cache
+        pn.data.get('ge', '2014-02-10', '2014-02-20', provider=provider, cache=False)
+        self.assertEqual(len(calls), 3)
+
+    def test_get_positional_args(self):
+        provider = _CountingProvider()
+        received = {}
+        _bars_counted = provider.bars
+        def _bars_kwargs(symbol, start, end, **kwargs):
+            received.update(kwargs)
+            return _bars_counted(symbol, start, end)
+        provider.bars = _bars_kwargs
+        pn.data.get('ge', 2014, '2014-01-10', 5, .5, provider=provider, cache=False)
+        self.assertEqual(received, {'retry_count': 5, 'pause': .5})
+        self.assertEqual(provider.calls[0][1], pd.Timestamp('2014-01-01'))
+        self.assertRaises(TypeError, pn.data.get, 'ge', 2014, '2014-01-10', 5, provider=provider,
+                retry_count=3)
+        self.assertRaises(ValueError, pn.data.get, 'ge', '2014-02-01', '2014-01-10', provider=provider)
+
+    def test_evict_concurrent(self):
+        df = _bars('2014-01-01', '2014-03-01')
+        errors = []
+        def _save(symbol):
+            try:
+                for _ in range(20):
+                    pn.data.cache.save(symbol, 'stooq', df, '2014-01-01', '2014-03-01')
+                    pn.data.cache.load(symbol, 'stooq')
+            except Exception as e:
+                errors.append(e)
+        def _evict():
+            try:
+                for _ in range(20):
+                    pn.data.cache.evict(0)
+            except Exception as e:
+                errors.append(e)
+        threads = [threading.Thread(target=_save, args=(_symbol,)) for _symbol in ('ge', 'msft', 'aapl')]
+        threads.append(threading.Thread(target=_evict))
+        for _thread in threads:
+            _thread.start()
+        for _thread in threads:
+            _thread.join()
+        self.assertEqual(errors, [])
+
+    def test_get_descending_provider(self):
+        provider = _DescendingProvider()
+        first = pn.data.get('ge', '2014-02-01', '2014-03-01', provider=provider)
+        self.assertTrue(first.index.is_monotonic_increasing)
+        pd.testing.assert_frame_equal(first, _bars('2014-02-01', '2014-03-01'), check_freq=False)
+        # served from the cache
+        inner = pn.data.get('ge', '2014-02-10', '2014-02-20', provider=provider)
+        self.assertEqual(len(provider.calls), 1)
+        pd.testing.assert_frame_equal(inner, first.loc['2014-02-10':'2014-02-20'], check_freq=False)
+        loaded, _, _ = pn.data.cache.load('ge', 'descending')
+        self.assertTrue(loaded.index.is_monotonic_increasing)
+        # uncached
+        df = pn.data.get('ge', '2014-02-10', '2014-02-20', provider=provider, cache=False)
+        pd.testing.assert_frame_equal(df, _bars('2014-02-10', '2014-02-20'), check_freq=False)
+
+    def test_append(self):
+        df = _bars('2014-01-01', '2014-03-01')
+        pn.data.cache.save('ge', 'stooq', df.iloc[:10], '2014-01-01', '2014-01-14')
+        pn.data.cache.append('ge', 'stooq', df.iloc[10:], '2014-03-01')
+        loaded, _, end = pn.data.cache.load('ge', 'stooq')
+        pd.testing.assert_frame_equal(loaded, df, check_freq=False)
+        self.assertEqual(end, pd.Timestamp('2014-02-28'))
+        info = pn.data.cache.info('ge', 'stooq')
+        self.assertEqual(info['rows'], len(df.index))
+        self.assertEqual(info['last'], df.index[-1])
+
+    def test_append_evicts(self):
+        df = _bars('2014-01-01', '2014-03-01')
+        pn.data.cache.save('ge', 'stooq', df.iloc[:10], '2014-01-01', '2014-01-14')
+        _metafile = os.path.join(self.cachedir, 'prices', 'stooq', 'GE', 'meta.json')
+        os.utime(_metafile, (0., 0.))
+        pn.data.cache.save('msft', 'stooq', df.iloc[:10], '2014-01-01', '2014-01-14')
+        pn.data.cache.set_cachedir(self.cachedir, maxsize=pn.data.cache.size())
+        pn.data.cache.append('msft', 'stooq', df.iloc[10:], '2014-03-01')
+        self.assertIsNone(pn.data.cache.load('ge', 'stooq'))
+        loaded, _, _ = pn.data.cache.load('msft', 'stooq')
+        pd.testing.assert_frame_equal(loaded, df, check_freq=False)
+
+    def test_append_order(self):
+        df = _bars('2014-01-01', '2014-03-01')
+        pn.data.cache.save('ge', 'stooq', df.iloc[:10], '2014-01-01', '2014-01-14')
+        # sorted before appending
+        pn.data.cache.append('ge', 'stooq', df.iloc[10:].iloc[::-1], '2014-03-01')
+        loaded, _, _ = pn.data.cache.load('ge', 'stooq')
+        pd.testing.assert_frame_equal(loaded, df, check_freq=False)
+        # overlapping sessions
+        self.assertRaises(ValueError, pn.data.cache.append, 'ge', 'stooq', df.iloc[-5:], '2014-03-01')
+
+    def test_unpublished_sessions(self):
+        provider = _CountingProvider()
+        published = {'end': pd.Timestamp('2014-03-05')}
+        _bars_published = provider.bars
+        provider.bars = lambda symbol, start, end, **kwargs: _bars_published(
+                symbol, start, min(pd.Timestamp(end), published['end']))
+        df = pn.data.get('ge', '2014-03-03', '2014-03-07', provider=provider)
+        self.assertEqual(df.index[-1], pd.Timestamp('2014-03-05'))
+        self.assertEqual(pn.data.cache.info('ge', 'counting')['end'], pd.Timestamp('2014-03-05'))
+        # sessions published later are retrieved
+        published['end'] = pd.Timestamp('2014-03-07')
+        df = pn.data.get('ge', '2014-03-03', '2014-03-07', provider=provider)
+        self.assertEqual(df.index[-1], pd.Timestamp('2014-03-07'))
+        self.assertEqual(provider.calls[-1][1], pd.Timestamp('2014-03-06'))
+        published['end'] = pd.Timestamp('2014-03-12')
+        self.assertEqual(pn.data.update(['ge'], '2014-03-03', '2014-03-14', provider=provider), ['ge'])
+        self.assertEqual(pn.data.cache.info('ge', 'counting')['last'], pd.Timestamp('2014-03-12'))
+        self.assertEqual(pn.data.cache.info('ge', 'counting')['end'], pd.Timestamp('2014-03-12'))
+
+    def test_update(self):
+        provider = _CountingProvider()
+        calls = provider.calls
+        pn.data.get('ge', '2014-02-01', '2014-03-03', provider=provider)
+        pn.data.get('msft', '2014-02-01', '2014-03-05', provider=provider)
+        del calls[:]
+        changed = pn.data.update(['ge', 'msft', 'aapl'], '2014-01-01', '2014-03-05', provider=provider)
+        self.assertEqual(changed, ['ge', 'aapl'])
+        self.assertEqual(calls[0], ('ge', pd.Timestamp('2014-03-04'), pd.Timestamp('2014-03-05')))
+        self.assertEqual(len(calls), 2)
+        loaded, _, end = pn.data.cache.load('ge', 'counting')
+        self.assertEqual(loaded.index[-1], pd.Timestamp('2014-03-05'))
+        self.assertEqual(end, pd.Timestamp('2014-03-05'))
+        self.assertFalse(loaded.index.duplicated().any())
+
+if __name__ == '__main__':
+    unittest.main()
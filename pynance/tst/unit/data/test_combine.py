@@ -58,5 +58,64 @@ class TestCombine(unittest.TestCase):
             self.assertAlmostEqual(features.loc[:, '0 V'].values[i], (2. * i + 9.) / (2. * i + 5.))
             self.assertAlmostEqual(labels.values[i], (i + 6.) / (i + 5.))
 
+    def test_stackedfeatures(self):
+        _featfunc = pn.decorate(partial(pn.data.feat.fromcols, ['Adj Close'], 2), 1)
+        _labfunc = pn.decorate(partial(pn.data.lab.growth, 1, 'Adj Close'), 1)
+        _other = 2. * self.equity_data
+        _other.iloc[:3] = np.nan
+        _eqdata = {'A': self.equity_data, 'B': _other.iloc[3:]}
+        features, labels, symbols, dates = pn.data.stackedfeatures(_eqdata, _featfunc, _labfunc)
+        _features, _labels = pn.data.labeledfeatures(self.equity_data, _featfunc, _labfunc)
+        self.assertEqual(features.shape, (8 + 5, 3))
+        self.assertEqual(labels.shape, (8 + 5, 1))
+        self.assertTrue(np.array_equal(features[:8], _features.values))
+        self.assertTrue(np.array_equal(labels[:8], _labels.values))
+        self.assertEqual(list(symbols), ['A'] * 8 + ['B'] * 5)
+        self.assertEqual(list(dates), list(self.equity_data.index[1:9]) + list(self.equity_data.index[4:9]))
+        _features, _labels = pn.data.labeledfeatures(_other.iloc[3:], _featfunc, _labfunc)
+        self.assertTrue(np.array_equal(features[8:], _features.values))
+        self.assertTrue(np.array_equal(labels[8:], _labels.values))
+        # same universe as wide panel
+        _panel = {_field: pd.DataFrame({'A': self.equity_data[_field], 'B': _other[_field]})
+                for _field in self.equity_data.columns}
+        _stacked = pn.data.stackedfeatures(_panel, _featfunc, _labfunc, panel=True)
+        self.assertTrue(np.array_equal(_stacked[0], features))
+        self.assertTrue(np.array_equal(_stacked[1], labels))
+        self.assertTrue(np.array_equal(_stacked[2], symbols))
+        self.assertTrue(np.array_equal(_stacked[3], dates))
+        # rows are sized from the skips of the first symbol
+        _varfunc = lambda df: _featfunc(df) if len(df.index) > 8 else (
+                pn.data.feat.fromcols(['Adj Close'], 3, df), 2)
+        self.assertRaises(ValueError, pn.data.stackedfeatures, _eqdata, _varfunc, _labfunc)
+
+    def test_minibatches(self):
+        _featfunc = pn.decorate(partial(pn.data.feat.fromcols, ['Adj Close', 'Volume'], 3), 2)
+        _labfunc = pn.decorate(partial(pn.data.lab.growth, 2, 'Adj Close'), 2)
+        _index = pd.date_range('2014-01-01', periods=30, freq='B')
+        _eqdata = {_symbol: pd.DataFrame(np.arange(1., 61.).reshape((30, 2)) * (_i + 1.), index=_index,
+                columns=['Volume', 'Adj Close']) for _i, _symbol in enumerate(['A', 'B', 'C'])}
+        _stacked = pn.data.stackedfeatures(_eqdata, _featfunc, _labfunc)
+        # chunk boundaries
+        _batches = list(pn.data.minibatches(_eqdata, _featfunc, _labfunc, 8, chunksize=7))
+        self.assertEqual([len(_batch[0]) for _batch in _batches], [8] * 9 + [6])
+        for _i in range(4):
+            self.assertTrue(np.array_equal(np.concatenate([_batch[_i] for _batch in _batches]), _stacked[_i]))
+        # prefetched
+        _prefetched = list(pn.data.minibatches(_eqdata, _featfunc, _labfunc, 8, chunksize=7, prefetch=2))
+        self.assertEqual(len(_prefetched), len(_batches))
+        for _batch, _expected in zip(_prefetched, _batches):
+            for _i in range(4):
+                self.assertTrue(np.array_equal(_batch[_i], _expected[_i]))
+        # shuffled
+        _batches = list(pn.data.minibatches(_eqdata, _featfunc, _labfunc, 8, chunksize=10,
+                shuffle=True, buffer_size=20, seed=0))
+        self.assertEqual([len(_batch[0]) for _batch in _batches], [8] * 9 + [6])
+        _shuffled = [np.concatenate([_batch[_i] for _batch in _batches]) for _i in range(4)]
+        self.assertFalse(np.array_equal(_shuffled[0], _stacked[0]))
+        _order = np.lexsort((_shuffled[3], _shuffled[2]))
+        for _i in range(4):
+            self.assertTrue(np.array_equal(_shuffled[_i][_order], _stacked[_i]))
+        self.assertRaises(ValueError, list, pn.data.minibatches(_eqdata, _featfunc, _labfunc, 8, chunksize=4))
+
 if __name__ == '__main__':
     unittest.main()
@@ -60,6 +60,38 @@ class TestFeat(unittest.TestCase):
             for j in range(features.shape[1]):
                 self.assertAlmostEqual(x[i, j + 1], features[i, j])
 
+    def test_outputtype(self):
+        _features = pn.data.feat.fromcols(['Close', 'Volume'], 3, self.equity_data)
+        _array = pn.data.feat.fromcols(['Close', 'Volume'], 3, self.equity_data, outputtype=np.ndarray)
+        self.assertTrue(isinstance(_array, np.ndarray))
+        self.assertTrue(np.array_equal(_array, _features.values))
+        _funcs = [pn.decorate(partial(pn.expand(pn.tech.sma, 'Close'), window=4), title='SMA')]
+        _features = pn.data.feat.fromfuncs(_funcs, 3, self.equity_data, skipatstart=3)
+        _array = pn.data.feat.fromfuncs(_funcs, 3, self.equity_data, skipatstart=3, outputtype=np.ndarray)
+        self.assertTrue(np.array_equal(_array, _features.values))
+
+    def test_lazy(self):
+        _features = pn.data.feat.fromcols(['Close', 'Volume'], 3, self.equity_data)
+        _lazy = pn.data.feat.fromcols(['Close', 'Volume'], 3, self.equity_data, lazy=True)
+        self.assertTrue(isinstance(_lazy, pn.data.feat.FeatureMatrix))
+        self.assertEqual(_lazy.shape, _features.shape)
+        self.assertEqual(len(_lazy), len(_features.index))
+        self.assertTrue(np.array_equal(_lazy.materialize(), _features.values))
+        self.assertTrue(np.array_equal(_lazy[2:5], _features.values[2:5]))
+        self.assertTrue(np.array_equal(_lazy[::3], _features.values[::3]))
+        self.assertTrue(np.array_equal(_lazy[[4, 0, 7]], _features.values[[4, 0, 7]]))
+        self.assertTrue(np.array_equal(_lazy[-1], _features.values[-1]))
+        _batches = list(_lazy.iter_batches(3))
+        self.assertEqual([len(_batch) for _batch in _batches], [3, 3, 2])
+        self.assertTrue(np.array_equal(np.concatenate(_batches), _features.values))
+        _batch = next(_lazy.iter_batches(4, outputtype=pd.DataFrame))
+        self.assertTrue(_batch.equals(_features.iloc[:4]))
+        _funcs = [pn.decorate(partial(pn.expand(pn.tech.sma, 'Close'), window=4), title='SMA')]
+        _features = pn.data.feat.fromfuncs(_funcs, 3, self.equity_data, skipatstart=3)
+        _lazy = pn.data.feat.fromfuncs(_funcs, 3, self.equity_data, skipatstart=3, lazy=True)
+        self.assertTrue(_lazy.materialize(outputtype=pd.DataFrame).equals(_features))
+        self.assertTrue(np.array_equal(_lazy[1:3], _features.values[1:3]))
+
     def test_fromcols(self):
         _selection = ['Close', 'Volume']
         _n_sess = 2
@@ -111,6 +143,11 @@ class TestFeat(unittest.TestCase):
                 # columns match with offset
                 self.assertAlmostEqual(_features.iloc[i, 1], _features.iloc[i - 1, 2])
                 self.assertAlmostEqual(_features.iloc[i, 2], _features.iloc[i - 1, 3])
+        # one column per function
+        _bands = pn.decorate(lambda eqdata: pn.tech.bollinger(eqdata, selection='Close', window=2)[0],
+                title='Bands')
+        self.assertRaises(ValueError, pn.data.feat.fromfuncs, [_bands], _n_sess, self.equity_data,
+                skipatstart=1)
         
 
 if __name__ == '__main__':
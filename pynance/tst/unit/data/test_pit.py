@@ -0,0 +1,76 @@
+"""
+Copyright (c) 2014- Marshall Farrier
+license http://opensource.org/licenses/MIT
+
+@summary: Unit tests for point-in-time versions
+"""
+
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import pynance as pn
+
+def _bars(start, end, offset=0.):
+    index = pd.bdate_range(start, end, name='Date')
+    values = np.arange(len(index) * 2, dtype=np.float64).reshape((len(index), 2)) + offset
+    df = pd.DataFrame(values, index=index, columns=['Close', 'Volume'])
+    df['Volume'] = df['Volume'].astype(np.int64)
+    return df
+
+class TestPit(unittest.TestCase):
+
+    def setUp(self):
+        self.cachedir = tempfile.mkdtemp()
+        pn.data.cache.set_cachedir(self.cachedir)
+
+    def tearDown(self):
+        pn.data.pit.set_recording(False)
+        pn.data.cache.set_cachedir(None)
+        shutil.rmtree(self.cachedir)
+
+    def test_versions(self):
+        versions = pn.data.pit.VersionedFrame(['Close', 'Volume'], ['float64', 'int64'])
+        first = _bars('2014-01-01', '2014-01-10')
+        self.assertEqual(versions.record(first, '2014-01-10'), 8)
+        # unchanged history with 1 new session
+        second = _bars('2014-01-01', '2014-01-13')
+        self.assertEqual(versions.record(second, '2014-01-13'), 1)
+        # restatement of 1 session
+        third = second.copy()
+        third.iloc[2, 0] = -1.
+        self.assertEqual(versions.record(third, '2014-01-14'), 1)
+        self.assertEqual(len(versions), 10)
+        pd.testing.assert_frame_equal(versions.as_of('2014-01-10'), first, check_freq=False)
+        pd.testing.assert_frame_equal(versions.as_of('2014-01-13'), second, check_freq=False)
+        pd.testing.assert_frame_equal(versions.as_of('2015-01-01'), third, check_freq=False)
+        pd.testing.assert_frame_equal(versions.as_of('2014-01-13', '2014-01-03', '2014-01-07'),
+                second.loc['2014-01-03':'2014-01-07'], check_freq=False)
+        self.assertEqual(len(versions.as_of('2013-12-31').index), 0)
+        with self.assertRaises(ValueError):
+            versions.record(first, '2014-01-01')
+
+    def test_record_get(self):
+        df = _bars('2014-01-01', '2014-01-31')
+        provider = pn.data.providers.FixtureProvider({'GE': df})
+        pn.data.pit.set_recording(True)
+        pn.data.get('ge', '2014-01-01', '2014-01-15', provider=provider)
+        known = pn.data.pit.load('ge', 'fixture').last_known
+        provider.frames['GE'] = _bars('2014-01-01', '2014-01-31', 100.)
+        pn.data.get('ge', '2014-01-01', '2014-01-31', provider=provider)
+        pd.testing.assert_frame_equal(pn.data.get('ge', '2014-01-01', '2014-01-15', provider=provider,
+                as_of=known),
+                df.loc[:'2014-01-15'], check_freq=False)
+        versions = pn.data.pit.load('GE', 'fixture')
+        self.assertEqual(len(versions), 11 + 23)
+        versions.save(self.cachedir + '/versions.npz')
+        loaded = pn.data.pit.VersionedFrame.load(self.cachedir + '/versions.npz')
+        pd.testing.assert_frame_equal(loaded.as_of('2100'), provider.frames['GE'], check_freq=False)
+        with self.assertRaises(KeyError):
+            pn.data.get('msft', as_of='2014', provider=provider)
+
+if __name__ == '__main__':
+    unittest.main()
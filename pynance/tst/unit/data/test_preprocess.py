@@ -9,6 +9,7 @@ license http://opensource.org/licenses/MIT
 """
 
 from functools import partial
+import json
 import unittest
 
 import numpy as np
@@ -193,5 +194,35 @@ class TestPreprocess(unittest.TestCase):
         for i in range(len(transformed.columns)):
             self.assertAlmostEqual(transformed.iloc[0, i], 1.0)
 
+    def test_scaler(self):
+        features = pd.DataFrame(data=np.random.random((112, 3)) * [1., 10., 1e-3] + [0., 1e6, 5.],
+                columns=['1', '2', '3'])
+        scaler = pn.data.Scaler()
+        for start in range(0, 112, 25):
+            scaler.partial_fit(features.iloc[start:(start + 25)])
+        self.assertEqual(scaler.count, 112)
+        centered_features, feat_means = pn.data.center(features)
+        _, feat_sds = pn.data.normalize(centered_features)
+        means, sds = scaler.adjustments()
+        self.assertTrue(isinstance(means, pd.DataFrame))
+        self.assertEqual(list(means.index), ['Mean'])
+        np.testing.assert_allclose(means.values, feat_means.values, rtol=1e-14)
+        np.testing.assert_allclose(sds.values, feat_sds.values, rtol=1e-10)
+        normalized = scaler.transform(features)
+        self.assertTrue(isinstance(normalized, pd.DataFrame))
+        np.testing.assert_allclose(np.mean(normalized.values, axis=0), 0., atol=1e-8)
+        np.testing.assert_allclose(np.std(normalized.values, axis=0), 1., rtol=1e-8)
+        # in place on ndarray, restored from serialized state
+        restored = pn.data.Scaler.restore(json.loads(json.dumps(scaler.snapshot())))
+        values = features.values.copy()
+        out = restored.transform(values, out=values)
+        self.assertTrue(out is values)
+        np.testing.assert_allclose(values, normalized.values, rtol=1e-14)
+        # ndarray adjustments
+        scaler = pn.data.Scaler().fit(features.values)
+        self.assertEqual(scaler.mean.shape, (1, 3))
+        np.testing.assert_allclose(scaler.std, feat_sds.values, rtol=1e-10)
+        self.assertRaises(ValueError, pn.data.Scaler().transform, values)
+
 if __name__ == '__main__':
     unittest.main()
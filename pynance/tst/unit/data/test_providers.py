@@ -0,0 +1,69 @@
+"""
+Copyright (c) 2014- Marshall Farrier
+license http://opensource.org/licenses/MIT
+
+@summary: Unit tests for data providers
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import pynance as pn
+
+class TestProviders(unittest.TestCase):
+
+    def setUp(self):
+        index = pd.date_range('2014-01-06', periods=10, freq='B', name='Date')
+        self.ge = pd.DataFrame(np.arange(1., 21.).reshape((10, 2)), index=index,
+                columns=['Close', 'Volume'])
+
+    def tearDown(self):
+        pn.data.providers.set_provider(None)
+
+    def test_fixture(self):
+        provider = pn.data.providers.FixtureProvider({'GE': self.ge})
+        df = pn.data.get('ge', '2014-01-08', '2014-01-10', provider=provider)
+        self.assertEqual(df.shape, (3, 2))
+        self.assertAlmostEqual(df.iloc[0, 0], 5.)
+        self.assertEqual(provider.symbols(), ['GE'])
+        # global selection
+        pn.data.providers.set_provider(provider)
+        df = pn.data.get('ge', '2014-01-01', '2014-01-31')
+        self.assertEqual(df.shape, (10, 2))
+        self.assertTrue(pn.data.providers.get_provider() is provider)
+        self.assertTrue(pn.data.providers.configured_provider() is provider)
+        pn.data.providers.set_provider(None)
+        self.assertIsNone(pn.data.providers.configured_provider())
+
+    def test_file(self):
+        _dir = tempfile.mkdtemp()
+        try:
+            self.ge.iloc[::-1].to_csv(os.path.join(_dir, 'GE.csv'))
+            self.ge.to_csv(os.path.join(_dir, 'msft.csv'))
+            provider = pn.data.providers.FileProvider(_dir)
+            self.assertEqual(provider.symbols(), ['GE', 'MSFT'])
+            df = pn.data.get('GE', '2014-01-08', '2014-01-10', provider=provider)
+            self.assertEqual(df.shape, (3, 2))
+            self.assertTrue(df.index.is_monotonic_increasing)
+            self.assertAlmostEqual(df.iloc[0, 0], 5.)
+            data, errors = pn.data.get_many(['ge', 'msft', 'xyz'], '2014-01-01', '2014-01-31',
+                    provider=provider, retries=0)
+            self.assertEqual(sorted(data.keys()), ['ge', 'msft'])
+            self.assertEqual(list(errors.keys()), ['xyz'])
+        finally:
+            shutil.rmtree(_dir)
+
+    def test_stooq_params(self):
+        _params = pn.data.providers.stooq_params('ge', '2014-01-02', '2015-06-30')
+        self.assertEqual(_params, {'s': 'ge.US', 'i': 'd', 'd1': '20140102', 'd2': '20150630'})
+        for _symbol, _expected in (('^spx', '^spx'), ('cdr.pl', 'cdr'), ('sap.de', 'sap.de'),
+                ('brk.b', 'brk.b'), ('bf.x', 'bf.x.US')):
+            self.assertEqual(pn.data.providers.stooq_params(_symbol, '2014', '2015')['s'], _expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+"""
+Copyright (c) 2014- Marshall Farrier
+license http://opensource.org/licenses/MIT
+
+@summary: Unit tests for concurrent retrieval against a local stub server
+"""
+
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+import pynance as pn
+
+# oldest session first, as served by Stooq
+_CSV = """Date,Open,High,Low,Close,Volume
+2014-03-05,17.018,17.140,16.961,17.065,223028444
+2014-03-06,17.021,17.073,16.917,17.029,288981388
+2014-03-07,16.764,17.010,16.759,16.917,266327067
+"""
+
+class _Handler(BaseHTTPRequestHandler):
+    failures = {}
+
+    def do_GET(self):
+        _symbol = parse_qs(urlparse(self.path).query)['s'][0]
+        _remaining = self.failures.get(_symbol, 0)
+        if _remaining:
+            self.failures[_symbol] = _remaining - 1
+            self.send_response(503)
+            self.end_headers()
+            return
+        _body = _CSV.replace('16.917,266327067', '16.917,{0}'.format(len(_symbol))).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/csv')
+        self.send_header('Content-Length', str(len(_body)))
+        self.end_headers()
+        self.wfile.write(_body)
+
+    def log_message(self, *args):
+        pass
+
+class _Server(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+class TestGetMany(unittest.TestCase):
+
+    def setUp(self):
+        _Handler.failures = {}
+        self.server = _Server(('127.0.0.1', 0), _Handler)
+        self.url = 'http://127.0.0.1:{0}/'.format(self.server.server_address[1])
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_get_many(self):
+        _Handler.failures = {'ge.US': 1, 'bad.US': 100}
+        data, errors = pn.data.get_many(['aapl', 'ge', 'bad'], '2014-03-03', '2014-03-07',
+                max_workers=2, url=self.url, backoff=0., retries=2)
+        self.assertEqual(list(data.keys()), ['aapl', 'ge'])
+        self.assertEqual(list(errors.keys()), ['bad'])
+        for _df in data.values():
+            self.assertEqual(_df.shape, (3, 5))
+            self.assertTrue(_df.index.is_monotonic_increasing)
+        self.assertEqual(data['ge'].iloc[-1].loc['Volume'], len('ge.US'))
+
+    def test_get_cached(self):
+        _cachedir = tempfile.mkdtemp()
+        pn.data.cache.set_cachedir(_cachedir)
+        try:
+            df = pn.data.get('ge', '2014-03-03', '2014-03-07', url=self.url)
+            self.assertEqual(list(df.index), list(pd.to_datetime(['2014-03-05', '2014-03-06', '2014-03-07'])))
+            # served from the cache
+            self.server.shutdown()
+            inner = pn.data.get('ge', '2014-03-06', '2014-03-07', url=self.url)
+            pd.testing.assert_frame_equal(inner, df.iloc[1:], check_freq=False)
+        finally:
+            pn.data.cache.set_cachedir(None)
+            shutil.rmtree(_cachedir)
+
+    def test_get_many_selection(self):
+        closes, errors = pn.data.get_many(['aapl', 'ge'], '2014-03-03', '2014-03-07',
+                url=self.url, selection='Close')
+        self.assertEqual(errors, {})
+        self.assertEqual(list(closes.columns), ['aapl', 'ge'])
+        self.assertEqual(closes.index[0], pd.Timestamp('2014-03-05'))
+        self.assertAlmostEqual(closes.loc['2014-03-07', 'ge'], 16.917)
+
+_NASDAQ = b"""Symbol|Security Name|Market Category|Test Issue|Financial Status|Round Lot Size|ETF|NextShares
+ZYNE|Zynerba Pharmaceuticals, Inc. - Common Stock|G|N|N|100|N|N
+AAPL|Apple Inc. - Common Stock|Q|N|N|100|N|N
+NA|National Holdings "NA" Corp - Common Stock|S|N|N|100|N|N
+File Creation Time: 0417202119:01|||||||
+"""
+
+_OTHER = b"""ACT Symbol|Security Name|Exchange|CQS Symbol|ETF|Round Lot Size|Test Issue|NASDAQ Symbol
+GE|General Electric Company Common Stock|N|GE|N|100|N|GE
+SPY|SPDR S&P 500 ETF Trust|P|SPY|Y|100|N|SPY
+XYZ|Some Company|Q|XYZ|N|100|N|XYZ
+File Creation Time: 0417202119:01|||||||
+"""
+
+class _FakeTransport(object):
+
+    def __init__(self, nasdaq=_NASDAQ):
+        self.calls = 0
+        self.nasdaq = nasdaq
+
+    def retrieve(self, fnames):
+        self.calls += 1
+        return [self.nasdaq, _OTHER]
+
+class TestEquities(unittest.TestCase):
+
+    def setUp(self):
+        self.cachedir = tempfile.mkdtemp()
+        pn.data.cache.set_cachedir(self.cachedir)
+
+    def tearDown(self):
+        pn.data.cache.set_cachedir(None)
+        shutil.rmtree(self.cachedir)
+
+    def test_equities(self):
+        transport = _FakeTransport()
+        eqs = pn.data.equities(transport=transport, refresh=True)
+        self.assertEqual(list(eqs.index), ['AAPL', 'GE', 'NA', 'SPY', 'XYZ', 'ZYNE'])
+        self.assertEqual(list(eqs.columns), ['Security Name', 'Exchange'])
+        self.assertEqual(list(eqs.loc[:, 'Exchange']),
+                ['NASDAQ', 'NYSE', 'NASDAQ', 'NYSE ARCA', 'unknown', 'NASDAQ'])
+        self.assertEqual(eqs.loc['GE', 'Security Name'], 'General Electric Company Common Stock')
+        self.assertEqual(eqs.loc['NA', 'Security Name'], 'National Holdings "NA" Corp - Common Stock')
+        # memoized
+        pn.data.equities(transport=transport)
+        self.assertEqual(transport.calls, 1)
+        # expired
+        pn.data.equities(transport=transport, ttl=0.)
+        self.assertEqual(transport.calls, 2)
+        # memoized per transport
+        other = _FakeTransport(_NASDAQ.replace(b'ZYNE|', b'ZZZZ|'))
+        self.assertEqual(pn.data.equities(transport=other).index[-1], 'ZZZZ')
+        self.assertEqual(pn.data.equities(transport=transport).index[-1], 'ZYNE')
+        self.assertEqual((transport.calls, other.calls), (2, 1))
+
+    def test_equities_cached(self):
+        transport = _FakeTransport()
+        with mock.patch.object(pn.data.retrieve, 'FTPTransport', return_value=transport):
+            eqs = pn.data.equities(refresh=True)
+            self.assertEqual(transport.calls, 1)
+            # raw listings cached on disk
+            self.assertTrue(os.path.isfile(os.path.join(self.cachedir, 'symboldirectory', 'otherlisted.txt')))
+            pn.data.retrieve._equities_memo.clear()
+            cached = pn.data.equities()
+            self.assertEqual(transport.calls, 1)
+            self.assertTrue(cached.equals(eqs))
+        # not for a transport passed explicitly
+        other = _FakeTransport()
+        pn.data.equities(transport=other)
+        self.assertEqual(other.calls, 1)
+
+if __name__ == '__main__':
+    unittest.main()
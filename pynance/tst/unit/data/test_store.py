@@ -0,0 +1,90 @@
+"""
+Copyright (c) 2014- Marshall Farrier
+license http://opensource.org/licenses/MIT
+
+@summary: Unit tests for memory-mapped price store
+"""
+
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import pynance as pn
+
+class TestStore(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        index = pd.date_range('2014-01-06', periods=10, freq='B')
+        self.frames = {
+                'GE': pd.DataFrame({'Adj Close': np.arange(1., 11.), 'Volume': np.arange(10.)}, index=index),
+                'MSFT': pd.DataFrame({'Adj Close': np.arange(11., 19.)}, index=index[2:]),
+                }
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_from_frames(self):
+        store = pn.data.store.PriceStore.from_frames(self.dir, self.frames, fields=('Adj Close', 'Volume'))
+        self.assertEqual(store.shape, (10, 2))
+        adj = store['Adj Close']
+        self.assertTrue(isinstance(adj.base, np.memmap) or isinstance(adj, np.memmap))
+        self.assertAlmostEqual(adj[3, 0], 4.)
+        self.assertTrue(np.isnan(adj[0, 1]))
+        self.assertAlmostEqual(adj[2, 1], 11.)
+        self.assertTrue(np.isnan(store['Volume'][5, 1]))
+        reopened = pn.data.store.PriceStore(self.dir)
+        self.assertTrue(reopened.dates.equals(store.dates))
+        self.assertEqual(list(reopened.locate(['MSFT', 'GE'])), [1, 0])
+        # feeds tech functions
+        smadf = pn.tech.sma(reopened.equity('GE'), window=3)
+        self.assertAlmostEqual(smadf.iloc[-1, 0], 9.)
+        wide = reopened.frame('Adj Close', ['MSFT'])
+        self.assertEqual(list(wide.columns), ['MSFT'])
+        with self.assertRaises(ValueError):
+            reopened.append_sessions(['2014-02-03'], {})
+
+    def test_append(self):
+        store = pn.data.store.PriceStore.create(self.dir, ['GE'], fields=('Close',), capacity=2)
+        store.append_sessions(['2014-01-06', '2014-01-07'], {'Close': np.array([[1.], [2.]])})
+        store.append_sessions(['2014-01-08'], {'Close': np.array([[3.]])})
+        with self.assertRaises(ValueError):
+            store.append_sessions(['2014-01-08'], {'Close': np.array([[3.]])})
+        # unknown field or values not one row per session and symbol
+        with self.assertRaises(ValueError):
+            store.append_sessions(['2014-01-09'], {'Adj close': np.array([[3.]])})
+        with self.assertRaises(ValueError):
+            store.append_sessions(['2014-01-09', '2014-01-10'], {'Close': np.array([5.])})
+        self.assertEqual(len(store.dates), 3)
+        with self.assertRaises(ValueError):
+            store.add_symbols(['MSFT'], {'Close': np.array([[4.], [5.]])})
+        with self.assertRaises(ValueError):
+            store.add_symbols(['MSFT'], {'Bid': np.array([[4.], [5.], [6.]])})
+        store.add_symbols(['MSFT'], {'Close': np.array([[4.], [5.], [6.]])})
+        # exceeds capacity
+        store.add_symbols(['AAPL', 'GOOG'])
+        store.append_sessions(['2014-01-09'], {'Close': np.array([[7., 8., 9., 10.]])})
+        reopened = pn.data.store.PriceStore(self.dir)
+        self.assertEqual(reopened.symbols, ['GE', 'MSFT', 'AAPL', 'GOOG'])
+        close = reopened['Close']
+        self.assertEqual(close.shape, (4, 4))
+        np.testing.assert_array_equal(close[:, 0], [1., 2., 3., 7.])
+        np.testing.assert_array_equal(close[:, 1], [4., 5., 6., 8.])
+        self.assertTrue(np.isnan(close[0, 2]))
+        np.testing.assert_array_equal(close[3, :], [7., 8., 9., 10.])
+
+    def test_add_symbols_empty(self):
+        store = pn.data.store.PriceStore.create(self.dir, ['GE'], fields=('Close',))
+        # no sessions to hold the values
+        with self.assertRaises(ValueError):
+            store.add_symbols(['MSFT'], {'Close': np.array([[4.]])})
+        self.assertEqual(store.symbols, ['GE'])
+        store.add_symbols(['MSFT'], {'Close': np.empty((0, 1))})
+        store.append_sessions(['2014-01-06'], {'Close': np.array([[1., 4.]])})
+        np.testing.assert_array_equal(store['Close'][0], [1., 4.])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+"""
+Copyright (c) 2014- Marshall Farrier
+license http://opensource.org/licenses/MIT
+
+@summary: Unit tests for symbol lookup
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import pandas as pd
+
+import pynance as pn
+
+class TestSymbols(unittest.TestCase):
+
+    def setUp(self):
+        self.eqs = pd.DataFrame([
+            ['Apple Inc. - Common Stock', 'NASDAQ'],
+            ['Applied Materials, Inc. - Common Stock', 'NASDAQ'],
+            ['AppLovin Corporation - Class A Common Stock', 'NASDAQ'],
+            ['General Electric Company Common Stock', 'NYSE'],
+            ['General Mills, Inc. Common Stock', 'NYSE'],
+            ['Agilent Technologies, Inc. Common Stock', 'NYSE'],
+            ['App Holdings', 'NYSE']],
+            index=['AAPL', 'AMAT', 'APP', 'GE', 'GIS', 'A', 'APPH'],
+            columns=['Security Name', 'Exchange'])
+        self.index = pn.data.symbols.SymbolIndex(self.eqs)
+
+    def test_symbol_prefix(self):
+        matches = self.index.search('app')
+        self.assertEqual(list(matches.index)[:2], ['APP', 'APPH'])
+        self.assertEqual(set(matches.index), set(['APP', 'APPH', 'AAPL', 'AMAT']))
+        self.assertEqual(list(self.index.search('a', limit=3).index), ['A', 'AAPL', 'AMAT'])
+
+    def test_name_tokens(self):
+        self.assertEqual(list(self.index.search('general elec').index), ['GE'])
+        self.assertEqual(list(self.index.search('general').index), ['GE', 'GIS'])
+        self.assertEqual(list(self.index.search('common stock', limit=2).index), ['A', 'AAPL'])
+        self.assertEqual(len(self.index.search('nothing')), 0)
+        self.assertEqual(len(self.index.search('  ')), 0)
+
+    def test_save_load(self):
+        _dir = tempfile.mkdtemp()
+        try:
+            fname = os.path.join(_dir, 'index.npz')
+            self.index.save(fname)
+            loaded = pn.data.symbols.SymbolIndex.load(fname)
+        finally:
+            shutil.rmtree(_dir)
+        self.assertEqual(len(loaded), len(self.index))
+        self.assertTrue(loaded.search('gen').equals(self.index.search('gen')))
+        pn.data.symbols.set_index(loaded)
+        self.assertEqual(list(pn.data.symbols.search('ge', limit=1).index), ['GE'])
+        pn.data.symbols.set_index(None)
+
+if __name__ == '__main__':
+    unittest.main()
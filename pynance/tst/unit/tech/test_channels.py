@@ -0,0 +1,57 @@
+"""
+Copyright (c) 2014- Marshall Farrier
+license http://opensource.org/licenses/MIT
+
+@summary: Unit tests for channels and rolling quantiles
+"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import pynance as pn
+
+class TestChannels(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(0)
+        close = 100. + np.cumsum(np.random.randn(200, 3), axis=0)
+        index = pd.bdate_range('2014-01-01', periods=200)
+        self.wide = pd.DataFrame(close, index=index, columns=['A', 'B', 'C'])
+        spread = np.abs(np.random.randn(200, 3))
+        self.panel = {'High': self.wide + spread, 'Low': self.wide - spread}
+        self.eqdata = pd.DataFrame({'High': self.panel['High']['A'], 'Low': self.panel['Low']['A'],
+            'Adj Close': self.wide['A']})
+
+    def test_donchian(self):
+        chandf, middf = pn.tech.channels.donchian(self.eqdata, window=20)
+        upper = self.eqdata['High'].rolling(20).max().values
+        lower = self.eqdata['Low'].rolling(20).min().values
+        np.testing.assert_array_equal(chandf['Upper'].values, upper)
+        np.testing.assert_array_equal(chandf['Lower'].values, lower)
+        np.testing.assert_allclose(middf['Middle'].values, (upper + lower) / 2.)
+        chandf, middf = pn.tech.channels.donchian(self.panel, window=20, panel=True)
+        np.testing.assert_array_equal(chandf['Upper']['A'].values, upper)
+        bands, middle = pn.tech.channels.donchian(self.wide.values, window=20)
+        self.assertEqual(bands.shape, (2, 200, 3))
+        np.testing.assert_array_equal(bands[0], self.wide.rolling(20).max().values)
+        # short history
+        chandf, middf = pn.tech.channels.donchian(self.eqdata.iloc[:10], window=55)
+        self.assertEqual(chandf.shape, (10, 2))
+        self.assertTrue(chandf.isnull().all().all())
+        self.assertTrue(middf.isnull().all().all())
+
+    def test_quantile(self):
+        median = pn.tech.channels.rolling_quantile(self.eqdata, window=21)
+        expected = [np.median(self.wide['A'].values[i - 20:i + 1]) for i in range(20, 200)]
+        np.testing.assert_allclose(median['Quantile'].values[20:], expected)
+        self.assertTrue(np.isnan(median['Quantile'].values[:20]).all())
+        banddf, mediandf = pn.tech.channels.percentile_bands(self.wide, window=21, upper=.9, lower=.1,
+                panel=True)
+        expected = [np.percentile(self.wide['B'].values[i - 20:i + 1], 90.) for i in range(20, 200)]
+        np.testing.assert_allclose(banddf['Upper']['B'].values[20:], expected)
+        np.testing.assert_allclose(mediandf['A'].values, median['Quantile'].values)
+
+if __name__ == '__main__':
+    unittest.main()
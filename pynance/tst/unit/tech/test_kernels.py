@@ -0,0 +1,103 @@
+"""
+Copyright (c) 2014- Marshall Farrier
+license http://opensource.org/licenses/MIT
+
+@summary: Unit tests for numerical kernels
+"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import pynance as pn
+
+class TestKernels(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(0)
+        self.values = 100. * np.exp(np.cumsum(.01 * np.random.randn(2000, 3), axis=0))
+        self.values[500, 1] = np.nan
+        self.values[1000:1030, 2] = 42.
+
+    def test_rolling_moments(self):
+        wide = pd.DataFrame(self.values)
+        for window in (1, 3, 20, 300):
+            mean, var, skew = pn.tech.kernels.rolling_moments(self.values, window, skew=True)
+            np.testing.assert_allclose(mean, wide.rolling(window).mean().values, rtol=1e-12)
+            np.testing.assert_allclose(var, wide.rolling(window).var().values, rtol=1e-8, atol=1e-10)
+            if window >= 3:
+                expected = wide.rolling(window).skew().values
+                valid = ~np.isnan(expected)
+                np.testing.assert_allclose(skew[valid], expected[valid], rtol=1e-3, atol=1e-4)
+        # constant window
+        mean, var = pn.tech.kernels.rolling_moments(self.values, 20)
+        self.assertEqual(var[1029, 2], 0.)
+        self.assertGreater(var[1018, 2], 0.)
+        self.assertAlmostEqual(mean[1029, 2], 42.)
+        # mostly constant
+        steps = np.repeat(self.values[::40, 0], 40)
+        _, var = pn.tech.kernels.rolling_moments(steps, 20)
+        constant = (pd.Series(steps).rolling(20).apply(np.ptp, raw=True) == 0.).values
+        self.assertTrue((var[constant] == 0.).all())
+        self.assertTrue((var[19:][~constant[19:]] > 0.).all())
+        mean, var = pn.tech.kernels.rolling_moments(self.values[:, 0], 20, ddof=0)
+        np.testing.assert_allclose(var, pd.Series(self.values[:, 0]).rolling(20).var(ddof=0).values, rtol=1e-8)
+        mean, var = pn.tech.kernels.rolling_moments(self.values[:5], 20)
+        self.assertTrue(np.isnan(mean).all())
+
+    def test_ema(self):
+        wide = pd.DataFrame(self.values)
+        wide.iloc[:10, 0] = np.nan
+        for span in (1, 2., 10, 500):
+            actual = pn.tech.kernels.ema(wide.values, span)
+            expected = wide.ewm(span=span, min_periods=0, adjust=True, ignore_na=False).mean().values
+            np.testing.assert_allclose(actual, expected, rtol=1e-12)
+        actual = pn.tech.kernels.ema(wide.values[:, 2], 10)
+        np.testing.assert_allclose(actual, wide[2].ewm(span=10).mean().values, rtol=1e-12)
+
+    def test_out(self):
+        out = np.empty(self.values.shape)
+        result = pn.tech.kernels.sma(self.values, 20, out=out)
+        self.assertIs(result, out)
+        np.testing.assert_allclose(out, pd.DataFrame(self.values).rolling(20).mean().values, rtol=1e-12)
+        bands = np.empty((3, self.values.shape[0]))
+        upper, lower, mean = pn.tech.kernels.bollinger(self.values[:, 0], 20, out=tuple(bands))
+        self.assertIs(upper.base, bands)
+        std = pn.tech.kernels.volatility(self.values[:, 0], 20)
+        np.testing.assert_allclose(bands[0] - bands[2], 2. * std, rtol=1e-10, atol=1e-12)
+        np.testing.assert_allclose(bands[2] - bands[1], 2. * std, rtol=1e-10, atol=1e-12)
+        out = np.empty((self.values.shape[0] - 5, 3))
+        pn.tech.kernels.growth(self.values, 5, out=out)
+        np.testing.assert_array_equal(out, self.values[5:] / self.values[:-5])
+        self.assertRaises(ValueError, pn.tech.kernels.sma, self.values, 20, np.empty(10))
+
+    def test_sweep(self):
+        windows = [1, 2, 20, 300, 2500]
+        mean = pn.tech.kernels.sma_sweep(self.values, windows)
+        std = pn.tech.kernels.volatility_sweep(self.values, windows)
+        self.assertEqual(mean.shape, self.values.shape + (5,))
+        for i, window in enumerate(windows):
+            expected = pn.tech.kernels.rolling_moments(self.values, window)
+            np.testing.assert_allclose(mean[..., i], expected[0], rtol=1e-12)
+            np.testing.assert_allclose(std[..., i] ** 2, expected[1], rtol=1e-8, atol=1e-10)
+        self.assertEqual(std[1029, 2, 2], 0.)
+        self.assertTrue(np.isnan(std[500:520, 1, 2]).all())
+        out = np.empty((2000, 2))
+        pn.tech.kernels.ema_sweep(self.values[:, 0], [5, 50], out=out)
+        np.testing.assert_array_equal(out[:, 1], pn.tech.kernels.ema(self.values[:, 0], 50))
+
+    def test_rolling_extrema(self):
+        wide = pd.DataFrame(self.values)
+        for window in (1, 2, 20, 1999, 2000, 2001):
+            np.testing.assert_array_equal(pn.tech.kernels.rolling_max(self.values, window),
+                    wide.rolling(window).max().values)
+            np.testing.assert_array_equal(pn.tech.kernels.rolling_min(self.values[:, 1], window),
+                    wide[1].rolling(window).min().values)
+        # short history
+        for window in (11, 12, 55):
+            self.assertTrue(np.isnan(pn.tech.kernels.rolling_max(self.values[:10], window)).all())
+            self.assertTrue(np.isnan(pn.tech.kernels.rolling_min(self.values[:10, 0], window)).all())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -46,5 +46,46 @@ class TestMovAve(unittest.TestCase):
         for i in range(2, len(_emadf.index)):
             self.assertTrue(_emadf.iloc[i, 0] > self.equity_data.iloc[i - 2, 1])
 
+    def test_panel(self):
+        np.random.seed(0)
+        wide = pd.DataFrame(100. + np.cumsum(np.random.randn(60, 3), axis=0),
+                index=pd.bdate_range('2014-01-01', periods=60), columns=['A', 'B', 'C'])
+        sma = pn.tech.sma(wide, window=5, panel=True)
+        ema = pn.tech.ema(wide, span=5, panel=True)
+        risk = pn.tech.volatility(wide, window=5, panel=True)
+        bolldf, smadf = pn.tech.bollinger(wide, window=5, panel=True)
+        for sym in wide.columns:
+            np.testing.assert_allclose(sma[sym].values, pn.tech.sma(wide, window=5, selection=sym).iloc[:, 0].values)
+            np.testing.assert_allclose(ema[sym].values, pn.tech.ema(wide, span=5, selection=sym).iloc[:, 0].values)
+            np.testing.assert_allclose(risk[sym].values,
+                    pn.tech.volatility(wide, window=5, selection=sym).iloc[:, 0].values)
+            single, _ = pn.tech.bollinger(wide, window=5, selection=sym)
+            np.testing.assert_allclose(bolldf['Upper'][sym].values, single['Upper'].values)
+            np.testing.assert_allclose(bolldf['Lower'][sym].values, single['Lower'].values)
+        np.testing.assert_allclose(pn.tech.sma(wide.values, window=5), sma.values)
+        bands, smavals = pn.tech.bollinger(wide.values, window=5)
+        self.assertEqual(bands.shape, (2, 60, 3))
+        np.testing.assert_allclose(bands[1], bolldf['Lower'].values)
+
+    def test_sweep(self):
+        np.random.seed(0)
+        wide = pd.DataFrame(100. + np.cumsum(np.random.randn(300, 3), axis=0),
+                index=pd.bdate_range('2014-01-01', periods=300), columns=['A', 'B', 'C'])
+        windows = [3, 20, 257]
+        sma = pn.tech.sma_sweep(wide, windows=windows, selection='A')
+        risk = pn.tech.volatility_sweep(wide, windows=windows, selection='A')
+        ema = pn.tech.ema_sweep(wide, spans=[4, 10], selection='A')
+        self.assertEqual(list(sma.columns), windows)
+        for window in windows:
+            np.testing.assert_allclose(sma[window].values,
+                    pn.tech.sma(wide, window=window, selection='A').iloc[:, 0].values, rtol=1e-12)
+            np.testing.assert_allclose(risk[window].values,
+                    pn.tech.volatility(wide, window=window, selection='A').iloc[:, 0].values, rtol=1e-8)
+        np.testing.assert_allclose(ema[10].values, pn.tech.ema(wide, span=10, selection='A').iloc[:, 0].values)
+        panel = pn.tech.volatility_sweep(wide, windows=windows, panel=True)
+        np.testing.assert_allclose(panel[20]['B'].values,
+                pn.tech.volatility(wide, window=20, selection='B').iloc[:, 0].values, rtol=1e-8)
+        self.assertEqual(pn.tech.sma_sweep(wide.values, windows=windows).shape, (300, 3, 3))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,91 @@
+"""
+Copyright (c) 2014- Marshall Farrier
+license http://opensource.org/licenses/MIT
+
+@summary: Unit tests for momentum oscillators
+"""
+
+from functools import partial
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import pynance as pn
+
+class TestOscillators(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(0)
+        close = 100. + np.cumsum(np.random.randn(120, 3), axis=0)
+        self.wide = pd.DataFrame(close, index=pd.bdate_range('2014-01-01', periods=120),
+                columns=['A', 'B', 'C'])
+        spread = np.abs(np.random.randn(120, 3))
+        self.panel = {'Close': self.wide, 'High': self.wide + spread, 'Low': self.wide - spread}
+        self.eqdata = pd.DataFrame({'High': self.panel['High']['A'], 'Low': self.panel['Low']['A'],
+            'Close': self.wide['A'], 'Adj Close': self.wide['A']})
+
+    def test_rsi(self):
+        rsi = pn.tech.oscillators.rsi(self.eqdata, window=14)
+        changes = self.wide['A'].diff()
+        gains = changes.clip(lower=0.).ewm(alpha=1. / 14).mean()
+        losses = (-changes).clip(lower=0.).ewm(alpha=1. / 14).mean()
+        np.testing.assert_allclose(rsi['RSI'].values, (100. - 100. / (1. + gains / losses)).values)
+        self.assertTrue(np.isnan(rsi.iloc[0, 0]))
+        panel = pn.tech.oscillators.rsi(self.wide, window=14, panel=True)
+        np.testing.assert_allclose(panel['A'].values, rsi['RSI'].values)
+        flat = pn.tech.oscillators.rsi(pd.Series(np.full(20, 7.)), window=5)
+        self.assertEqual(flat.iloc[-1, 0], 50.)
+
+    def test_macd(self):
+        macd = pn.tech.oscillators.macd(self.eqdata)
+        close = self.wide['A']
+        expected = close.ewm(span=12).mean() - close.ewm(span=26).mean()
+        np.testing.assert_allclose(macd['MACD'].values, expected.values, atol=1e-10)
+        np.testing.assert_allclose(macd['Signal'].values, expected.ewm(span=9).mean().values, atol=1e-10)
+        panel = pn.tech.oscillators.macd(self.wide.values)
+        self.assertEqual(panel.shape, (3, 120, 3))
+        np.testing.assert_allclose(panel[2, :, 0], macd['Histogram'].values, atol=1e-10)
+
+    def test_stochastic(self):
+        stoch = pn.tech.oscillators.stochastic(self.eqdata, window=14, smoothing=3)
+        highest = self.eqdata['High'].rolling(14).max()
+        lowest = self.eqdata['Low'].rolling(14).min()
+        k = 100. * (self.eqdata['Close'] - lowest) / (highest - lowest)
+        np.testing.assert_allclose(stoch['%K'].values, k.values)
+        np.testing.assert_allclose(stoch['%D'].values, k.rolling(3).mean().values)
+        panel = pn.tech.oscillators.stochastic(self.panel, panel=True)
+        np.testing.assert_allclose(panel['%D']['A'].values, stoch['%D'].values)
+        self.assertEqual(pn.tech.oscillators.stochastic.warmup(), 15)
+        self.assertTrue(np.isnan(stoch['%D'].values[14]))
+        self.assertFalse(np.isnan(stoch['%D'].values[15]))
+        # short history
+        stoch = pn.tech.oscillators.stochastic(self.eqdata.iloc[:10])
+        self.assertEqual(stoch.shape, (10, 2))
+        self.assertTrue(stoch.isnull().all().all())
+
+    def test_roc(self):
+        roc = pn.tech.oscillators.roc(self.eqdata, n_sessions=5)
+        growth = pn.tech.growth(self.eqdata, n_sessions=5)
+        self.assertTrue(roc.index.equals(self.eqdata.index))
+        self.assertTrue(np.isnan(roc['ROC'].values[:5]).all())
+        np.testing.assert_allclose(roc['ROC'].values[5:], 100. * (growth['Growth'].values - 1.))
+        panel = pn.tech.oscillators.roc(self.wide, n_sessions=5, panel=True)
+        self.assertTrue(panel.index.equals(self.wide.index))
+        np.testing.assert_allclose(panel['A'].values, roc['ROC'].values)
+        values = pn.tech.oscillators.roc(self.wide.values, n_sessions=5)
+        self.assertEqual(values.shape, self.wide.shape)
+        np.testing.assert_allclose(values, panel.values)
+        self.assertEqual(pn.tech.oscillators.roc.warmup(n_sessions=5), 5)
+        self.assertFalse(np.isnan(roc['ROC'].values[5]))
+
+    def test_warmup(self):
+        funcs = [pn.decorate(partial(pn.tech.oscillators.rsi, window=10), title='RSI'),
+                pn.decorate(partial(pn.tech.oscillators.roc, n_sessions=20), title='ROC')]
+        skip = max(pn.tech.oscillators.rsi.warmup(window=10), pn.tech.oscillators.roc.warmup(n_sessions=20))
+        features = pn.data.feat.fromfuncs(funcs, 3, self.eqdata, skipatstart=skip)
+        self.assertEqual(len(features.index), 120 - 20 - 2)
+        self.assertFalse(features.isnull().any().any())
+
+if __name__ == '__main__':
+    unittest.main()
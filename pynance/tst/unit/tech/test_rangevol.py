@@ -0,0 +1,73 @@
+"""
+Copyright (c) 2014- Marshall Farrier
+license http://opensource.org/licenses/MIT
+
+@summary: Unit tests for range-based volatility estimators
+"""
+
+import math
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import pynance as pn
+
+class TestRangeVol(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(0)
+        n_sessions = 300
+        close = 100. * np.exp(np.cumsum(.01 * np.random.randn(n_sessions, 2), axis=0))
+        opening = np.empty(close.shape)
+        opening[0] = 100.
+        opening[1:] = close[:-1] * np.exp(.003 * np.random.randn(n_sessions - 1, 2))
+        high = np.maximum(opening, close) * np.exp(.005 * np.abs(np.random.randn(n_sessions, 2)))
+        low = np.minimum(opening, close) * np.exp(-.005 * np.abs(np.random.randn(n_sessions, 2)))
+        index = pd.bdate_range('2014-01-01', periods=n_sessions)
+        self.panel = {_field: pd.DataFrame(_values, index=index, columns=['A', 'B'])
+                for _field, _values in (('Open', opening), ('High', high), ('Low', low), ('Close', close))}
+        self.eqdata = pd.DataFrame({_field: _df['A'] for _field, _df in self.panel.items()})
+
+    def test_estimators(self):
+        eq = self.eqdata
+        hl = np.log(eq['High'] / eq['Low'])
+        co = np.log(eq['Close'] / eq['Open'])
+        rs = np.log(eq['High'] / eq['Close']) * np.log(eq['High'] / eq['Open']) + \
+                np.log(eq['Low'] / eq['Close']) * np.log(eq['Low'] / eq['Open'])
+        expected = np.sqrt((hl ** 2).rolling(10).mean() / (4. * math.log(2.)))
+        np.testing.assert_allclose(pn.tech.rangevol.parkinson(eq, window=10)['Parkinson'].values, expected.values)
+        expected = np.sqrt((.5 * hl ** 2 - (2. * math.log(2.) - 1.) * co ** 2).rolling(10).mean())
+        np.testing.assert_allclose(pn.tech.rangevol.garman_klass(eq, window=10).iloc[:, 0].values, expected.values)
+        expected = np.sqrt(rs.rolling(10).mean())
+        np.testing.assert_allclose(pn.tech.rangevol.rogers_satchell(eq, window=10).iloc[:, 0].values,
+                expected.values)
+        k = .34 / (1.34 + 11. / 9.)
+        overnight = np.log(eq['Open'] / eq['Close'].shift(1))
+        expected = np.sqrt(overnight.rolling(10).var() + k * co.rolling(10).var() + (1. - k) * rs.rolling(10).mean())
+        yz = pn.tech.rangevol.yang_zhang(eq, window=10)
+        np.testing.assert_allclose(yz.iloc[:, 0].values, expected.values, rtol=1e-8)
+        self.assertEqual(yz.iloc[:, 0].isnull().sum(), pn.tech.rangevol.yang_zhang.warmup(window=10))
+        # all estimators are close to the close-to-close volatility of 1%
+        for func in (pn.tech.rangevol.parkinson, pn.tech.rangevol.garman_klass,
+                pn.tech.rangevol.rogers_satchell, pn.tech.rangevol.yang_zhang):
+            self.assertTrue(.002 < func(eq, window=250).iloc[-1, 0] < .02)
+
+    def test_atr(self):
+        eq = self.eqdata
+        prev = eq['Close'].shift(1)
+        tr = pd.concat([eq['High'] - eq['Low'], (eq['High'] - prev).abs(), (eq['Low'] - prev).abs()],
+                axis=1).max(axis=1)
+        expected = tr.ewm(alpha=1. / 14).mean()
+        np.testing.assert_allclose(pn.tech.rangevol.atr(eq)['ATR'].values, expected.values)
+
+    def test_panel(self):
+        for func in (pn.tech.rangevol.parkinson, pn.tech.rangevol.yang_zhang, pn.tech.rangevol.atr):
+            panel = func(self.panel, window=10, panel=True)
+            self.assertEqual(list(panel.columns), ['A', 'B'])
+            np.testing.assert_allclose(panel['A'].values, func(self.eqdata, window=10).iloc[:, 0].values)
+            arrays = {_field: _df.values for _field, _df in self.panel.items()}
+            np.testing.assert_allclose(func(arrays, window=10, panel=True), panel.values)
+
+if __name__ == '__main__':
+    unittest.main()
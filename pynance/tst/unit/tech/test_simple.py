@@ -65,5 +65,32 @@ class TestSimple(unittest.TestCase):
             self.assertAlmostEqual(eqret.iloc[i, 0], 10. / (1. + 2. * i))
             self.assertEqual(eqret.index[i], self.equity_data.index[i + 5])
 
+    def test_growth_panel(self):
+        eqgrowth = pn.tech.growth(self.equity_data, n_sessions=2, panel=True)
+        self.assertEqual(eqgrowth.shape, (8, 2))
+        self.assertEqual(list(eqgrowth.columns), ['Volume', 'Adj Close'])
+        for col in self.equity_data.columns:
+            np.testing.assert_allclose(eqgrowth[col].values,
+                    pn.tech.growth(self.equity_data, selection=col, n_sessions=2).iloc[:, 0].values)
+        np.testing.assert_allclose(pn.tech.growth(self.equity_data.values, n_sessions=2), eqgrowth.values)
+
+    def test_growth_horizons(self):
+        horizons = [1, 2, 5]
+        eqgrowth = pn.tech.growth(self.equity_data, n_sessions=horizons)
+        self.assertEqual(list(eqgrowth.columns), horizons)
+        self.assertTrue(eqgrowth.index.equals(self.equity_data.index))
+        for n in horizons:
+            self.assertTrue(np.isnan(eqgrowth[n].values[:n]).all())
+            np.testing.assert_allclose(eqgrowth[n].values[n:],
+                    pn.tech.growth(self.equity_data, n_sessions=n).iloc[:, 0].values)
+        lngrowth = pn.tech.ln_growth(self.equity_data, n_sessions=horizons)
+        np.testing.assert_allclose(lngrowth.values, np.log(eqgrowth.values))
+        returns = pn.tech.ret(self.equity_data, n_sessions=horizons)
+        np.testing.assert_allclose(returns.values, eqgrowth.values - 1.)
+        panel = pn.tech.growth(self.equity_data, n_sessions=horizons, panel=True)
+        np.testing.assert_allclose(panel[2]['Volume'].values[2:],
+                pn.tech.growth(self.equity_data, selection='Volume', n_sessions=2).iloc[:, 0].values)
+        self.assertEqual(pn.tech.growth(self.equity_data.values, n_sessions=horizons).shape, (10, 2, 3))
+
 if __name__ == '__main__':
     unittest.main()
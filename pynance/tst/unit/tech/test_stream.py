@@ -0,0 +1,84 @@
+"""
+Copyright (c) 2014- Marshall Farrier
+license http://opensource.org/licenses/MIT
+
+@summary: Unit tests for streaming indicators
+"""
+
+import json
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import pynance as pn
+
+class TestStream(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(0)
+        values = 100. + np.cumsum(np.random.randn(200))
+        values[50] = np.nan
+        values[120:125] = 42.
+        self.eqdata = pd.DataFrame({'Adj Close': values}, index=pd.bdate_range('2014-01-01', periods=200))
+
+    def _run(self, indicator, values):
+        return np.array([indicator.update(_val) for _val in values])
+
+    def test_sma(self):
+        expected = pn.tech.sma(self.eqdata, window=10).values.flatten()
+        actual = self._run(pn.tech.stream.SMA(10), self.eqdata['Adj Close'].values)
+        np.testing.assert_array_equal(actual, expected)
+
+    def test_ema(self):
+        expected = pn.tech.ema(self.eqdata, span=10).values.flatten()
+        actual = self._run(pn.tech.stream.EMA(10), self.eqdata['Adj Close'].values)
+        np.testing.assert_array_equal(actual, expected)
+
+    def test_bollinger(self):
+        bolldf, smadf = pn.tech.bollinger(self.eqdata, window=10)
+        risk = pn.tech.volatility(self.eqdata, window=10).values.flatten()
+        actual = self._run(pn.tech.stream.Bollinger(10), self.eqdata['Adj Close'].values)
+        np.testing.assert_array_equal(actual[:, 0], bolldf['Upper'].values)
+        np.testing.assert_array_equal(actual[:, 1], bolldf['Lower'].values)
+        np.testing.assert_array_equal(actual[:, 2], smadf['SMA'].values)
+        std = self._run(pn.tech.stream.RollingStd(10), self.eqdata['Adj Close'].values)
+        np.testing.assert_array_equal(std, risk)
+
+    def test_long(self):
+        # several blocks of the batch kernels, with NaN starting a block
+        np.random.seed(1)
+        values = 100. + np.cumsum(np.random.randn(3000))
+        values[256:260] = np.nan
+        values[1000:1400] = 42.
+        eqdata = pd.DataFrame({'Adj Close': values}, index=pd.bdate_range('2000-01-01', periods=3000))
+        for window in (1, 20, 300):
+            np.testing.assert_array_equal(self._run(pn.tech.stream.SMA(window), values),
+                    pn.tech.sma(eqdata, window=window).values.flatten())
+            np.testing.assert_array_equal(self._run(pn.tech.stream.RollingStd(window), values),
+                    pn.tech.volatility(eqdata, window=window).values.flatten())
+            bolldf, smadf = pn.tech.bollinger(eqdata, window=window)
+            actual = self._run(pn.tech.stream.Bollinger(window), values)
+            np.testing.assert_array_equal(actual[:, 0], bolldf['Upper'].values)
+            np.testing.assert_array_equal(actual[:, 1], bolldf['Lower'].values)
+        for span in (1, 3, 20):
+            np.testing.assert_array_equal(self._run(pn.tech.stream.EMA(span), values),
+                    pn.tech.ema(eqdata, span=span).values.flatten())
+        for indicator in (pn.tech.stream.Bollinger(300), pn.tech.stream.EMA(3)):
+            self._run(indicator, values[:1500])
+            restored = type(indicator).restore(json.loads(json.dumps(indicator.snapshot())))
+            np.testing.assert_array_equal(self._run(restored, values[1500:]),
+                    self._run(indicator, values[1500:]))
+
+    def test_snapshot(self):
+        values = self.eqdata['Adj Close'].values
+        for cls in (pn.tech.stream.SMA, pn.tech.stream.EMA, pn.tech.stream.RollingStd,
+                pn.tech.stream.Bollinger):
+            indicator = cls(10)
+            self._run(indicator, values[:100])
+            restored = cls.restore(json.loads(json.dumps(indicator.snapshot())))
+            np.testing.assert_array_equal(self._run(restored, values[100:]),
+                    self._run(indicator, values[100:]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -56,6 +56,37 @@ class TestCommon(unittest.TestCase):
         for i in range(len(cols)):
             self.assertEqual(cols[i], features.columns.values[i])
 
+    def test_featurize_values(self):
+        n_sessions = 3
+        features = pn.featurize(self.equity_data, n_sessions)
+        self.assertEqual(list(features.columns), ['-2', '-1', '0'])
+        _close = self.equity_data['Close'].values
+        for i in range(len(features.index)):
+            self.assertEqual(features.index[i], self.equity_data.index[i + n_sessions - 1])
+            for j in range(n_sessions):
+                self.assertEqual(features.iloc[i, j], _close[i + j])
+        _array = pn.featurize(self.equity_data, n_sessions, outputtype=np.ndarray)
+        self.assertTrue(np.array_equal(_array, features.values))
+        self.assertTrue(_array.flags.writeable)
+        _view = pn.featurize(self.equity_data, n_sessions, outputtype=np.ndarray, copy=False)
+        self.assertTrue(np.array_equal(_view, features.values))
+        self.assertFalse(_view.flags.writeable)
+
+    def test_windows(self):
+        _values = np.arange(10.)
+        _view = pn.common.windows(_values, 3)
+        self.assertEqual(_view.shape, (8, 3))
+        self.assertFalse(_view.flags.writeable)
+        for i in range(8):
+            self.assertTrue(np.array_equal(_view[i], _values[i:(i + 3)]))
+        _values = np.arange(20.).reshape((10, 2))
+        _view = pn.common.windows(_values, 4)
+        self.assertEqual(_view.shape, (7, 2, 4))
+        self.assertTrue(np.array_equal(_view[2, 1], _values[2:6, 1]))
+        self.assertRaises(ValueError, pn.common.windows, _values, 0)
+        self.assertRaises(ValueError, pn.common.windows, _values, 11)
+        self.assertTrue(pn.data.feat.windows is pn.common.windows)
+
     def test_decorate(self):
         def _f():
             return 0, 1
@@ -62,6 +62,7 @@ DEPENDENCIES = [
         "numpy",
         "pandas",
         "pandas-datareader>=0.9.0",
+        "requests",
         "matplotlib",
         "mplfinance"
         ]